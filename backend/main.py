@@ -1,23 +1,116 @@
 """FastAPI backend for AI Bid Writer."""
+import asyncio
+import contextvars
+import functools
+import json
+import math
+import multiprocessing
+import os
+import secrets
 import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # Add parent directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from starlette.routing import Match
+from typing import Any, Callable, List, Optional, Tuple
 
-from src.core.llm_client import get_llm_client
-from src.core.config import config
-from src.core.memory import bid_memory
+from src.core.llm_client import create_llm_client, get_llm_client
+from src.core.config import AppConfig, check_user_id, config, profiles
+from src.core.memory import BidMemory, bid_memory, memory_shards
+from src.core import profiling
+from src.core.budget import Cancelled, RequestBudget
+from src.core.cache import TTLCache
+from src.core.speculation import Speculator, project_key
+from src.core.scheduler import DeadlineScheduler, Overloaded, RateLimiter, deadline_for
+from src.core.store import StoreCache, StoreError, get_store
+from src.core.tracing import (
+    configure_tracing, request_span, set_attributes, set_response_status, shutdown_tracing
+)
 from src.agents.bid_generator import BidGenerator
 from src.agents.optimizer import BidOptimizer
-from src.utils.parser import ProjectParser, ParsedProject
+from src.agents.refiner import REFINEMENT_PROMPTS, RefinementSession, refinement_instruction, refine_variants
+from src.utils.parser import ProjectParser, ParsedProject, PLACEHOLDER_DESCRIPTIONS
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Move bid history writes off the request path; drain them on shutdown."""
+    try:
+        if configure_tracing():
+            print("✅ Tracing enabled")
+    except Exception as e:
+        print(f"⚠️  Error configuring tracing: {e}")
+    if os.getenv("BID_MEMORY_WRITE_BEHIND", "true").lower() == "true":
+        bid_memory.start_write_behind()
+        memory_shards.start_write_behind()
+    if os.getenv("WARMUP", "true").lower() == "true":
+        # Runs while the server already answers requests
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    yield
+    bid_memory.close()
+    memory_shards.close()
+    speculator.shutdown()
+    shutdown_tracing()
+    if _parse_pool is not None and _parse_pool_pid == os.getpid():
+        _parse_pool.shutdown(cancel_futures=True)
+
+
+app = FastAPI(title="AI Bid Writer", version="1.0.0", lifespan=lifespan)
+
+# Largest request body accepted; bigger uploads are refused before being read
+MAX_BODY_BYTES = int(os.getenv("MAX_BODY_BYTES", str(4 * 1024 * 1024)))
+
+# Bulk parsing accepts much larger batches; the stream is also counted as it is read
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(64 * 1024 * 1024)))
+
+
+@app.middleware("http")
+async def limit_body_size(request: Request, call_next):
+    """Reject requests whose declared body size exceeds the limit for their path."""
+    limit = MAX_BATCH_BYTES if request.url.path == "/parse-projects" else MAX_BODY_BYTES
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > limit:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body too large (limit {limit} bytes)"}
+        )
+    return await call_next(request)
+
+
+def route_template(request: Request) -> Optional[str]:
+    """Path template of the route that will handle ``request``, matched as the router does.
+    
+    Known before routing runs, so the sampler can use it when the request span starts.
+    """
+    partial = None
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None)
+        if match == Match.PARTIAL and partial is None:
+            partial = route  # Answered with 405 unless a full match follows
+    return getattr(partial, "path", None)
+
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """Record each request as a server span (no-op unless tracing is configured)."""
+    with request_span(request.method, route_template(request), request.url.path, request.headers) as current:
+        response = await call_next(request)
+        set_response_status(current, response.status_code)
+        return response
 
-app = FastAPI(title="AI Bid Writer", version="1.0.0")
 
 # CORS middleware for React frontend (supports Render + Vercel deployment)
 app.add_middleware(
@@ -28,16 +121,130 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize LLM client and bid generator
-try:
-    llm_client = get_llm_client()
-    bid_generator = BidGenerator(llm_client, config)
-    bid_optimizer = BidOptimizer(llm_client)
-except Exception as e:
-    print(f"Warning: Could not initialize LLM client: {e}")
-    llm_client = None
-    bid_generator = None
-    bid_optimizer = None
+
+# LLM client and agents, built lazily once per worker process. Provider SDK
+# clients own connection pools that must not be shared across a fork, so
+# nothing is constructed at import time (safe with gunicorn --preload).
+_services: Optional[Tuple] = None
+_services_pid: Optional[int] = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> Tuple:
+    """Return (llm_client, bid_generator, bid_optimizer) for this process."""
+    global _services, _services_pid
+    if _services is not None and _services_pid == os.getpid():
+        return _services
+    
+    with _services_lock:
+        if _services is None or _services_pid != os.getpid():
+            try:
+                llm_client = get_llm_client()
+                _services = (llm_client, BidGenerator(llm_client, config), BidOptimizer(llm_client))
+            except Exception as e:
+                print(f"Warning: Could not initialize LLM client: {e}")
+                _services = (None, None, None)
+            _services_pid = os.getpid()
+    return _services
+
+
+def services_ready() -> bool:
+    """Whether this process has already built its LLM client and agents."""
+    return _services is not None and _services_pid == os.getpid()
+
+
+def llm_available() -> bool:
+    """Whether an LLM client is usable, judged from the config until it has been built.
+    
+    Building it imports the provider SDK (0.5-1 s), so health checks don't trigger it.
+    """
+    if services_ready():
+        return _services[0] is not None
+    return bool(getattr(config, f"{config.ai_provider.lower()}_api_key", None))
+
+
+# Header naming the user a request acts for; without it the .env profile and history are used
+USER_ID_HEADER = "X-User-ID"
+
+# The header identifies a user but doesn't authenticate them. Unless it is trusted (behind a
+# proxy that signs users in and sets it), only requests carrying the admin token may send it
+TRUST_USER_HEADER = os.getenv("TRUST_USER_HEADER", "false").lower() == "true"
+
+
+def request_user(http_request: Optional[Request]) -> Optional[str]:
+    """User ID sent with a request, or None for the default profile.
+    
+    Answers 400 if the ID is malformed, and 403 if the header isn't trusted
+    and the request lacks the admin token (see ``TRUST_USER_HEADER``).
+    """
+    user_id = http_request.headers.get(USER_ID_HEADER) if http_request is not None else None
+    if not user_id:
+        return None
+    if not TRUST_USER_HEADER and not has_admin_token(http_request):
+        raise HTTPException(
+            status_code=403,
+            detail=f"{USER_ID_HEADER} requires the admin token unless TRUST_USER_HEADER is enabled"
+        )
+    try:
+        return check_user_id(user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def user_profile(user_id: Optional[str]) -> AppConfig:
+    """Config of a user (their profile over .env), or the .env config for no user."""
+    return profiles.get(user_id) if user_id else config
+
+
+def user_memory(user_id: Optional[str]) -> BidMemory:
+    """Bid history shard of a user, or the default history for no user.
+    
+    Blocking (opening a shard touches its files); async handlers call it
+    through ``run_in_threadpool``, as they do ``user_generator`` and ``user_profile``.
+    """
+    return memory_shards.get(user_id) if user_id else bid_memory
+
+
+def user_generator(bid_generator: Optional[BidGenerator], user_id: Optional[str]) -> Optional[BidGenerator]:
+    """The process's bid generator, writing as ``user_id`` from their history when given."""
+    if bid_generator is None or not user_id:
+        return bid_generator
+    return bid_generator.for_profile(user_profile(user_id), user_memory(user_id))
+
+
+def warm_up():
+    """Build the LLM client, open its connection and load bid history ahead of the first request."""
+    started = time.perf_counter()
+    llm_client, _, _ = get_services()
+    if llm_client:
+        try:
+            llm_client.warm_up()
+        except Exception as e:
+            print(f"⚠️  Error opening LLM connection: {e}")
+    try:
+        bid_memory.load()
+    except Exception as e:
+        print(f"⚠️  Error loading bid history: {e}")
+    print(f"✅ Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+
+# Process pool for bulk parsing, also created lazily once per worker process
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_pid: Optional[int] = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Return this process's parser pool (PARSER_WORKERS processes, default one per CPU)."""
+    global _parse_pool, _parse_pool_pid
+    with _services_lock:
+        if _parse_pool is None or _parse_pool_pid != os.getpid():
+            workers = int(os.getenv("PARSER_WORKERS", "0")) or os.cpu_count() or 1
+            # Spawned workers import only the parser, not this server's threads or clients
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _parse_pool_pid = os.getpid()
+    return _parse_pool
 
 
 class BidRequest(BaseModel):
@@ -51,11 +258,16 @@ class BidRequest(BaseModel):
     api_key: Optional[str] = None
     model: Optional[str] = None
     provider: Optional[str] = None
+    time_remaining: Optional[str] = None  # "Bidding ends in" value, e.g. "2 hours, 5 minutes"
+    force_regenerate: bool = False  # Ignore a detected duplicate and run the full pipeline
 
 
 class SmartBidRequest(BaseModel):
     """Request model for smart bid generation with auto-parsing."""
-    raw_content: str  # The entire pasted content
+    raw_content: Optional[str] = None  # The entire pasted content
+    parse_id: Optional[str] = None  # Handle from /parse-project, sent instead of raw_content
+    edits: Optional[dict] = None  # User corrections to parsed fields, e.g. {"total_bids": 12}
+    force_regenerate: bool = False
 
 
 class BidResponse(BaseModel):
@@ -65,6 +277,246 @@ class BidResponse(BaseModel):
     word_count: int
     confidence_score: float
     optimization: Optional[dict] = None
+    duplicate_of: Optional[dict] = None  # Prior bid when this project was already bid on
+    downgraded: bool = False  # Optimization skipped because the server was overloaded
+    partial: bool = False  # Optimization skipped because the request's time budget ran short
+
+
+# Recent parses, so generation can reuse the preview's parse instead of re-uploading the page.
+# With a shared store (STORE_URL) every worker and node sees them; otherwise each worker
+# process has its own cache, and a parse_id it doesn't know gets a 404.
+if get_store().shared:
+    parse_cache = StoreCache(
+        get_store(), "parse:",
+        ttl=float(os.getenv("PARSE_CACHE_TTL", "600")),
+        encode=lambda parsed: json.dumps(parsed.dict()).encode("utf-8"),
+        decode=lambda raw: ParsedProject(**json.loads(raw))
+    )
+else:
+    parse_cache = TTLCache(
+        max_entries=int(os.getenv("PARSE_CACHE_SIZE", "256")),
+        ttl=float(os.getenv("PARSE_CACHE_TTL", "600"))
+    )
+
+
+def resolve_parsed(request: SmartBidRequest) -> ParsedProject:
+    """Parsed project for a request: the cached parse for its parse_id, else a fresh parse."""
+    parsed = parse_cache.get(request.parse_id) if request.parse_id else None
+    set_attributes(**{"bid.parse_cache_hit": parsed is not None})
+    if parsed is None:
+        if request.raw_content is None:
+            if request.parse_id:
+                raise HTTPException(
+                    status_code=404, detail="Parse expired or not found; send raw_content instead"
+                )
+            raise HTTPException(status_code=400, detail="raw_content or parse_id is required")
+        parsed = ProjectParser.parse(request.raw_content)
+    
+    if request.edits:
+        fields = parsed.dict()
+        unknown = set(request.edits) - set(fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields in edits: {', '.join(sorted(unknown))}")
+        try:
+            # A new object, so the cached parse stays as it was
+            parsed = ParsedProject(**{**fields, **request.edits})
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid edits: {str(e)}")
+    return parsed
+
+
+# Analysis (and optionally drafting) started when a project is parsed, since
+# generation for it usually follows within seconds
+SPECULATIVE_ANALYSIS = os.getenv("SPECULATIVE_ANALYSIS", "true").lower() == "true"
+SPECULATIVE_DRAFT = os.getenv("SPECULATIVE_DRAFT", "false").lower() == "true"
+# Share of each LLM_RATE_LIMIT_PER_MINUTE window that speculation leaves to real requests
+SPECULATIVE_RATE_RESERVE = float(os.getenv("SPECULATIVE_RATE_RESERVE", "0.5"))
+
+
+def generation_keys(parsed: ParsedProject, user_id: Optional[str] = None) -> Tuple[str, str]:
+    """Speculation keys for the analysis and the draft bid of a parsed project, for one user."""
+    project_name = parsed.project_name or "Project"
+    return (
+        project_key("analysis", user_id, project_name, parsed.project_description),
+        project_key("draft", user_id, project_name, parsed.project_description,
+                    parsed.bid_rank, parsed.total_bids, parsed.average_bid),
+    )
+
+
+def speculate(parsed: ParsedProject, user_id: Optional[str] = None):
+    """Start generation work for a just-parsed project before it is requested.
+    
+    Blocking (the first call builds the LLM client and opens the user's
+    history); call it from async code through ``run_in_threadpool``.
+    """
+    if not SPECULATIVE_ANALYSIS or parsed.project_description in PLACEHOLDER_DESCRIPTIONS:
+        return
+    bid_generator = user_generator(get_services()[1], user_id)
+    if not bid_generator:
+        return
+    analysis_key, draft_key = generation_keys(parsed, user_id)
+    project_name = parsed.project_name or "Project"
+    if SPECULATIVE_DRAFT:
+        # The draft includes its own analysis; it is only saved to memory if claimed
+        speculator.start(
+            draft_key, bid_generator.draft, parsed.project_description, project_name,
+            parsed.bid_rank, parsed.total_bids, parsed.average_bid
+        )
+    else:
+        speculator.start(analysis_key, bid_generator.analyzer.analyze, parsed.project_description, project_name)
+
+
+# Admission control in front of the LLM pipeline: a few pipelines run at once and
+# the rest wait earliest-deadline-first, by when bidding on their project closes
+llm_scheduler = DeadlineScheduler(
+    slots=int(os.getenv("LLM_SLOTS", "4")),
+    max_queue=int(os.getenv("LLM_MAX_QUEUE", "32")),
+    downgrade_depth=int(os.getenv("LLM_DOWNGRADE_QUEUE_DEPTH", "8"))
+)
+
+# Pipelines started per minute, counted in the store so the limit covers every node sharing it
+llm_rate_limiter = RateLimiter(get_store(), "llm", int(os.getenv("LLM_RATE_LIMIT_PER_MINUTE", "0")))
+
+
+def speculation_admitted() -> bool:
+    """Count a speculation against the LLM rate limit, only while its reserve for real requests is untouched."""
+    return llm_rate_limiter.try_acquire(math.ceil(llm_rate_limiter.limit * SPECULATIVE_RATE_RESERVE))
+
+
+# Speculative work runs at the lowest priority: outside the scheduler's slots, and only while
+# the scheduler has a free slot (checked by the caller) and the rate limit has room
+speculator = Speculator(
+    max_concurrent=int(os.getenv("SPECULATIVE_MAX_CONCURRENT", "2")),
+    ttl=float(os.getenv("SPECULATIVE_TTL", "120")),
+    admit=speculation_admitted
+)
+
+
+# Time a bid request may take from arrival to response, split between its stages
+REQUEST_BUDGET_SECONDS = float(os.getenv("REQUEST_BUDGET_SECONDS", "120"))
+
+# Optimization is skipped, and the bid returned as partial, with less time than this left
+OPTIMIZE_MIN_SECONDS = float(os.getenv("OPTIMIZE_MIN_SECONDS", "8"))
+
+# How often a queued request checks whether its budget has run out
+QUEUE_POLL_SECONDS = 0.25
+
+
+async def run_scheduled(
+    time_remaining: Optional[str],
+    pipeline: Callable[[bool], Any],
+    http_request: Optional[Request],
+    budget: RequestBudget
+) -> Any:
+    """Run a blocking LLM pipeline in a thread once admitted, answering 429 if refused.
+    
+    ``pipeline`` is called with the admission's downgrade flag. If the client
+    disconnects the budget is cancelled, which stops the pipeline at its next
+    check or streamed chunk (499); running out of budget stops it too (504).
+    A request still queued is simply withdrawn. An admitted one keeps its slot
+    until its thread has stopped, so the slot count stays truthful. Without
+    an ``http_request`` only the budget's deadline applies.
+    """
+    loop = asyncio.get_running_loop()
+    admitted = False
+    
+    async def run():
+        nonlocal admitted
+        if llm_rate_limiter.limit:
+            await loop.run_in_executor(None, llm_rate_limiter.acquire)
+        async with llm_scheduler.slot(deadline_for(time_remaining)) as admission:
+            admitted = True
+            budget.check()  # Time spent queued counts against the budget
+            # The thread runs in this request's context, so pipeline spans join its trace
+            run_pipeline = functools.partial(contextvars.copy_context().run, pipeline, admission.downgrade)
+            return await loop.run_in_executor(None, run_pipeline)
+    
+    async def watch_disconnect():
+        # The body has been read, so the next message for this request is its disconnect
+        while (await http_request.receive())["type"] != "http.disconnect":
+            pass
+        budget.cancel()
+    
+    task = asyncio.ensure_future(run())
+    watcher = asyncio.ensure_future(watch_disconnect()) if http_request is not None else None
+    try:
+        waiting = {task, watcher} - {None}
+        while not task.done():
+            _, waiting = await asyncio.wait(waiting, timeout=QUEUE_POLL_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+            if not admitted and (budget.client_gone or budget.remaining_total() <= 0):
+                task.cancel()
+                break
+        if task.cancelled():
+            raise Cancelled("client disconnected" if budget.client_gone else "time budget exhausted", "queue")
+        return task.result()
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Cancelled as e:
+        if budget.client_gone:
+            raise HTTPException(status_code=499, detail=f"Client closed request ({e})")
+        raise HTTPException(status_code=504, detail=f"Request timed out ({e})")
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if not task.done():  # This handler itself was cancelled, e.g. at shutdown
+            budget.cancel("request aborted")
+            if not admitted:
+                task.cancel()
+
+
+def optimize_within_budget(
+    bid_optimizer: BidOptimizer,
+    result: Any,
+    budget: RequestBudget,
+    downgrade: bool,
+    **context
+) -> Tuple[Optional[dict], bool]:
+    """Optimization of a generated bid, and whether it was skipped for lack of time."""
+    if downgrade:
+        return None, False
+    if budget.remaining_total() < OPTIMIZE_MIN_SECONDS:
+        return None, True
+    try:
+        with budget.stage("optimize"):
+            opt_result = bid_optimizer.optimize(
+                generated_bid=result.bid_text,
+                project_analysis=result.project_analysis.dict(),
+                budget=budget,
+                **context
+            )
+        return opt_result.dict(), False
+    except Cancelled:
+        if budget.client_gone:
+            raise
+        return None, True  # The bid itself is done; return it without suggestions
+    except Exception as opt_error:
+        print(f"Optimization error: {opt_error}")
+        return None, False
+
+
+def find_duplicate(project_description: str, memory: BidMemory = bid_memory) -> Optional[dict]:
+    """Look up a prior bid in ``memory`` for a near-identical project description.
+    
+    Blocking (the first lookup loads the history and builds its indexes);
+    call it from async code through ``run_in_threadpool``.
+    """
+    if not project_description or project_description in PLACEHOLDER_DESCRIPTIONS:
+        return None
+    duplicate = memory.find_duplicate(project_description)
+    set_attributes(**{"bid.duplicate_hit": duplicate is not None})
+    return duplicate
+
+
+def duplicate_response(duplicate: dict) -> BidResponse:
+    """Offer the prior bid and analysis for reuse instead of regenerating."""
+    bid_text = duplicate.get("generated_bid") or ""
+    return BidResponse(
+        bid_text=bid_text,
+        project_analysis=duplicate.get("project_analysis") or {},
+        word_count=len(bid_text.split()),
+        confidence_score=duplicate.get("confidence_score") or 0.0,
+        duplicate_of=duplicate
+    )
 
 
 @app.get("/")
@@ -74,7 +526,7 @@ async def root():
         "message": "AI Bid Writer API",
         "version": "1.0.0",
         "status": "running",
-        "llm_configured": llm_client is not None
+        "llm_configured": llm_available()
     }
 
 
@@ -83,20 +535,27 @@ async def health():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "llm_available": llm_client is not None,
+        "llm_available": llm_available(),
+        "llm_ready": services_ready(),  # False until warm-up or the first bid request builds the client
         "ai_provider": config.ai_provider
     }
 
 
 @app.get("/config")
-async def get_config():
-    """Get current configuration (without API keys)."""
+async def get_config(http_request: Request):
+    """Get current configuration (without API keys), with the requesting user's profile.
+    
+    The user comes from the X-User-ID header, honoured only from trusted callers (see ``request_user``).
+    """
+    user_id = request_user(http_request)
+    profile = await run_in_threadpool(user_profile, user_id)
     return {
-        "your_name": config.your_name,
-        "your_github": config.your_github,
-        "your_skills": config.get_skills_list(),
+        "user_id": user_id,
+        "your_name": profile.your_name,
+        "your_github": profile.your_github,
+        "your_skills": profile.get_skills_list(),
         "ai_provider": config.ai_provider,
-        "default_turnaround": config.default_turnaround,
+        "default_turnaround": profile.default_turnaround,
         "available_providers": ["gemini", "openai", "anthropic"],
         "available_models": {
             "gemini": ["gemini-2.5-flash", "gemini-2.5-flash-lite", "gemini-2.5-pro", "gemini-1.5-flash", "gemini-1.5-pro"],
@@ -106,223 +565,691 @@ async def get_config():
     }
 
 
+@app.put("/profile")
+async def update_profile(fields: dict, http_request: Request):
+    """Save profile fields (your_name, your_skills, ...) for the user in the X-User-ID header.
+    
+    The header is honoured only from trusted callers (see ``request_user``), so
+    nobody can overwrite another user's profile by naming them.
+    """
+    user_id = request_user(http_request)
+    if user_id is None:
+        raise HTTPException(status_code=400, detail=f"{USER_ID_HEADER} header required; the default profile is set in .env")
+    try:
+        await run_in_threadpool(profiles.save, user_id, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid profile: {str(e)}")
+    except StoreError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return await get_config(http_request)
+
+
 @app.post("/generate-bid", response_model=BidResponse)
-async def generate_bid(request: BidRequest):
+async def generate_bid(request: BidRequest, http_request: Request):
     """Generate a bid for the given project."""
+    budget = RequestBudget(REQUEST_BUDGET_SECONDS)
+    user_id = request_user(http_request)
+    _, bid_generator, bid_optimizer = get_services()
     if not bid_generator:
         raise HTTPException(
             status_code=500,
             detail="LLM client not configured. Please set up your API keys in .env file."
         )
+    bid_generator = await run_in_threadpool(user_generator, bid_generator, user_id)
     
-    try:
+    def pipeline(downgrade: bool) -> BidResponse:
         # Generate bid
         result = bid_generator.generate(
             project_description=request.project_description,
             project_name=request.project_name,
             bid_rank=request.bid_rank,
             total_bids=request.total_bids,
-            your_bid_amount=request.your_bid_amount
+            your_bid_amount=request.your_bid_amount,
+            budget=budget
         )
         
-        # Optimize bid
-        optimization = None
-        try:
-            opt_result = bid_optimizer.optimize(
-                generated_bid=result.bid_text,
-                bid_rank=request.bid_rank,
-                total_bids=request.total_bids,
-                your_bid_amount=request.your_bid_amount,
-                winning_bid_amount=request.winning_bid_amount,
-                project_analysis=result.project_analysis.dict()
-            )
-            optimization = opt_result.dict()
-        except Exception as opt_error:
-            print(f"Optimization error: {opt_error}")
+        # Optimize bid (skipped for non-urgent work while the server is overloaded,
+        # or when too little of the time budget is left)
+        optimization, partial = optimize_within_budget(
+            bid_optimizer, result, budget, downgrade,
+            bid_rank=request.bid_rank,
+            total_bids=request.total_bids,
+            your_bid_amount=request.your_bid_amount,
+            winning_bid_amount=request.winning_bid_amount
+        )
         
         return BidResponse(
             bid_text=result.bid_text,
             project_analysis=result.project_analysis.dict(),
             word_count=result.word_count,
             confidence_score=result.confidence_score,
-            optimization=optimization
+            optimization=optimization,
+            downgraded=downgrade,
+            partial=partial
         )
     
+    try:
+        if not request.force_regenerate:
+            duplicate = await run_in_threadpool(find_duplicate, request.project_description, bid_generator.memory)
+            if duplicate:
+                return duplicate_response(duplicate)
+        
+        return await run_scheduled(request.time_remaining, pipeline, http_request, budget)
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/parse-project", response_model=dict)
-async def parse_project(request: SmartBidRequest):
-    """Parse pasted project content and extract all information."""
+async def parse_project(request: SmartBidRequest, http_request: Request):
+    """Parse pasted project content and extract all information.
+    
+    The returned ``parse_id`` can be sent to /smart-generate-bid in place of
+    the content for the next PARSE_CACHE_TTL seconds.
+    """
+    if request.raw_content is None:
+        raise HTTPException(status_code=400, detail="raw_content is required")
+    user_id = request_user(http_request)
     try:
         parsed = ProjectParser.parse(request.raw_content)
-        return {
-            "project_name": parsed.project_name,
-            "project_description": parsed.project_description,
-            "budget_range": parsed.budget_range,
-            "bid_rank": parsed.bid_rank,
-            "total_bids": parsed.total_bids,
-            "average_bid": parsed.average_bid,
-            "time_remaining": parsed.time_remaining,
-            "client_location": parsed.client_location,
-            "client_rating": parsed.client_rating,
-            "required_skills": parsed.required_skills
-        }
+        parse_id = secrets.token_urlsafe(16)
+        parse_cache.put(parse_id, parsed)
+        fields = await parsed_fields(parsed, await run_in_threadpool(user_memory, user_id))
+        if not fields["duplicate_of"] and not llm_scheduler.saturated():
+            await run_in_threadpool(speculate, parsed, user_id)
+        return {"parse_id": parse_id, **fields}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to parse content: {str(e)}")
 
 
+async def parsed_fields(parsed: ParsedProject, memory: BidMemory = bid_memory) -> dict:
+    """Response fields for a parsed project, including any prior duplicate bid in ``memory``."""
+    return {
+        "project_name": parsed.project_name,
+        "project_description": parsed.project_description,
+        "budget_range": parsed.budget_range,
+        "bid_rank": parsed.bid_rank,
+        "total_bids": parsed.total_bids,
+        "average_bid": parsed.average_bid,
+        "time_remaining": parsed.time_remaining,
+        "client_location": parsed.client_location,
+        "client_rating": parsed.client_rating,
+        "required_skills": parsed.required_skills,
+        "truncated": parsed.truncated,
+        "duplicate_of": await run_in_threadpool(find_duplicate, parsed.project_description, memory)
+    }
+
+
+def batch_page(line: bytes, index: int) -> Tuple[Optional[str], str]:
+    """Decode one NDJSON line: {"raw_content": ..., "id": ...} or a bare JSON string."""
+    page = json.loads(line)
+    if isinstance(page, str):
+        return None, page
+    if not isinstance(page, dict) or not isinstance(page.get("raw_content"), str):
+        raise ValueError(f"Line {index + 1}: expected a string or an object with raw_content")
+    page_id = page.get("id")
+    return (str(page_id) if page_id is not None else None), page["raw_content"]
+
+
+@app.post("/parse-projects")
+async def parse_projects(request: Request):
+    """Parse a batch of pages in the process pool, streaming results as NDJSON.
+    
+    Send either NDJSON (one page per line) or multipart/form-data (one page per
+    part). Each output line carries the page's ``index`` and ``id``, in input order.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool()
+    memory = await run_in_threadpool(user_memory, request_user(request))
+    pages = []  # (id, future) in input order; parsing starts as each page arrives
+    
+    def submit(page_id: Optional[str], raw_content: str):
+        pages.append((page_id, loop.run_in_executor(pool, ProjectParser.parse, raw_content)))
+    
+    def cancel_all():
+        for _, future in pages:
+            future.cancel()
+    
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            try:
+                form = await request.form()
+            except (AssertionError, ImportError):
+                raise HTTPException(
+                    status_code=501,
+                    detail="python-multipart package not installed. Run: pip install python-multipart"
+                )
+            for name, value in form.multi_items():
+                if isinstance(value, str):
+                    submit(name, value)
+                else:
+                    submit(value.filename or name, (await value.read()).decode("utf-8", errors="replace"))
+        else:
+            received = 0
+            buffer = b""
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > MAX_BATCH_BYTES:
+                    raise HTTPException(
+                        status_code=413, detail=f"Request body too large (limit {MAX_BATCH_BYTES} bytes)"
+                    )
+                lines = (buffer + chunk).split(b"\n")
+                buffer = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        submit(*batch_page(line, len(pages)))
+            if buffer.strip():
+                submit(*batch_page(buffer, len(pages)))
+    except HTTPException:
+        cancel_all()
+        raise
+    except ValueError as e:
+        cancel_all()
+        raise HTTPException(status_code=400, detail=f"Invalid batch: {str(e)}")
+    
+    # The body is fully read before streaming starts, so the response can't race the request
+    async def results():
+        try:
+            for index, (page_id, future) in enumerate(pages):
+                try:
+                    line = {"index": index, "id": page_id, **(await parsed_fields(await future, memory))}
+                except Exception as e:
+                    line = {"index": index, "id": page_id, "error": f"Failed to parse content: {str(e)}"}
+                yield json.dumps(line) + "\n"
+        finally:
+            cancel_all()
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @app.post("/smart-generate-bid", response_model=BidResponse)
-async def smart_generate_bid(request: SmartBidRequest):
+async def smart_generate_bid(request: SmartBidRequest, http_request: Request):
     """Parse content and generate bid in one step."""
+    budget = RequestBudget(REQUEST_BUDGET_SECONDS)
+    user_id = request_user(http_request)
+    _, bid_generator, bid_optimizer = get_services()
     if not bid_generator:
         raise HTTPException(
             status_code=500,
             detail="LLM client not configured. Please set up your API keys in .env file."
         )
+    bid_generator = await run_in_threadpool(user_generator, bid_generator, user_id)
     
-    try:
-        # Step 1: Parse the content
-        parsed = ProjectParser.parse(request.raw_content)
-        
-        # Step 2: Generate bid using parsed data
-        result = bid_generator.generate(
-            project_description=parsed.project_description,
-            project_name=parsed.project_name or "Project",
-            bid_rank=parsed.bid_rank,
-            total_bids=parsed.total_bids,
-            your_bid_amount=parsed.average_bid
-        )
-        
-        # Step 3: Optimize bid
-        optimization = None
-        try:
-            opt_result = bid_optimizer.optimize(
-                generated_bid=result.bid_text,
+    # Step 1: Reuse the preview's parse when given its parse_id, else parse the content
+    parsed = resolve_parsed(request)
+    
+    def pipeline(downgrade: bool) -> BidResponse:
+        # Step 2: Generate bid using parsed data, joining work speculated at parse time
+        analysis_key, draft_key = generation_keys(parsed, user_id)
+        with budget.stage("generate"):
+            # A speculative draft covers both analysis and writing
+            result = speculator.result(draft_key, budget)
+        set_attributes(**{"bid.speculative_draft_hit": result is not None})
+        if result is not None:
+            bid_generator.record(
+                result, parsed.project_description, parsed.project_name or "Project", parsed.total_bids
+            )
+        else:
+            with budget.stage("analyze"):
+                analysis = speculator.result(analysis_key, budget)
+            set_attributes(**{"bid.speculative_analysis_hit": analysis is not None})
+            result = bid_generator.generate(
+                project_description=parsed.project_description,
+                project_name=parsed.project_name or "Project",
                 bid_rank=parsed.bid_rank,
                 total_bids=parsed.total_bids,
                 your_bid_amount=parsed.average_bid,
-                winning_bid_amount=None,
-                project_analysis=result.project_analysis.dict()
+                analysis=analysis,
+                budget=budget
             )
-            optimization = opt_result.dict()
-        except Exception as opt_error:
-            print(f"Optimization error: {opt_error}")
+        
+        # Step 3: Optimize bid (skipped for non-urgent work while the server is overloaded,
+        # or when too little of the time budget is left)
+        optimization, partial = optimize_within_budget(
+            bid_optimizer, result, budget, downgrade,
+            bid_rank=parsed.bid_rank,
+            total_bids=parsed.total_bids,
+            your_bid_amount=parsed.average_bid,
+            winning_bid_amount=None
+        )
         
         return BidResponse(
             bid_text=result.bid_text,
             project_analysis=result.project_analysis.dict(),
             word_count=result.word_count,
             confidence_score=result.confidence_score,
-            optimization=optimization
+            optimization=optimization,
+            downgraded=downgrade,
+            partial=partial
         )
     
+    try:
+        # Reposted project: offer the earlier bid for reuse or light refinement
+        if not request.force_regenerate:
+            duplicate = await run_in_threadpool(find_duplicate, parsed.project_description, bid_generator.memory)
+            if duplicate:
+                return duplicate_response(duplicate)
+        
+        # Projects closing soonest are served first
+        return await run_scheduled(parsed.time_remaining, pipeline, http_request, budget)
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/refine-bid")
-async def refine_bid(request: dict):
-    """Refine an existing bid with specific modifications."""
-    if not bid_generator:
-        raise HTTPException(status_code=500, detail="LLM client not configured")
+class RefineSessionRequest(BaseModel):
+    """Request model for starting a refinement session."""
+    original_bid: str
+    project_description: str = ""
+    time_remaining: Optional[str] = None
+    api_key: Optional[str] = None
+    model: Optional[str] = None
+    provider: Optional[str] = None
+
+
+class RefineRequest(BaseModel):
+    """Request model for one refinement within a session."""
+    refinement_type: str = "reduce_length"
+    custom_instruction: str = ""
+
+
+# Refinement sessions keep the bid versions and conversation server-side, so a
+# follow-up sends only its instruction. Sessions live in one worker process;
+# an unknown or expired session_id gets a 404 and the client starts a new one.
+refine_sessions = TTLCache(
+    max_entries=int(os.getenv("REFINE_SESSION_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("REFINE_SESSION_TTL", "1800"))  # Refreshed by every refinement
+)
+
+
+class RefineVariantsRequest(RefineSessionRequest):
+    """Request model for refining one bid several ways at once."""
+    original_bid: str = ""
+    session_id: Optional[str] = None  # Branch from this session's latest version instead of original_bid
+    refinement_types: List[str] = Field(default_factory=lambda: list(REFINEMENT_PROMPTS))
+    custom_instruction: str = ""
+    stream: bool = False
+
+
+# Variants of one /refine-bid/variants request generated at once
+REFINE_VARIANTS_CONCURRENCY = int(os.getenv("REFINE_VARIANTS_CONCURRENCY", "3"))
+
+
+def build_refine_session(request: RefineSessionRequest) -> RefinementSession:
+    """New session, with its own LLM client when custom settings are given."""
+    if not request.original_bid:
+        raise HTTPException(status_code=400, detail="Original bid is required")
+    if request.api_key or request.model or request.provider:
+        try:
+            llm_client = create_llm_client(request.provider or config.ai_provider, request.api_key, request.model)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ImportError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    else:
+        llm_client, _, _ = get_services()
+        if not llm_client:
+            raise HTTPException(status_code=500, detail="LLM client not configured")
     
+    return RefinementSession(llm_client, request.original_bid, request.project_description, request.time_remaining)
+
+
+def start_refine_session(request: RefineSessionRequest) -> Tuple[str, RefinementSession]:
+    """Create and store a session."""
+    session = build_refine_session(request)
+    session_id = secrets.token_urlsafe(16)
+    refine_sessions.put(session_id, session)
+    return session_id, session
+
+
+def get_refine_session(session_id: str) -> RefinementSession:
+    """Stored session for ``session_id``, or 404."""
+    session = refine_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Refinement session expired or not found; start a new one")
+    return session
+
+
+async def refine_in_session(session_id: str, session: RefinementSession, request: RefineRequest,
+                            http_request: Optional[Request]) -> dict:
+    """Run one refinement turn under the scheduler and return the new version."""
+    instruction = refinement_instruction(request.refinement_type, request.custom_instruction)
+    budget = RequestBudget(REQUEST_BUDGET_SECONDS)
     try:
-        original_bid = request.get("original_bid", "")
-        refinement_type = request.get("refinement_type", "reduce_length")
-        custom_instruction = request.get("custom_instruction", "")
-        project_description = request.get("project_description", "")
-        custom_api_key = request.get("api_key")
-        custom_model = request.get("model")
-        custom_provider = request.get("provider")
-        
-        if not original_bid:
-            raise HTTPException(status_code=400, detail="Original bid is required")
-        
-        # Get LLM client with custom settings if provided
-        if custom_api_key or custom_model or custom_provider:
-            from src.core.llm_client import LLMClient
-            temp_config = config
-            if custom_provider:
-                temp_config.ai_provider = custom_provider
-            if custom_model:
-                temp_config.gemini_model = custom_model
-            llm_client = LLMClient(
-                provider=custom_provider or config.ai_provider,
-                api_key=custom_api_key or (config.gemini_api_key if (custom_provider or config.ai_provider) == "gemini" else config.openai_api_key),
-                model=custom_model
+        refined_bid = await run_scheduled(
+            session.time_remaining, lambda downgrade: session.refine(instruction, budget), http_request, budget
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error refining bid: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    refine_sessions.put(session_id, session)  # Keep active sessions alive
+    return {"session_id": session_id, "version": len(session.versions) - 1, "refined_bid": refined_bid}
+
+
+@app.post("/refine-bid")
+async def refine_bid(request: dict, http_request: Request):
+    """Refine an existing bid with specific modifications.
+    
+    Also returns a ``session_id``; further refinements of the result can go
+    to /refine-sessions/{session_id}/refine without resending the bid.
+    """
+    session_id, session = start_refine_session(RefineSessionRequest(
+        original_bid=request.get("original_bid", ""),
+        project_description=request.get("project_description", ""),
+        api_key=request.get("api_key"),
+        model=request.get("model"),
+        provider=request.get("provider")
+    ))
+    refinement = RefineRequest(
+        refinement_type=request.get("refinement_type", "reduce_length"),
+        custom_instruction=request.get("custom_instruction", "")
+    )
+    return await refine_in_session(session_id, session, refinement, http_request)
+
+
+@app.post("/refine-bid/variants")
+async def refine_bid_variants(request: RefineVariantsRequest, http_request: Request):
+    """Refine a bid with several refinement types concurrently, in one round-trip.
+    
+    Runs ``refinement_types`` (default: all presets) at most
+    REFINE_VARIANTS_CONCURRENCY at a time, from ``original_bid`` or from the
+    latest version of ``session_id`` (left unchanged). Returns every variant
+    together, or with ``stream`` sends each as an NDJSON line as soon as it is
+    done. Variants that fail carry an ``error`` instead of ``refined_bid``.
+    """
+    unknown = [t for t in request.refinement_types if t != "custom" and t not in REFINEMENT_PROMPTS]
+    if unknown or not request.refinement_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"refinement_types must be a non-empty list of {', '.join(REFINEMENT_PROMPTS)} or custom"
+        )
+    if request.session_id:
+        session = get_refine_session(request.session_id)
+    else:
+        session = build_refine_session(request)
+    instructions = {
+        refinement_type: refinement_instruction(refinement_type, request.custom_instruction)
+        for refinement_type in request.refinement_types  # Repeated types are run once
+    }
+    budget = RequestBudget(REQUEST_BUDGET_SECONDS)
+    
+    if not request.stream:
+        try:
+            variants = await run_scheduled(
+                session.time_remaining,
+                lambda downgrade: refine_variants(session, instructions, REFINE_VARIANTS_CONCURRENCY, budget),
+                http_request,
+                budget
             )
-        else:
-            llm_client = get_llm_client(config)
-        
-        # Build refinement prompt based on type
-        refinement_prompts = {
-            "reduce_length": "Make this bid SHORTER and more concise (max 150 words). Keep the key points but remove fluff. Maintain professional tone.",
-            "make_casual": "Rewrite this bid in a MORE CASUAL, friendly tone. Use contractions, simpler language, but stay professional. Keep it conversational.",
-            "make_formal": "Rewrite this bid in a MORE FORMAL, business-like tone. Use complete sentences, professional language, avoid contractions.",
-            "add_urgency": "Add URGENCY and availability emphasis. Mention you can start immediately, work quickly, and deliver fast results. Keep same length.",
-            "emphasize_skills": "EMPHASIZE your technical skills and expertise more. Add specific tools, frameworks, and technologies. Show deep knowledge.",
-            "add_examples": "Add MORE CONCRETE EXAMPLES of similar work you've done. Be specific about projects and outcomes.",
-            "custom": custom_instruction if custom_instruction else "Improve this bid while maintaining its core message."
-        }
-        
-        refinement_instruction = refinement_prompts.get(refinement_type, refinement_prompts["reduce_length"])
-        
-        system_prompt = f"""You are an expert bid refinement specialist. Your job is improve freelance bids based on specific instructions.
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error refining bid variants: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        return {"variants": [{"refinement_type": key, **variant} for key, variant in variants.items()]}
+    
+    loop = asyncio.get_running_loop()
+    finished: asyncio.Queue = asyncio.Queue()
+    
+    def on_variant(key: str, variant: dict):
+        loop.call_soon_threadsafe(finished.put_nowait, {"refinement_type": key, **variant})
+    
+    # Streaming has begun by the time the request is admitted, so a refusal or
+    # timeout arrives as a final {"error": ..., "status": ...} line
+    async def lines():
+        task = asyncio.ensure_future(run_scheduled(
+            session.time_remaining,
+            lambda downgrade: refine_variants(session, instructions, REFINE_VARIANTS_CONCURRENCY, budget, on_variant),
+            None,  # The response stream notices the disconnect and closes this generator
+            budget
+        ))
+        # Queued after every variant the pipeline reported, since it reports them before returning
+        task.add_done_callback(lambda _: finished.put_nowait(None))
+        try:
+            while True:
+                variant = await finished.get()
+                if variant is None:
+                    break
+                yield json.dumps(variant) + "\n"
+            await task
+        except HTTPException as e:
+            yield json.dumps({"error": e.detail, "status": e.status_code}) + "\n"
+        except Exception as e:
+            print(f"Error refining bid variants: {e}")
+            yield json.dumps({"error": str(e), "status": 500}) + "\n"
+        finally:
+            task.cancel()  # Cancels the budget if the pipeline is still running
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
-IMPORTANT RULES:
-- Keep the Freelancer.com style (start with 'Hi!', use bullets, end with CTA)
-- Maintain accuracy - don't make up skills or experience
-- Keep it natural and authentic
-- Return ONLY the refined bid text, no explanations
 
-Refinement Task: {refinement_instruction}"""
-        
-        user_prompt = f"""Original Bid:
-{original_bid}
+@app.post("/refine-sessions")
+async def create_refine_session(request: RefineSessionRequest):
+    """Start a refinement session holding the bid and project context."""
+    session_id, session = start_refine_session(request)
+    return {"session_id": session_id, "version": 0, "bid": session.current}
 
-Project Context:
-{project_description[:500]}
 
-Refine this bid according to the instructions. Return only the improved bid text."""
-        
-        refined_bid = llm_client.generate(user_prompt, system_prompt=system_prompt, temperature=0.6)
-        refined_bid = refined_bid.strip()
-        
-        # Clean up if LLM added extra formatting
-        if refined_bid.startswith('"'):
-            refined_bid = refined_bid[1:]
-        if refined_bid.endswith('"'):
-            refined_bid = refined_bid[:-1]
-        
-        return {"refined_bid": refined_bid}
+@app.post("/refine-sessions/{session_id}/refine")
+async def refine_session(session_id: str, request: RefineRequest, http_request: Request):
+    """Refine the session's latest version, sending the model only the new instruction."""
+    return await refine_in_session(session_id, get_refine_session(session_id), request, http_request)
+
+
+@app.get("/refine-sessions/{session_id}")
+async def get_refine_session_versions(session_id: str):
+    """All bid versions of a session and the instructions that produced them."""
+    return {"session_id": session_id, **get_refine_session(session_id).to_dict()}
+
+
+@app.delete("/refine-sessions/{session_id}")
+async def delete_refine_session(session_id: str):
+    """End a session."""
+    if refine_sessions.pop(session_id) is None:
+        raise HTTPException(status_code=404, detail="Refinement session expired or not found")
+    return {"deleted": True}
+
+
+@app.websocket("/refine-sessions/ws")
+async def refine_session_socket(websocket: WebSocket):
+    """Refinement session over a WebSocket, one JSON message per step.
+    
+    Send {"action": "start", "original_bid": ..., ...} or {"action": "attach",
+    "session_id": ...}, then {"action": "refine", "refinement_type": ...} as
+    often as needed, waiting for each reply. Replies mirror the HTTP
+    endpoints; failures are sent as {"error": ..., "status": ...}.
+    """
+    await websocket.accept()
+    session_id: Optional[str] = None
+    try:
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action")
+            try:
+                if action == "start":
+                    session_id, session = start_refine_session(RefineSessionRequest(**message))
+                    reply = {"session_id": session_id, "version": 0, "bid": session.current}
+                elif action == "attach":
+                    session_id = message.get("session_id")
+                    reply = {"session_id": session_id, **get_refine_session(session_id).to_dict()}
+                elif action == "refine":
+                    if session_id is None:
+                        raise HTTPException(status_code=400, detail="Send start or attach first")
+                    reply = await refine_in_session(
+                        session_id, get_refine_session(session_id), RefineRequest(**message), None
+                    )
+                else:
+                    raise HTTPException(status_code=400, detail="action must be start, attach or refine")
+            except ValidationError as e:
+                reply = {"error": f"Invalid message: {str(e)}", "status": 400}
+            except HTTPException as e:
+                reply = {"error": e.detail, "status": e.status_code}
+            await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/memory/stats")
+async def get_memory_stats(http_request: Request):
+    """Get bid history statistics (of the X-User-ID user, for trusted callers)."""
+    memory = await run_in_threadpool(user_memory, request_user(http_request))
+    try:
+        # The first call loads the history and builds its indexes; keep that off the event loop
+        return await run_in_threadpool(memory.get_stats)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/memory/shards")
+async def get_memory_shards():
+    """Per-user bid histories loaded in this worker, the limit, and how many were evicted."""
+    return memory_shards.stats()
+
+
+@app.get("/scheduler/stats")
+async def get_scheduler_stats():
+    """LLM pipeline slots, queue depth and admission counters, plus analysis batch sizes."""
+    stats = llm_scheduler.stats()
+    bid_generator = get_services()[1] if services_ready() else None
+    if bid_generator is not None and bid_generator.analyzer.batcher is not None:
+        stats["analysis_batching"] = bid_generator.analyzer.batcher.stats()
+    return stats
+
+
+@app.get("/speculation/stats")
+async def get_speculation_stats():
+    """Speculative work started, claimed, skipped at the concurrency cap, and wasted."""
+    return speculator.stats()
+
+
+# Token for /debug endpoints (and X-User-ID while it isn't trusted), sent as
+# "Authorization: Bearer <token>"; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+MAX_PROFILE_SECONDS = float(os.getenv("MAX_PROFILE_SECONDS", "60"))
+
+
+def has_admin_token(request: Request) -> bool:
+    """Whether the request carries the configured admin token."""
+    if not ADMIN_TOKEN:
+        return False
+    scheme, _, supplied = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and secrets.compare_digest(supplied.encode(), ADMIN_TOKEN.encode())
+
+
+def require_admin(request: Request):
+    """Refuse requests without the admin token (404 when no token is configured)."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not has_admin_token(request):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.get("/debug/profile")
+async def debug_profile(
+    request: Request,
+    seconds: float = 10.0,
+    mode: str = "cpu",
+    output_format: str = Query("collapsed", alias="format"),
+    include_idle: bool = False
+):
+    """Profile the live server for ``seconds`` and return the result as a file.
+    
+    ``mode=cpu`` samples every thread's stack at 100 Hz; ``mode=memory``
+    records, through tracemalloc, the bytes allocated during the window and
+    still live at its end. ``format`` is ``collapsed`` (for flamegraph.pl,
+    inferno or speedscope) or ``speedscope`` (JSON).
+    """
+    require_admin(request)
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {MAX_PROFILE_SECONDS:g}")
+    if mode not in ("cpu", "memory") or output_format not in ("collapsed", "speedscope"):
+        raise HTTPException(status_code=400, detail="mode must be cpu or memory; format collapsed or speedscope")
+    
+    if mode == "cpu":
+        sample = functools.partial(profiling.sample_cpu, seconds, include_idle=include_idle)
+    else:
+        sample = functools.partial(profiling.sample_allocations, seconds)
+    try:
+        # Sampled from a worker thread; the event loop keeps serving meanwhile
+        stacks = await asyncio.get_running_loop().run_in_executor(None, sample)
+    except profiling.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
+    name = f"profile-{mode}-{time.strftime('%Y%m%d-%H%M%S')}"
+    if output_format == "collapsed":
+        body, media_type, filename = profiling.to_collapsed(stacks), "text/plain", f"{name}.folded"
+    else:
+        unit, scale = ("seconds", profiling.SAMPLE_INTERVAL) if mode == "cpu" else ("bytes", 1)
+        body = json.dumps(profiling.to_speedscope(stacks, name, unit, scale))
+        media_type, filename = "application/json", f"{name}.speedscope.json"
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.get("/memory/analytics")
+async def get_memory_analytics(http_request: Request):
+    """Get win rates by time window, project type, skill, competition, bid length and hour."""
+    memory = await run_in_threadpool(user_memory, request_user(http_request))
+    try:
+        return await run_in_threadpool(memory.get_analytics)
     except Exception as e:
-        print(f"Error refining bid: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/memory/stats")
-async def get_memory_stats():
-    """Get bid history statistics."""
+@app.get("/memory/analytics/export")
+async def export_memory_analytics(http_request: Request):
+    """Download the bid history analytics snapshot as Parquet."""
+    memory = await run_in_threadpool(user_memory, request_user(http_request))
     try:
-        stats = bid_memory.get_stats()
-        return stats
+        data = await run_in_threadpool(memory.export_analytics)
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return Response(
+        content=data,
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": "attachment; filename=bid_history.parquet"}
+    )
 
 
 @app.post("/memory/update-result")
-async def update_bid_result(project_name: str, won: bool):
-    """Update whether a bid was won or lost."""
+async def update_bid_result(project_name: str, won: bool, http_request: Request):
+    """Update whether a bid was won or lost (in the X-User-ID user's history, for trusted callers)."""
+    memory = await run_in_threadpool(user_memory, request_user(http_request))
     try:
-        bid_memory.update_bid_result(project_name, won)
+        await run_in_threadpool(memory.update_bid_result, project_name, won)
         return {"success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    parser = argparse.ArgumentParser(description="Run the AI Bid Writer API server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+        help="Number of worker processes (0 = one per CPU core)"
+    )
+    args = parser.parse_args()
+    
+    workers = args.workers or os.cpu_count() or 1
+    if workers > 1:
+        # Multi-process mode needs an import string so each worker loads the app itself
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=workers,
+                    app_dir=str(Path(__file__).parent))
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,67 @@
+"""Compare the single-pass project parser with the regex parser it replaced.
+
+Usage: python parser_benchmark.py [--repeat N] [--pages N]
+
+Times both on a typical page and on large pastes (limits off, so both read
+everything) and checks that they extract the same fields.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.parser import ProjectParser
+from tests.legacy_parser import LegacyProjectParser
+from tests.parser_corpus import large_paste, pages
+
+FIELDS = ("project_name", "project_description", "budget_range", "bid_rank", "total_bids", "average_bid",
+          "time_remaining", "client_location", "client_rating", "required_skills")
+
+
+def single_pass(content: str) -> dict:
+    """Fields from the current parser, with its size and time limits off."""
+    parsed = ProjectParser.parse_text(content, max_chars=len(content) + 1, time_budget=float("inf"))
+    return {field: getattr(parsed, field) for field in FIELDS}
+
+
+def median_ms(parse: Callable[[str], dict], contents: List[str], repeat: int) -> float:
+    """Median over ``repeat`` runs of the time to parse every item of ``contents``, in ms."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for content in contents:
+            parse(content)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    """Print per-case timings for both parsers and whether their fields agree."""
+    parser = argparse.ArgumentParser(description="Benchmark the project parser against the regex parser")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case (the median is reported)")
+    parser.add_argument("--pages", type=int, default=200, help="Pages in the typical-page case")
+    args = parser.parse_args()
+    
+    cases = [
+        ("typical page (x%d)" % args.pages, list(pages(args.pages))),
+        ("large paste (~150 KB)", [large_paste(150_000)]),
+        ("large paste (~1.5 MB)", [large_paste(1_500_000)]),
+    ]
+    print(f"  {'case':<24} {'regex ms':>10} {'single ms':>10} {'speedup':>8}  fields")
+    mismatches = 0
+    for name, contents in cases:
+        same = all(LegacyProjectParser.parse(content) == single_pass(content) for content in contents)
+        mismatches += not same
+        legacy = median_ms(LegacyProjectParser.parse, contents, args.repeat)
+        current = median_ms(single_pass, contents, args.repeat)
+        print(f"  {name:<24} {legacy:10.1f} {current:10.1f} {legacy / current:7.1f}x  {'same' if same else 'DIFFER'}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
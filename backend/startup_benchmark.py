@@ -0,0 +1,101 @@
+"""Measure cold start: import time per module and time to the first healthy response.
+
+Usage: python startup_benchmark.py [--timeout SECONDS] [--no-warmup]
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).parent
+
+# Modules whose import time is reported (top-level packages and this app's modules)
+REPORTED_MODULES = re.compile(
+    r"^(main|src(\..+)?|fastapi|starlette|pydantic|numpy|dotenv|uvicorn|openai|anthropic|google\.genai)$"
+)
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_times() -> List[Tuple[str, float, float]]:
+    """(module, self ms, cumulative ms) for reported modules imported by ``import main``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match and REPORTED_MODULES.match(match.group(4)):
+            times.append((match.group(4), int(match.group(1)) / 1000, int(match.group(2)) / 1000))
+    return sorted(times, key=lambda t: -t[2])
+
+
+def free_port() -> int:
+    """An unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_health(port: int) -> Optional[dict]:
+    """The /health response, or None if the server isn't answering yet."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+            return json.loads(response.read())
+    except (OSError, ValueError):
+        return None
+
+
+def time_to_healthy(timeout: float, warmup: bool) -> Tuple[Optional[float], Optional[float]]:
+    """Seconds from launching the server to its first healthy response, and to ``llm_ready``."""
+    port = free_port()
+    env = dict(os.environ, WARMUP="true" if warmup else "false")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "main.py", "--port", str(port), "--host", "127.0.0.1"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    healthy = ready = None
+    try:
+        while time.perf_counter() - started < timeout and server.poll() is None:
+            health = get_health(port)
+            if health and healthy is None:
+                healthy = time.perf_counter() - started
+            if health and health.get("llm_ready"):
+                ready = time.perf_counter() - started
+                break
+            if healthy is not None and not (warmup and health and health.get("llm_available")):
+                break  # Nothing will build the client without a request
+            time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+    return healthy, ready
+
+
+def main():
+    """Print the import profile and startup timings."""
+    parser = argparse.ArgumentParser(description="Measure AI Bid Writer API cold start")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--no-warmup", action="store_true", help="Start the server with WARMUP=false")
+    args = parser.parse_args()
+    
+    print("Import time (ms)               self   cumulative")
+    for module, own, cumulative in import_times():
+        print(f"  {module:<28} {own:7.1f} {cumulative:10.1f}")
+    
+    healthy, ready = time_to_healthy(args.timeout, not args.no_warmup)
+    print(f"\nFirst healthy response: {f'{healthy:.2f}s' if healthy is not None else 'timed out'}")
+    if ready is not None:
+        print(f"LLM client ready:       {ready:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Rank a feed of project pages locally and draft bids for the best few.
+
+Usage: python triage.py FEED [--top K] [--checkpoint FILE] [--output FILE] [--user ID] [--no-generate]
+
+FEED is a directory of saved pages, an NDJSON file ({"raw_content": ..., "id": ...}
+or a bare string per line) or "-" for NDJSON on stdin. Rerunning with the same
+checkpoint skips projects already scored and bids already written.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.config import check_user_id, config, profiles
+from src.core.triage import Checkpoint, ProjectScorer, StageStats, draft_bids, read_feed, score_feed, top_candidates
+
+
+def main():
+    """Score the feed, print the top candidates and their bids, then per-stage throughput."""
+    parser = argparse.ArgumentParser(description="Triage a feed of Freelancer project pages")
+    parser.add_argument("feed", help="Directory of pages, NDJSON file, or - for stdin")
+    parser.add_argument("--top", type=int, default=10, help="Candidates that get a bid (default 10)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: FEED.checkpoint.jsonl)")
+    parser.add_argument("--output", help="Write the bids as NDJSON here instead of printing them")
+    parser.add_argument("--user", type=check_user_id, help="Write as this user, from their profile and bid history")
+    parser.add_argument("--skills", help="Comma-separated skills (default: the profile's)")
+    parser.add_argument("--min-budget", type=float, help="Skip projects with a lower budget midpoint")
+    parser.add_argument("--max-bids", type=int, help="Skip projects with more bids than this")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: one per CPU)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Bids written at once (default 2)")
+    parser.add_argument("--no-generate", action="store_true", help="Only rank; write no bids")
+    args = parser.parse_args()
+    
+    checkpoint_path = args.checkpoint or (None if args.feed == "-" else f"{args.feed.rstrip('/')}.checkpoint.jsonl")
+    profile = profiles.get(args.user) if args.user else config
+    skills = args.skills.split(",") if args.skills else profile.get_skills_list()
+    scorer = ProjectScorer(skills, min_budget=args.min_budget, max_bids=args.max_bids)
+    checkpoint = Checkpoint(checkpoint_path)
+    stats = StageStats()
+    started = time.perf_counter()
+    status = 0
+    
+    try:
+        skipped = score_feed(read_feed(args.feed), scorer, checkpoint, stats, workers=args.workers)
+        if skipped:
+            print(f"Resumed: {skipped} projects already scored in {checkpoint_path}")
+        
+        candidates = top_candidates(checkpoint, args.top)
+        print(f"\nTop {len(candidates)} of {len(checkpoint.scored)} projects")
+        print(f"  {'score':>5}  {'bids':>4}  {'budget':>8}  project")
+        for record in candidates:
+            project = record["project"]
+            amount = f"{record['budget_amount']:.0f}" if record["budget_amount"] is not None else "?"
+            print(f"  {record['score']:5.1f}  {project['total_bids'] if project['total_bids'] is not None else '?':>4}  "
+                  f"{amount:>8}  {(project['project_name'] or record['key'])[:60]}")
+            print(f"  {'':5}  {'':4}  {'':8}  skills: {', '.join(record['matched_skills'])}")
+        
+        if candidates and not args.no_generate:
+            from src.agents.bid_generator import BidGenerator
+            from src.core.llm_client import get_llm_client
+            from src.core.memory import bid_memory, memory_shards
+            memory = memory_shards.get(args.user) if args.user else bid_memory
+            bid_generator = BidGenerator(get_llm_client(), profile, memory)
+            bids = draft_bids(candidates, bid_generator, checkpoint, stats, concurrency=args.concurrency)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    for bid in bids:
+                        f.write(json.dumps(bid) + "\n")
+                print(f"\nWrote {len(bids)} bids to {args.output}")
+            else:
+                for bid in bids:
+                    print(f"\n=== {bid['key']} (score {bid['score']}) ===")
+                    print(bid.get("bid_text") or f"⚠️  {bid['error']}")
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun with the same checkpoint ({checkpoint_path}) to resume")
+        status = 130
+    except (ValueError, ImportError) as e:
+        # Bad feed line or no usable LLM provider; everything done so far is checkpointed
+        print(f"⚠️  Error: {e}")
+        status = 1
+    finally:
+        checkpoint.close()
+    
+    print("\nStage            items   seconds   items/min")
+    for stage, items, seconds, rate in stats.rows():
+        print(f"  {stage:<14} {items:6d} {seconds:9.2f} {rate:11.0f}")
+    print(f"  {'total':<14} {'':6} {time.perf_counter() - started:9.2f}")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ function BidGenerator() {
   const [loading, setLoading] = useState(false);
   const [parsing, setParsing] = useState(false);
   const [parsedData, setParsedData] = useState(null);
+  const [parsedContent, setParsedContent] = useState(null); // Content the parse_id belongs to
   const [error, setError] = useState(null);
   const [copied, setCopied] = useState(false);
   const [extractionSteps, setExtractionSteps] = useState([]);
@@ -32,6 +33,8 @@ function BidGenerator() {
   const [notification, setNotification] = useState(null);
   const [showCustomRefine, setShowCustomRefine] = useState(false);
   const [customInstruction, setCustomInstruction] = useState('');
+  const [refineSession, setRefineSession] = useState(null); // { id, bid }: server-side refinement session
+  const [variants, setVariants] = useState(null); // Variants from "Compare All", filled in as they stream in
   const [settings, setSettings] = useState({
     apiKey: localStorage.getItem('custom_api_key') || '',
     provider: localStorage.getItem('ai_provider') || 'gemini',
@@ -68,6 +71,7 @@ function BidGenerator() {
         raw_content: smartContent
       });
       setParsedData(response.data);
+      setParsedContent(smartContent);
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to parse content');
     } finally {
@@ -75,7 +79,8 @@ function BidGenerator() {
     }
   };
 
-  const handleSmartGenerate = async () => {
+  // forceRegenerate: write a new bid even if this project was bid on before
+  const handleSmartGenerate = async (forceRegenerate = false) => {
     if (!smartContent.trim()) {
       setError('Please paste project content');
       return;
@@ -109,9 +114,21 @@ function BidGenerator() {
 
     try {
       setExtractionSteps(prev => [...prev, { text: steps[steps.length - 1], complete: false }]);
-      const response = await axios.post(`${API_URL}/smart-generate-bid`, {
-        raw_content: smartContent
-      });
+      // Reuse the preview's parse instead of uploading the page again
+      const parseId = parsedContent === smartContent ? parsedData?.parse_id : null;
+      const force = forceRegenerate ? { force_regenerate: true } : {};
+      let response;
+      try {
+        response = await axios.post(`${API_URL}/smart-generate-bid`,
+          parseId ? { parse_id: parseId, ...force } : { raw_content: smartContent, ...force });
+      } catch (err) {
+        if (!parseId || err.response?.status !== 404) throw err;
+        // The parse expired (or another server worker handled the preview)
+        response = await axios.post(`${API_URL}/smart-generate-bid`, {
+          raw_content: smartContent,
+          ...force
+        });
+      }
       setExtractionSteps(prev => {
         const updated = [...prev];
         updated[updated.length - 1].complete = true;
@@ -134,8 +151,12 @@ function BidGenerator() {
     }));
   };
 
-  const handleSubmit = async (e) => {
+  const handleSubmit = (e) => {
     e.preventDefault();
+    generateManual();
+  };
+
+  const generateManual = async (forceRegenerate = false) => {
     setLoading(true);
     setError(null);
     setResult(null);
@@ -147,7 +168,8 @@ function BidGenerator() {
         bid_rank: formData.bid_rank ? parseInt(formData.bid_rank) : null,
         total_bids: formData.total_bids ? parseInt(formData.total_bids) : null,
         your_bid_amount: formData.your_bid_amount || null,
-        winning_bid_amount: formData.winning_bid_amount || null
+        winning_bid_amount: formData.winning_bid_amount || null,
+        force_regenerate: forceRegenerate
       };
 
       const response = await axios.post(`${API_URL}/generate-bid`, payload);
@@ -159,6 +181,15 @@ function BidGenerator() {
     }
   };
 
+  // The result is a bid reused from a near-duplicate project; write a fresh one instead
+  const handleRegenerate = () => {
+    if (mode === 'smart') {
+      handleSmartGenerate(true);
+    } else {
+      generateManual(true);
+    }
+  };
+
   const handleCopy = () => {
     if (result?.bid_text) {
       navigator.clipboard.writeText(result.bid_text);
@@ -170,6 +201,7 @@ function BidGenerator() {
   const handleReset = () => {
     setSmartContent('');
     setParsedData(null);
+    setParsedContent(null);
     setFormData({
       project_name: '',
       project_description: '',
@@ -196,9 +228,125 @@ function BidGenerator() {
     showNotification('⚙️ Settings saved! Changes will apply to next bid generation.', 'success');
   };
 
+  // Continue the server-side session while the bid shown is its latest version, so
+  // only the instruction is sent; otherwise, or once it has expired, start a new one
+  const requestRefinement = async (refinementType, instruction = '') => {
+    if (refineSession && refineSession.bid === result.bid_text) {
+      try {
+        const response = await axios.post(`${API_URL}/refine-sessions/${refineSession.id}/refine`, {
+          refinement_type: refinementType,
+          custom_instruction: instruction
+        });
+        setRefineSession({ id: refineSession.id, bid: response.data.refined_bid });
+        return response.data.refined_bid;
+      } catch (err) {
+        if (err.response?.status !== 404) throw err;
+      }
+    }
+
+    const payload = {
+      original_bid: result.bid_text,
+      refinement_type: refinementType,
+      custom_instruction: instruction,
+      project_description: parsedData?.project_description || formData.project_description || ''
+    };
+
+    // Add custom settings if enabled
+    if (settings.useCustomKey && settings.apiKey) {
+      payload.api_key = settings.apiKey;
+      payload.provider = settings.provider;
+      payload.model = settings.model;
+    }
+
+    const response = await axios.post(`${API_URL}/refine-bid`, payload);
+    setRefineSession({ id: response.data.session_id, bid: response.data.refined_bid });
+    return response.data.refined_bid;
+  };
+
+  // Request every preset refinement at once and show each variant as soon as it arrives
+  const handleCompareVariants = async () => {
+    setRefining(true);
+    setShowRefineMenu(false);
+    setError(null);
+    setVariants([]);
+
+    const streamVariants = async (payload) => {
+      const response = await fetch(`${API_URL}/refine-bid/variants`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ...payload, stream: true })
+      });
+      if (!response.ok) {
+        const body = await response.json().catch(() => ({}));
+        const err = new Error(body.detail || 'Failed to refine bid');
+        err.status = response.status;
+        throw err;
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        for (const line of lines.filter(l => l.trim())) {
+          const variant = JSON.parse(line);
+          if (!variant.refinement_type) throw new Error(variant.error || 'Failed to refine bid');
+          setVariants(prev => [...(prev || []), variant]);
+        }
+      }
+    };
+
+    const payload = {
+      original_bid: result.bid_text,
+      project_description: parsedData?.project_description || formData.project_description || ''
+    };
+    if (settings.useCustomKey && settings.apiKey) {
+      payload.api_key = settings.apiKey;
+      payload.provider = settings.provider;
+      payload.model = settings.model;
+    }
+
+    try {
+      try {
+        // Branch from the session when it holds this bid, reusing its conversation
+        if (refineSession && refineSession.bid === result.bid_text) {
+          await streamVariants({ ...payload, session_id: refineSession.id });
+        } else {
+          await streamVariants(payload);
+        }
+      } catch (err) {
+        if (err.status !== 404) throw err;
+        await streamVariants(payload);
+      }
+    } catch (err) {
+      setError(err.message);
+      showNotification('❌ Failed to refine bid', 'error');
+    } finally {
+      setRefining(false);
+    }
+  };
+
+  const handleUseVariant = (variant) => {
+    setResult(prev => ({
+      ...prev,
+      bid_text: variant.refined_bid
+    }));
+    setVariants(null);
+    showNotification('✨ Bid refined successfully!', 'success');
+  };
+
   const handleRefineBid = async (refinementType) => {
     if (!result?.bid_text) return;
     
+    if (refinementType === 'compare_all') {
+      handleCompareVariants();
+      return;
+    }
+
     // If custom, show input dialog
     if (refinementType === 'custom') {
       setShowCustomRefine(true);
@@ -211,25 +359,12 @@ function BidGenerator() {
     setError(null);
 
     try {
-      const payload = {
-        original_bid: result.bid_text,
-        refinement_type: refinementType,
-        project_description: parsedData?.project_description || formData.project_description || ''
-      };
-
-      // Add custom settings if enabled
-      if (settings.useCustomKey && settings.apiKey) {
-        payload.api_key = settings.apiKey;
-        payload.provider = settings.provider;
-        payload.model = settings.model;
-      }
-
-      const response = await axios.post(`${API_URL}/refine-bid`, payload);
+      const refinedBid = await requestRefinement(refinementType);
       
       // Update result with refined bid
       setResult(prev => ({
         ...prev,
-        bid_text: response.data.refined_bid
+        bid_text: refinedBid
       }));
       showNotification('✨ Bid refined successfully!', 'success');
     } catch (err) {
@@ -251,24 +386,11 @@ function BidGenerator() {
     setError(null);
 
     try {
-      const payload = {
-        original_bid: result.bid_text,
-        refinement_type: 'custom',
-        custom_instruction: customInstruction,
-        project_description: parsedData?.project_description || formData.project_description || ''
-      };
-
-      if (settings.useCustomKey && settings.apiKey) {
-        payload.api_key = settings.apiKey;
-        payload.provider = settings.provider;
-        payload.model = settings.model;
-      }
-
-      const response = await axios.post(`${API_URL}/refine-bid`, payload);
+      const refinedBid = await requestRefinement('custom', customInstruction);
       
       setResult(prev => ({
         ...prev,
-        bid_text: response.data.refined_bid
+        bid_text: refinedBid
       }));
       setCustomInstruction('');
       showNotification('✨ Custom refinement applied!', 'success');
@@ -287,7 +409,8 @@ function BidGenerator() {
     { id: 'add_urgency', label: '⚡ Add Urgency', desc: 'Emphasize availability' },
     { id: 'emphasize_skills', label: '🎯 Emphasize Skills', desc: 'Highlight expertise' },
     { id: 'add_examples', label: '📝 Add Examples', desc: 'Include work samples' },
-    { id: 'custom', label: '✨ Custom', desc: 'Your own instructions' }
+    { id: 'custom', label: '✨ Custom', desc: 'Your own instructions' },
+    { id: 'compare_all', label: '👀 Compare All', desc: 'Preview every style at once' }
   ];
 
   return (
@@ -523,7 +646,7 @@ function BidGenerator() {
                 <button 
                   type="button" 
                   className="btn btn-primary" 
-                  onClick={handleSmartGenerate}
+                  onClick={() => handleSmartGenerate()}
                   disabled={loading || !smartContent.trim()}
                 >
                   {loading ? (
@@ -672,9 +795,23 @@ function BidGenerator() {
                 </div>
               </div>
 
+              {result.duplicate_of && (
+                <div className="alert alert-duplicate">
+                  <div>
+                    <strong>♻️ You already bid on a near-identical project</strong>
+                    {' '}("{result.duplicate_of.project_name}"
+                    {result.duplicate_of.timestamp && `, ${new Date(result.duplicate_of.timestamp).toLocaleDateString()}`},
+                    {' '}{Math.round(result.duplicate_of.similarity * 100)}% similar). Below is the bid you sent then.
+                  </div>
+                  <button className="btn btn-secondary" onClick={handleRegenerate} disabled={loading}>
+                    {loading ? '⏳ Generating...' : '✨ Regenerate anyway'}
+                  </button>
+                </div>
+              )}
+
               <div className="bid-output">
                 <div className="bid-header">
-                  <h3>📝 Generated Bid</h3>
+                  <h3>{result.duplicate_of ? '📝 Previous Bid' : '📝 Generated Bid'}</h3>
                   <div className="bid-actions">
                     <button className="btn btn-copy" onClick={handleCopy}>
                       {copied ? '✓ Copied!' : '📋 Copy'}
@@ -707,6 +844,33 @@ function BidGenerator() {
                 <div className="bid-text">{result.bid_text}</div>
               </div>
 
+              {variants && (
+                <div className="info-card">
+                  <div className="bid-header">
+                    <h4>👀 Refinement Variants</h4>
+                    <button className="btn btn-copy" onClick={() => setVariants(null)}>✕ Close</button>
+                  </div>
+                  {variants.length === 0 && <p className="refine-desc">⏳ Generating variants...</p>}
+                  {variants.map(variant => (
+                    <div key={variant.refinement_type} className="variant">
+                      <div className="bid-header">
+                        <span className="refine-label">
+                          {refinementOptions.find(o => o.id === variant.refinement_type)?.label || variant.refinement_type}
+                        </span>
+                        {variant.refined_bid && (
+                          <button className="btn btn-refine" onClick={() => handleUseVariant(variant)}>
+                            Use this
+                          </button>
+                        )}
+                      </div>
+                      {variant.refined_bid
+                        ? <div className="bid-text">{variant.refined_bid}</div>
+                        : <p className="refine-desc">⚠️ {variant.error}</p>}
+                    </div>
+                  ))}
+                </div>
+              )}
+
               {result.project_analysis.matched_skills?.length > 0 && (
                 <div className="info-card">
                   <h4>✅ Matched Skills</h4>
@@ -1,7 +1,36 @@
 """Project description analyzer."""
-from typing import Dict, List
+import copy
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pydantic import BaseModel
 
+from ..core.batching import MicroBatcher
+from ..core.budget import RequestBudget
+from ..core.skills import skill_index
+from ..core.tracing import set_attributes, traced
+
+# Analyses requested within this window of each other share one LLM call, up to
+# ANALYSIS_BATCH_SIZE of them (1 turns batching off). Kept small so a batch's
+# JSON fits the providers' 2000-token output limit.
+ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", "4"))
+ANALYSIS_BATCH_WINDOW = float(os.getenv("ANALYSIS_BATCH_WINDOW_MS", "25")) / 1000
+
+BATCH_SYSTEM_PROMPT = """You are an expert freelance project analyzer. Extract key information from several project descriptions at once.
+
+For EACH project, return an object with these fields:
+- index: The project's number as given
+- project_type: Type of project (e.g., "Web Scraping", "Web Development", "Data Entry", "Image Processing")
+- required_skills: List of required technical skills
+- key_requirements: Main requirements from the client
+- estimated_complexity: "low", "medium", or "high"
+- estimated_budget_range: Estimated budget (e.g., "$50-150", "₹5000-10000")
+- deliverables: What the client expects to receive
+- special_notes: Important details like deadlines, tools, or specific constraints
+
+Return ONLY a valid JSON array with one object per project, in project order, no other text. Keep each project's analysis independent of the others."""
+
 
 class ProjectAnalysis(BaseModel):
     """Project analysis result."""
@@ -19,16 +48,42 @@ class ProjectAnalysis(BaseModel):
 class ProjectAnalyzer:
     """Analyzes project descriptions to extract key information."""
     
-    def __init__(self, llm_client, user_skills: List[str]):
+    def __init__(self, llm_client, user_skills: List[str], batch_size: int = ANALYSIS_BATCH_SIZE,
+                 batch_window: float = ANALYSIS_BATCH_WINDOW):
         """Initialize analyzer."""
         self.llm = llm_client
         self.user_skills = user_skills
+        self.skill_index = skill_index(tuple(user_skills))
+        self.batcher = MicroBatcher(
+            self._analyze_batch, max_size=batch_size, window=batch_window, name="analysis-batch"
+        ) if batch_size > 1 else None
+    
+    def for_skills(self, user_skills: List[str]) -> "ProjectAnalyzer":
+        """Analyzer for another user's skills, sharing this one's LLM client and batcher."""
+        if list(user_skills) == list(self.user_skills):
+            return self
+        analyzer = copy.copy(self)
+        analyzer.user_skills = list(user_skills)
+        analyzer.skill_index = skill_index(tuple(user_skills))
+        return analyzer
     
-    def analyze(self, project_description: str, project_name: str = "") -> ProjectAnalysis:
-        """Analyze project description and extract key information."""
+    @traced("ProjectAnalyzer.analyze")
+    def analyze(self, project_description: str, project_name: str = "",
+                budget: Optional[RequestBudget] = None) -> ProjectAnalysis:
+        """Analyze project description and extract key information.
+        
+        Analyses requested together from several threads share one LLM call.
+        """
+        if self.batcher is None or self._missing(project_description):
+            return self.analyze_one(project_description, project_name, budget)
+        return self.batcher.submit((project_description, project_name, tuple(self.user_skills)), budget)
+    
+    def analyze_one(self, project_description: str, project_name: str = "",
+                    budget: Optional[RequestBudget] = None) -> ProjectAnalysis:
+        """Analyze one project with its own LLM call."""
         
         # Handle empty or missing descriptions
-        if not project_description or project_description.strip() == "" or "No project description found" in project_description:
+        if self._missing(project_description):
             return ProjectAnalysis(
                 project_type="Unknown Project Type",
                 required_skills=[],
@@ -63,43 +118,12 @@ Available Skills: {', '.join(self.user_skills)}
 
 Analyze this project and return the information in JSON format."""
 
-        response = self.llm.generate(user_prompt, system_prompt=system_prompt, temperature=0.3)
+        response = self.llm.generate(user_prompt, system_prompt=system_prompt, temperature=0.3, budget=budget)
         
         # Parse JSON response
-        import json
         try:
-            # Clean response if needed
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
-            
-            data = json.loads(response)
-            
-            # Calculate skill match
-            required_skills_lower = [s.lower() for s in data.get("required_skills", [])]
-            user_skills_lower = [s.lower() for s in self.user_skills]
-            
-            matched = [skill for skill in data.get("required_skills", []) 
-                      if skill.lower() in user_skills_lower]
-            
-            match_score = (len(matched) / len(required_skills_lower) * 100) if required_skills_lower else 0
-            
-            return ProjectAnalysis(
-                project_type=data.get("project_type", "General"),
-                required_skills=data.get("required_skills", []),
-                key_requirements=data.get("key_requirements", []),
-                estimated_complexity=data.get("estimated_complexity", "medium"),
-                estimated_budget_range=data.get("estimated_budget_range", "Not specified"),
-                deliverables=data.get("deliverables", []),
-                special_notes=data.get("special_notes", []),
-                matched_skills=matched,
-                skill_match_score=round(match_score, 1)
-            )
+            data = json.loads(self._strip_fences(response))
+            return self._from_data(data)
         except json.JSONDecodeError as e:
             # Fallback to basic analysis
             return ProjectAnalysis(
@@ -113,3 +137,122 @@ Analyze this project and return the information in JSON format."""
                 matched_skills=[],
                 skill_match_score=0.0
             )
+    
+    @traced("ProjectAnalyzer.analyze_many")
+    def analyze_many(self, projects: List[Tuple[str, str]],
+                     budget: Optional[RequestBudget] = None) -> List[ProjectAnalysis]:
+        """Analyze several (description, name) projects with one LLM call returning a JSON array.
+        
+        Projects missing from the reply, or malformed in it, are analyzed one
+        by one instead.
+        """
+        if len(projects) == 1:
+            return [self.analyze_one(*projects[0], budget)]
+        set_attributes(**{"analysis.batch_size": len(projects)})
+        
+        sections = "\n\n".join(
+            f"### Project {index}\nProject Name: {name}\n\nProject Description:\n{description}"
+            for index, (description, name) in enumerate(projects, start=1)
+        )
+        user_prompt = f"""{sections}
+
+Available Skills: {', '.join(self.user_skills)}
+
+Analyze each of these {len(projects)} projects and return a JSON array of {len(projects)} objects."""
+        
+        response = self.llm.generate(user_prompt, system_prompt=BATCH_SYSTEM_PROMPT, temperature=0.3, budget=budget)
+        
+        results: List[Optional[ProjectAnalysis]] = [None] * len(projects)
+        for position, data in enumerate(self._json_objects(self._strip_fences(response))):
+            index = data.get("index", position + 1) if isinstance(data, dict) else None
+            if isinstance(index, int) and 1 <= index <= len(projects) and results[index - 1] is None:
+                try:
+                    results[index - 1] = self._from_data(data)
+                except (ValueError, TypeError, AttributeError):
+                    continue  # Wrong field types; analyzed on its own below
+        
+        missing = [index for index, analysis in enumerate(results) if analysis is None]
+        set_attributes(**{"analysis.batch_fallbacks": len(missing)})
+        if missing:
+            print(f"⚠️  Batch analysis returned {len(projects) - len(missing)}/{len(projects)} results; analyzing the rest one by one")
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                analyses = pool.map(lambda index: self.analyze_one(*projects[index], budget), missing)
+                for index, analysis in zip(missing, analyses):
+                    results[index] = analysis
+        return results
+    
+    def _analyze_batch(self, entries: List[Tuple[Tuple[str, str, Tuple[str, ...]], Optional[RequestBudget]]]) -> List[ProjectAnalysis]:
+        """Run a micro-batch, one LLM call per skill list in it (users' batches run side by side)."""
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for position, ((_, _, skills), _) in enumerate(entries):
+            groups.setdefault(skills, []).append(position)
+        
+        def run_group(skills: Tuple[str, ...], positions: List[int]) -> List[ProjectAnalysis]:
+            # Allowed as long as the group's most patient member waits, until all of them give up
+            budgets = [entries[position][1] for position in positions]
+            budget = RequestBudget.shared(budgets) if all(budgets) else None
+            projects = [entries[position][0][:2] for position in positions]
+            return self.for_skills(list(skills)).analyze_many(projects, budget)
+        
+        results: List[Optional[ProjectAnalysis]] = [None] * len(entries)
+        if len(groups) == 1:
+            (skills, positions), = groups.items()
+            results = run_group(skills, positions)
+        else:
+            with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+                for positions, analyses in zip(groups.values(), pool.map(run_group, groups.keys(), groups.values())):
+                    for position, analysis in zip(positions, analyses):
+                        results[position] = analysis
+        return results
+    
+    @staticmethod
+    def _json_objects(text: str) -> Iterator[Any]:
+        """Elements of the JSON array in ``text``, stopping at the first malformed or cut-off one."""
+        decoder = json.JSONDecoder()
+        position = text.find("[") + 1
+        if position == 0:
+            return
+        while position < len(text):
+            while position < len(text) and text[position] in " \t\r\n,":
+                position += 1
+            if position >= len(text) or text[position] == "]":
+                return
+            try:
+                value, position = decoder.raw_decode(text, position)
+            except json.JSONDecodeError:
+                return
+            yield value
+    
+    @staticmethod
+    def _missing(project_description: str) -> bool:
+        """Whether there is no real description to analyze."""
+        return not project_description or project_description.strip() == "" or "No project description found" in project_description
+    
+    @staticmethod
+    def _strip_fences(response: str) -> str:
+        """LLM reply without surrounding whitespace and Markdown code fences."""
+        response = response.strip()
+        if response.startswith("```json"):
+            response = response[7:]
+        if response.startswith("```"):
+            response = response[3:]
+        if response.endswith("```"):
+            response = response[:-3]
+        return response.strip()
+    
+    def _from_data(self, data: Dict) -> ProjectAnalysis:
+        """Analysis from the LLM's JSON fields, with your matching skills."""
+        # Calculate skill match ("Python 3", "py" and "python programming" all count as Python)
+        matched, match_score = self.skill_index.score(data.get("required_skills", []))
+        
+        return ProjectAnalysis(
+            project_type=data.get("project_type", "General"),
+            required_skills=data.get("required_skills", []),
+            key_requirements=data.get("key_requirements", []),
+            estimated_complexity=data.get("estimated_complexity", "medium"),
+            estimated_budget_range=data.get("estimated_budget_range", "Not specified"),
+            deliverables=data.get("deliverables", []),
+            special_notes=data.get("special_notes", []),
+            matched_skills=matched,
+            skill_match_score=round(match_score, 1)
+        )
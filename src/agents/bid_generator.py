@@ -1,10 +1,13 @@
 """Main bid generator agent."""
+import copy
 from typing import Optional, Dict
 from pydantic import BaseModel
 
 from .analyzer import ProjectAnalyzer, ProjectAnalysis
 from .optimizer import BidOptimizer
-from ..core.memory import bid_memory
+from ..core.budget import RequestBudget
+from ..core.memory import BidMemory, bid_memory
+from ..core.tracing import span
 
 
 class GeneratedBid(BaseModel):
@@ -18,28 +21,67 @@ class GeneratedBid(BaseModel):
 class BidGenerator:
     """Main bid generation agent."""
     
-    def __init__(self, llm_client, config):
+    def __init__(self, llm_client, config, memory: BidMemory = bid_memory):
         """Initialize bid generator."""
         self.llm = llm_client
         self.config = config
+        self.memory = memory
         self.analyzer = ProjectAnalyzer(llm_client, config.get_skills_list())
         self.optimizer = BidOptimizer(llm_client)
     
+    def for_profile(self, config, memory: BidMemory) -> "BidGenerator":
+        """Generator writing as another user, from their bid history (sharing the LLM client and batcher)."""
+        generator = copy.copy(self)
+        generator.config = config
+        generator.memory = memory
+        generator.analyzer = self.analyzer.for_skills(config.get_skills_list())
+        return generator
+    
     def generate(
         self,
         project_description: str,
         project_name: str = "",
         bid_rank: Optional[int] = None,
         total_bids: Optional[int] = None,
-        your_bid_amount: Optional[str] = None
+        your_bid_amount: Optional[str] = None,
+        analysis: Optional[ProjectAnalysis] = None,
+        budget: Optional[RequestBudget] = None
+    ) -> GeneratedBid:
+        """Generate a bid for the project and save it to memory."""
+        bid = self.draft(
+            project_description, project_name, bid_rank, total_bids, your_bid_amount, analysis, budget
+        )
+        self.record(bid, project_description, project_name, total_bids)
+        return bid
+    
+    def draft(
+        self,
+        project_description: str,
+        project_name: str = "",
+        bid_rank: Optional[int] = None,
+        total_bids: Optional[int] = None,
+        your_bid_amount: Optional[str] = None,
+        analysis: Optional[ProjectAnalysis] = None,
+        budget: Optional[RequestBudget] = None
     ) -> GeneratedBid:
-        """Generate a bid for the project."""
+        """Write a bid without saving it (reusing ``analysis`` when already known).
+        
+        With a ``budget``, analysis and writing run as its "analyze" and
+        "generate" stages.
+        """
         
         # Step 1: Analyze project
-        analysis = self.analyzer.analyze(project_description, project_name)
+        if analysis is None:
+            if budget is None:
+                analysis = self.analyzer.analyze(project_description, project_name)
+            else:
+                with budget.stage("analyze"):
+                    analysis = self.analyzer.analyze(project_description, project_name, budget)
         
         # Step 2: Get learning context from past bids
-        learning_context = bid_memory.get_context_for_generation()
+        learning_context = self.memory.get_context_for_generation(
+            f"{project_name}\n{project_description}"
+        )
         
         # Step 3: Generate bid with enhanced system prompt
         system_prompt = f"""You are an EXPERT freelance bid writer who writes WINNING proposals that get hired.
@@ -137,7 +179,7 @@ I can start immediately and deliver within 7-10 days. Let's discuss your specifi
 ═══════════════════════════════════════════════════════════
 
 Now write a bid following this EXACT structure, ensuring you INCLUDE PRICING."""
-
+        
         competition_context = ""
         if bid_rank and total_bids:
             competition_context = f"\n\nNote: This is bid #{bid_rank} of {total_bids}. "
@@ -145,11 +187,11 @@ Now write a bid following this EXACT structure, ensuring you INCLUDE PRICING."""
                 competition_context += "You're competing with many bids - be concise and highlight unique value."
             else:
                 competition_context += "Early bid advantage - be clear and professional."
-
+        
         sample_work_note = ""
         if self.config.include_samples:
             sample_work_note = "\n\nIMPORTANT: Include a relevant sample work link or demo if applicable to this project type."
-
+        
         user_prompt = f"""Generate a professional bid for this project:
 
 Project Name: {project_name if project_name else 'Not specified'}
@@ -167,22 +209,19 @@ Project Analysis:
 {sample_work_note}
 
 Write the bid text ONLY. No introductions like "Here's the bid:" - just the bid content itself."""
-
-        bid_text = self.llm.generate(user_prompt, system_prompt=system_prompt, temperature=0.7)
+        
+        with span("BidGenerator.write_bid", **{"bid.learning_context_chars": len(learning_context)}):
+            if budget is None:
+                bid_text = self.llm.generate(user_prompt, system_prompt=system_prompt, temperature=0.7)
+            else:
+                with budget.stage("generate"):
+                    bid_text = self.llm.generate(
+                        user_prompt, system_prompt=system_prompt, temperature=0.7, budget=budget
+                    )
         
         # Clean up bid text
         bid_text = bid_text.strip()
         
-        # Save to memory for learning
-        bid_memory.add_bid(
-            project_name=project_name,
-            project_description=project_description,
-            generated_bid=bid_text,
-            total_bids=total_bids,
-            budget_range=None,  # Can be added later
-            won=None  # Will be updated when result is known
-        )
-        
         # Calculate confidence based on skill match and bid quality
         word_count = len(bid_text.split())
         confidence = analysis.skill_match_score
@@ -194,10 +233,32 @@ Write the bid text ONLY. No introductions like "Here's the bid:" - just the bid
             confidence = max(0, confidence - 20)
         elif word_count > 400:
             confidence = max(0, confidence - 15)
+        confidence = round(confidence, 1)
         
         return GeneratedBid(
             bid_text=bid_text,
             project_analysis=analysis,
             word_count=word_count,
-            confidence_score=round(confidence, 1)
+            confidence_score=confidence
+        )
+    
+    def record(
+        self,
+        bid: GeneratedBid,
+        project_description: str,
+        project_name: str = "",
+        total_bids: Optional[int] = None
+    ):
+        """Save a delivered bid to memory for learning."""
+        self.memory.add_bid(
+            project_name=project_name,
+            project_description=project_description,
+            generated_bid=bid.bid_text,
+            total_bids=total_bids,
+            budget_range=None,  # Can be added later
+            won=None,  # Will be updated when result is known
+            project_type=bid.project_analysis.project_type,
+            project_analysis=bid.project_analysis.dict(),
+            confidence_score=bid.confidence_score,
+            skills=bid.project_analysis.required_skills
         )
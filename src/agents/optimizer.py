@@ -2,6 +2,9 @@
 from typing import Dict, List, Optional
 from pydantic import BaseModel
 
+from ..core.budget import RequestBudget
+from ..core.tracing import traced
+
 
 class BidOptimization(BaseModel):
     """Bid optimization suggestions."""
@@ -19,6 +22,7 @@ class BidOptimizer:
         """Initialize optimizer."""
         self.llm = llm_client
     
+    @traced("BidOptimizer.optimize")
     def optimize(
         self,
         generated_bid: str,
@@ -26,7 +30,8 @@ class BidOptimizer:
         total_bids: Optional[int] = None,
         your_bid_amount: Optional[str] = None,
         winning_bid_amount: Optional[str] = None,
-        project_analysis: Optional[Dict] = None
+        project_analysis: Optional[Dict] = None,
+        budget: Optional[RequestBudget] = None
     ) -> BidOptimization:
         """Provide optimization suggestions for a generated bid."""
         
@@ -69,7 +74,7 @@ Generated Bid:
 
 Provide optimization suggestions in JSON format."""
 
-        response = self.llm.generate(user_prompt, system_prompt=system_prompt, temperature=0.4)
+        response = self.llm.generate(user_prompt, system_prompt=system_prompt, temperature=0.4, budget=budget)
         
         # Parse JSON response
         import json
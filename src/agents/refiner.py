@@ -0,0 +1,159 @@
+"""Bid refinement as a multi-turn conversation kept on the server."""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from ..core.budget import Cancelled, RequestBudget
+from ..core.tracing import set_attributes, traced
+
+# Instruction sent for each refinement type
+REFINEMENT_PROMPTS = {
+    "reduce_length": "Make this bid SHORTER and more concise (max 150 words). Keep the key points but remove fluff. Maintain professional tone.",
+    "make_casual": "Rewrite this bid in a MORE CASUAL, friendly tone. Use contractions, simpler language, but stay professional. Keep it conversational.",
+    "make_formal": "Rewrite this bid in a MORE FORMAL, business-like tone. Use complete sentences, professional language, avoid contractions.",
+    "add_urgency": "Add URGENCY and availability emphasis. Mention you can start immediately, work quickly, and deliver fast results. Keep same length.",
+    "emphasize_skills": "EMPHASIZE your technical skills and expertise more. Add specific tools, frameworks, and technologies. Show deep knowledge.",
+    "add_examples": "Add MORE CONCRETE EXAMPLES of similar work you've done. Be specific about projects and outcomes.",
+}
+DEFAULT_CUSTOM_INSTRUCTION = "Improve this bid while maintaining its core message."
+
+# Fixed across turns and sessions, so providers can serve it from their prompt cache
+SYSTEM_PROMPT = """You are an expert bid refinement specialist. Your job is improve freelance bids based on specific instructions.
+
+IMPORTANT RULES:
+- Keep the Freelancer.com style (start with 'Hi!', use bullets, end with CTA)
+- Maintain accuracy - don't make up skills or experience
+- Keep it natural and authentic
+- Return ONLY the refined bid text, no explanations
+
+Each message gives one refinement task for the latest version of the bid."""
+
+
+def refinement_instruction(refinement_type: str, custom_instruction: str = "") -> str:
+    """Instruction text for a refinement type (unknown types shorten the bid)."""
+    if refinement_type == "custom":
+        return custom_instruction or DEFAULT_CUSTOM_INSTRUCTION
+    return REFINEMENT_PROMPTS.get(refinement_type, REFINEMENT_PROMPTS["reduce_length"])
+
+
+def clean_refined_bid(text: str) -> str:
+    """Strip whitespace and surrounding quotes the LLM may add."""
+    text = text.strip()
+    if text.startswith('"'):
+        text = text[1:]
+    if text.endswith('"'):
+        text = text[:-1]
+    return text
+
+
+class RefinementSession:
+    """Project context, bid versions and the conversation that produced them.
+    
+    The first user turn carries the project context and original bid; each
+    later turn carries only an instruction. Turns for one session run one at
+    a time.
+    """
+    
+    def __init__(self, llm_client, original_bid: str, project_description: str = "",
+                 time_remaining: Optional[str] = None):
+        """Start a session at version 0, the original bid."""
+        self.llm = llm_client
+        self.project_description = project_description[:500]
+        self.time_remaining = time_remaining
+        self.versions: List[str] = [original_bid]
+        self.instructions: List[str] = []
+        self.messages: List[Dict[str, str]] = []
+        self.lock = threading.Lock()
+    
+    @property
+    def current(self) -> str:
+        """Latest bid version."""
+        return self.versions[-1]
+    
+    def _turn(self, instruction: str) -> Dict[str, str]:
+        """User turn asking for ``instruction`` to be applied to the latest version."""
+        if not self.messages:
+            return {"role": "user", "content": f"""Original Bid:
+{self.versions[0]}
+
+Project Context:
+{self.project_description}
+
+Refinement Task: {instruction}
+
+Return only the improved bid text."""}
+        return {"role": "user", "content": f"Refinement Task: {instruction}\n\nReturn only the improved bid text."}
+    
+    @traced("RefinementSession.refine")
+    def refine(self, instruction: str, budget: Optional[RequestBudget] = None) -> str:
+        """Apply ``instruction`` to the latest version and keep the result as a new version."""
+        with self.lock:
+            turn = self._turn(instruction)
+            set_attributes(**{"refine.turn": len(self.instructions) + 1})
+            refined = clean_refined_bid(self.llm.chat(
+                self.messages + [turn], system_prompt=SYSTEM_PROMPT, temperature=0.6, budget=budget, cache=True
+            ))
+            self.messages += [turn, {"role": "assistant", "content": refined}]
+            self.instructions.append(instruction)
+            self.versions.append(refined)
+            return refined
+    
+    @traced("RefinementSession.branch")
+    def branch(self, instruction: str, budget: Optional[RequestBudget] = None) -> str:
+        """Apply ``instruction`` to the latest version without keeping the result.
+        
+        Branches leave the session unchanged, so several can run at once.
+        """
+        with self.lock:
+            messages = self.messages + [self._turn(instruction)]
+        return clean_refined_bid(self.llm.chat(
+            messages, system_prompt=SYSTEM_PROMPT, temperature=0.6, budget=budget, cache=True
+        ))
+    
+    def to_dict(self) -> Dict:
+        """Versions and the instructions that produced them."""
+        return {
+            "version": len(self.versions) - 1,
+            "versions": self.versions,
+            "instructions": self.instructions,
+        }
+
+
+def refine_variants(
+    session: RefinementSession,
+    instructions: Dict[str, str],
+    max_concurrent: int,
+    budget: Optional[RequestBudget] = None,
+    on_variant: Optional[Callable[[str, Dict], None]] = None
+) -> Dict[str, Dict]:
+    """Branch ``session`` once per instruction, running at most ``max_concurrent`` at a time.
+    
+    Returns {key: {"refined_bid": ...} or {"error": ...}} in the order of
+    ``instructions``. ``on_variant`` is called from a worker thread as each
+    variant finishes. Variants still running when the budget runs out are
+    reported as errors; a cancelled request raises ``Cancelled``.
+    """
+    results: Dict[str, Dict] = {}
+    workers = max(1, min(max_concurrent, len(instructions)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refine-variant") as pool:
+        # Each variant runs in a copy of the caller's context, so its spans join the request's trace
+        futures = {
+            pool.submit(contextvars.copy_context().run, session.branch, instruction, budget): key
+            for key, instruction in instructions.items()
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                variant = {"refined_bid": future.result()}
+            except Cancelled as e:
+                if budget is not None and budget.client_gone:
+                    raise
+                variant = {"error": str(e)}
+            except Exception as e:
+                print(f"⚠️  Error refining variant {key}: {e}")
+                variant = {"error": str(e)}
+            results[key] = variant
+            if on_variant:
+                on_variant(key, variant)
+    return {key: results[key] for key in instructions}
@@ -0,0 +1,211 @@
+"""Columnar snapshot of bid history for win-rate analytics."""
+import io
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Outcome codes stored in the snapshot
+PENDING, LOST, WON = -1, 0, 1
+
+# Look-back windows for recent win rates, in days
+WINDOWS_DAYS = (7, 30, 90)
+
+# Bucket edges for competition (number of bids on the project) and bid length (words)
+TOTAL_BIDS_EDGES = [10, 25, 50, 100]
+TOTAL_BIDS_LABELS = ["0-9", "10-24", "25-49", "50-99", "100+"]
+WORD_COUNT_EDGES = [100, 180, 280, 400]
+WORD_COUNT_LABELS = ["<100", "100-179", "180-279", "280-399", "400+"]
+
+
+def _outcome_code(won: Optional[bool]) -> int:
+    """Map a bid's won flag to its snapshot outcome code."""
+    if won is True:
+        return WON
+    if won is False:
+        return LOST
+    return PENDING
+
+
+def _timestamp(value: Optional[str]) -> float:
+    """Parse an ISO timestamp to epoch seconds (NaN if missing or malformed)."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class BidAnalytics:
+    """Append-only NumPy columns mirroring ``BidMemory.history``.
+    
+    ``refresh`` only converts rows added since the previous call, and
+    ``set_outcome`` patches results in place, so queries are vectorized
+    group-bys over arrays that are already built.
+    """
+    
+    def __init__(self):
+        """Initialize an empty snapshot."""
+        self._rows = 0
+        self._columns: Dict[str, np.ndarray] = {
+            "timestamp": np.zeros(0, dtype=np.float64),
+            "hour": np.zeros(0, dtype=np.int8),
+            "outcome": np.zeros(0, dtype=np.int8),
+            "project_type": np.zeros(0, dtype=np.int32),
+            "total_bids": np.zeros(0, dtype=np.float64),
+            "word_count": np.zeros(0, dtype=np.float64),
+        }
+        self._type_names: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+        self._skill_names: List[str] = []
+        self._skill_ids: Dict[str, int] = {}
+        # Skills are a ragged column: parallel (row, skill id) pairs
+        self._skill_rows: List[int] = []
+        self._skill_values: List[int] = []
+        self._skill_array = np.zeros((0, 2), dtype=np.int64)  # Cached array form of the pairs
+    
+    def _reserve(self, rows: int):
+        """Grow every column (amortized doubling) to hold ``rows`` rows."""
+        capacity = len(self._columns["outcome"])
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 1024)
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._rows] = column[:self._rows]
+            self._columns[name] = grown
+    
+    @staticmethod
+    def _intern(value: str, names: List[str], ids: Dict[str, int]) -> int:
+        """Return the dictionary code for a categorical value."""
+        if value not in ids:
+            ids[value] = len(names)
+            names.append(value)
+        return ids[value]
+    
+    def refresh(self, history: List):
+        """Append columns for history entries added since the last refresh."""
+        self._reserve(len(history))
+        columns = self._columns
+        for row in range(self._rows, len(history)):
+            bid = history[row]
+            timestamp = _timestamp(bid.get("timestamp"))
+            columns["timestamp"][row] = timestamp
+            columns["hour"][row] = datetime.fromtimestamp(timestamp).hour if not np.isnan(timestamp) else -1
+            columns["outcome"][row] = _outcome_code(bid.get("won"))
+            columns["project_type"][row] = self._intern(
+                bid.get("project_type") or "Unknown", self._type_names, self._type_ids
+            )
+            total_bids = bid.get("total_bids")
+            columns["total_bids"][row] = total_bids if total_bids is not None else np.nan
+            word_count = bid.get("word_count")
+            columns["word_count"][row] = word_count if word_count is not None else np.nan
+            for skill in bid.get("skills") or []:
+                self._skill_rows.append(row)
+                self._skill_values.append(
+                    self._intern(skill.strip().lower(), self._skill_names, self._skill_ids)
+                )
+        self._rows = len(history)
+    
+    def set_outcome(self, row: int, won: Optional[bool]):
+        """Record a result for a row already in the snapshot."""
+        if row < self._rows:
+            self._columns["outcome"][row] = _outcome_code(won)
+    
+    @staticmethod
+    def _rates(groups: np.ndarray, outcome: np.ndarray, labels: List[str]) -> Dict[str, Dict]:
+        """Bid, won and lost counts plus win rate for each group code."""
+        size = len(labels)
+        bids = np.bincount(groups, minlength=size)
+        won = np.bincount(groups, weights=outcome == WON, minlength=size)
+        lost = np.bincount(groups, weights=outcome == LOST, minlength=size)
+        decided = won + lost
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = np.where(decided > 0, won / decided, np.nan)
+        return {
+            label: {
+                "bids": int(bids[i]),
+                "won": int(won[i]),
+                "lost": int(lost[i]),
+                "win_rate": None if np.isnan(rate[i]) else round(float(rate[i]), 4),
+            }
+            for i, label in enumerate(labels) if bids[i]
+        }
+    
+    @staticmethod
+    def _bucketed(values: np.ndarray, edges: List[int], labels: List[str]) -> np.ndarray:
+        """Bucket codes for numeric values; NaN goes to a trailing "unknown" bucket."""
+        codes = np.digitize(np.nan_to_num(values, nan=0.0), edges)
+        return np.where(np.isnan(values), len(labels), codes)
+    
+    def summary(self, now: Optional[float] = None) -> Dict:
+        """Win rates over time windows and by type, skill, competition, length and hour."""
+        n = self._rows
+        outcome = self._columns["outcome"][:n]
+        timestamp = self._columns["timestamp"][:n]
+        now = time.time() if now is None else now
+        
+        windows = {}
+        for days in WINDOWS_DAYS:
+            in_window = (timestamp >= now - days * 86400).astype(np.int64)
+            windows[f"{days}d"] = self._rates(in_window, outcome, ["older", "recent"]).get(
+                "recent", {"bids": 0, "won": 0, "lost": 0, "win_rate": None}
+            )
+        
+        hour = self._columns["hour"][:n].astype(np.int64)
+        hour_labels = [f"{h:02d}:00" for h in range(24)] + ["unknown"]
+        
+        if len(self._skill_array) != len(self._skill_rows):
+            self._skill_array = np.array([self._skill_rows, self._skill_values], dtype=np.int64).T
+        skill_rows, skill_values = self._skill_array[:, 0], self._skill_array[:, 1]
+        
+        return {
+            "total_bids": n,
+            "overall": self._rates(np.zeros(n, dtype=np.int64), outcome, ["all"]).get("all", {}),
+            "windows": windows,
+            "by_project_type": self._rates(
+                self._columns["project_type"][:n].astype(np.int64), outcome, self._type_names
+            ),
+            "by_skill": self._rates(skill_values, outcome[skill_rows], self._skill_names),
+            "by_total_bids": self._rates(
+                self._bucketed(self._columns["total_bids"][:n], TOTAL_BIDS_EDGES, TOTAL_BIDS_LABELS),
+                outcome, TOTAL_BIDS_LABELS + ["unknown"]
+            ),
+            "by_bid_length": self._rates(
+                self._bucketed(self._columns["word_count"][:n], WORD_COUNT_EDGES, WORD_COUNT_LABELS),
+                outcome, WORD_COUNT_LABELS + ["unknown"]
+            ),
+            "by_hour": self._rates(np.where(hour < 0, 24, hour), outcome, hour_labels),
+        }
+    
+    def to_parquet(self) -> bytes:
+        """Export the snapshot as a Parquet file."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow package not installed. Run: pip install pyarrow")
+        
+        n = self._rows
+        columns = {name: column[:n] for name, column in self._columns.items()}
+        skills: List[List[str]] = [[] for _ in range(n)]
+        for row, skill in zip(self._skill_rows, self._skill_values):
+            skills[row].append(self._skill_names[skill])
+        
+        table = pa.table({
+            "timestamp": pa.array(
+                np.nan_to_num(columns["timestamp"] * 1e6).astype(np.int64),
+                mask=np.isnan(columns["timestamp"]), type=pa.timestamp("us")
+            ),
+            "hour": columns["hour"],
+            "outcome": pa.DictionaryArray.from_arrays(
+                (columns["outcome"] + 1).astype(np.int8), ["pending", "lost", "won"]
+            ),
+            "project_type": pa.DictionaryArray.from_arrays(columns["project_type"], self._type_names),
+            "total_bids": pa.array(columns["total_bids"], mask=np.isnan(columns["total_bids"])),
+            "word_count": pa.array(columns["word_count"], mask=np.isnan(columns["word_count"])),
+            "skills": pa.array(skills, type=pa.list_(pa.string())),
+        })
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer)
+        return buffer.getvalue()
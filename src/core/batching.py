@@ -0,0 +1,114 @@
+"""Micro-batching: calls arriving close together are run as one batch call."""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .budget import RequestBudget
+
+# How often a budgeted wait checks for cancellation
+BUDGET_POLL_SECONDS = 0.25
+
+
+class MicroBatcher:
+    """Collects items submitted from many threads and runs them in batches.
+    
+    A batch closes ``window`` seconds after its first item arrives, or as
+    soon as it holds ``max_size`` items. ``run_batch`` receives the items
+    (each with the submitter's budget) and returns one result per item, in
+    order. Up to ``max_concurrent`` batches run at once. Each submitter
+    blocks until its own result is ready.
+    """
+    
+    def __init__(self, run_batch: Callable[[List[Tuple[Any, Optional[RequestBudget]]]], List[Any]],
+                 max_size: int = 8, window: float = 0.025, max_concurrent: int = 4, name: str = "micro-batch"):
+        """Initialize with nothing pending; the collector thread starts on first use."""
+        self.run_batch = run_batch
+        self.max_size = max_size
+        self.window = window
+        self.max_concurrent = max_concurrent
+        self.name = name
+        self._pending: List[Tuple[Any, Optional[RequestBudget], Future]] = []
+        self._first_arrival = 0.0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._collector: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._counts = {"items": 0, "batches": 0, "largest": 0}
+    
+    def submit(self, item: Any, budget: Optional[RequestBudget] = None) -> Any:
+        """Result for ``item`` once its batch has run.
+        
+        With a ``budget``, waiting stops (raising Cancelled) once the request is
+        cancelled or its current stage is out of time; an item whose batch
+        hasn't started yet is then left out of it.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._collector is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix=self.name)
+                self._collector = threading.Thread(target=self._collect_loop, name=f"{self.name}-collector", daemon=True)
+                self._collector.start()
+            if not self._pending:
+                self._first_arrival = time.monotonic()
+            self._pending.append((item, budget, future))
+            self._changed.notify()
+        
+        if budget is None:
+            return future.result()
+        try:
+            while True:
+                budget.check()
+                try:
+                    return future.result(timeout=min(BUDGET_POLL_SECONDS, budget.remaining()))
+                except FutureTimeout:
+                    if future.done():
+                        raise  # The batch itself timed out
+        except BaseException:
+            future.cancel()  # Dropped from its batch if that hasn't started
+            raise
+    
+    def _collect_loop(self):
+        """Close batches by size or window and hand them to the executor."""
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._changed.wait()
+                while len(self._pending) < self.max_size:
+                    remaining = self._first_arrival + self.window - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._changed.wait(remaining)
+                batch = self._pending[:self.max_size]
+                del self._pending[:self.max_size]
+                if self._pending:
+                    self._first_arrival = time.monotonic()
+            self._executor.submit(self._run, batch)
+    
+    def _run(self, batch: List[Tuple[Any, Optional[RequestBudget], Future]]):
+        """Run one batch and deliver each result (or the batch's error) to its submitter."""
+        # Submitters that gave up while the batch was forming are left out
+        batch = [entry for entry in batch if entry[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        with self._lock:
+            self._counts["items"] += len(batch)
+            self._counts["batches"] += 1
+            self._counts["largest"] = max(self._counts["largest"], len(batch))
+        try:
+            results = self.run_batch([(item, budget) for item, budget, _ in batch])
+        except BaseException as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+    
+    def stats(self) -> Dict:
+        """Items and batches run so far, and the mean and largest batch size."""
+        with self._lock:
+            counts = dict(self._counts)
+            counts["pending"] = len(self._pending)
+        counts["mean_size"] = round(counts["items"] / counts["batches"], 2) if counts["batches"] else 0.0
+        return counts
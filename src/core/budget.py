@@ -0,0 +1,89 @@
+"""Per-request time budgets and cancellation for the LLM pipeline."""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Share of the time left that each stage may use; unused time rolls over to later stages
+STAGE_SHARES: Dict[str, float] = {"analyze": 0.25, "generate": 0.5, "optimize": 0.25}
+
+
+class Cancelled(Exception):
+    """Raised inside a pipeline once its request was cancelled or its time ran out."""
+    
+    def __init__(self, reason: str, stage: Optional[str] = None):
+        """Record why and in which stage the work stopped."""
+        super().__init__(f"{reason} during {stage}" if stage else reason)
+        self.reason = reason
+        self.stage = stage
+
+
+class RequestBudget:
+    """Deadline for one request, split into stage budgets, plus a cancel flag.
+    
+    The request handler calls ``cancel`` (e.g. when the client disconnects);
+    pipeline code running in worker threads calls ``check`` between steps and
+    passes the budget to LLM clients, which stop mid-response.
+    """
+    
+    def __init__(self, seconds: float, shares: Optional[Dict[str, float]] = None):
+        """Start the clock for a request allowed ``seconds`` in total."""
+        self.deadline = time.monotonic() + seconds
+        self.shares = shares or STAGE_SHARES
+        self.stage_name: Optional[str] = None
+        self._stage_deadline = self.deadline
+        self._cancelled = threading.Event()
+        self._reason = "cancelled"
+        self._members: List["RequestBudget"] = []
+    
+    @classmethod
+    def shared(cls, members: List["RequestBudget"]) -> "RequestBudget":
+        """Budget for work done on behalf of several requests.
+        
+        It lasts as long as the most patient member still waits and is
+        cancelled once every member has been.
+        """
+        budget = cls(max(member.remaining() for member in members))
+        budget._members = list(members)
+        return budget
+    
+    def cancel(self, reason: str = "client disconnected"):
+        """Stop the request's remaining work."""
+        self._reason = reason
+        self._cancelled.set()
+    
+    @property
+    def client_gone(self) -> bool:
+        """Whether ``cancel`` was called (as opposed to time running out)."""
+        if self._members and not self._cancelled.is_set() and all(member.client_gone for member in self._members):
+            self.cancel("every request sharing the work was cancelled")
+        return self._cancelled.is_set()
+    
+    def remaining(self) -> float:
+        """Seconds left for the current stage."""
+        return max(0.0, min(self._stage_deadline, self.deadline) - time.monotonic())
+    
+    def remaining_total(self) -> float:
+        """Seconds left for the whole request."""
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def check(self):
+        """Raise Cancelled if the request was cancelled or the current stage is out of time."""
+        if self.client_gone:
+            raise Cancelled(self._reason, self.stage_name)
+        if self.remaining() <= 0:
+            raise Cancelled("time budget exhausted", self.stage_name)
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Run a stage with its share of the time left for it and the stages after it."""
+        names = list(self.shares)
+        later = names[names.index(name):] if name in self.shares else [name]
+        share = self.shares.get(name, 1.0) / sum(self.shares.get(n, 1.0) for n in later)
+        self.stage_name = name
+        self._stage_deadline = time.monotonic() + self.remaining_total() * share
+        self.check()
+        try:
+            yield self
+        finally:
+            self._stage_deadline = self.deadline
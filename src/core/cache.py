@@ -0,0 +1,142 @@
+"""Small in-process caches for short-lived request state and per-user handles."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class TTLCache:
+    """Bounded mapping whose entries expire ``ttl`` seconds after being stored.
+    
+    Entries are kept in insertion order, so expired ones are dropped from the
+    front and, once ``max_entries`` is reached, the oldest entry is evicted.
+    Safe to share between request threads.
+    """
+    
+    def __init__(self, max_entries: int, ttl: float):
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _expire(self, now: float):
+        """Drop entries past their expiry (caller holds the lock)."""
+        while self._entries:
+            key, (expires, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            del self._entries[key]
+    
+    def put(self, key: str, value: Any):
+        """Store ``value`` under ``key``, replacing and refreshing any existing entry."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Value stored under ``key``, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                return None
+            return entry[1]
+    
+    def pop(self, key: str) -> Optional[Any]:
+        """Remove and return the value under ``key``, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] <= now:
+                return None
+            return entry[1]
+    
+    def __len__(self) -> int:
+        """Number of live entries."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._entries)
+
+
+class LRUCache:
+    """Bounded mapping that evicts its least recently used entry when full.
+    
+    ``on_evict(key, value)`` is called for each entry pushed out, outside the
+    lock, so it may do slow cleanup. Safe to share between request threads.
+    """
+    
+    def __init__(self, max_entries: int, on_evict: Optional[Callable[[str, Any], None]] = None):
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Value stored under ``key`` (now the most recently used), or None if missing."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    def get_or_create(self, key: str, create: Callable[[], Any]) -> Any:
+        """Value under ``key``, stored from ``create()`` first if missing (called under the lock)."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            value = self._entries[key] = create()
+            evicted = self._evict()
+        self._notify(evicted)
+        return value
+    
+    def put(self, key: str, value: Any):
+        """Store ``value`` under ``key`` as the most recently used entry."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            evicted = self._evict()
+        self._notify(evicted)
+    
+    def pop(self, key: str) -> Optional[Any]:
+        """Remove and return the value under ``key``, or None if missing."""
+        with self._lock:
+            return self._entries.pop(key, None)
+    
+    def values(self) -> List[Any]:
+        """Snapshot of the stored values, least recently used first."""
+        with self._lock:
+            return list(self._entries.values())
+    
+    def clear(self) -> List[Tuple[str, Any]]:
+        """Remove every entry, returning them as (key, value) pairs."""
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries.clear()
+        return entries
+    
+    def _evict(self) -> List[Tuple[str, Any]]:
+        """Remove entries beyond ``max_entries``, oldest first (caller holds the lock)."""
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            evicted.append(self._entries.popitem(last=False))
+        self.evictions += len(evicted)
+        return evicted
+    
+    def _notify(self, evicted: List[Tuple[str, Any]]):
+        """Pass evicted entries to ``on_evict``."""
+        if self.on_evict is not None:
+            for key, value in evicted:
+                self.on_evict(key, value)
+    
+    def __len__(self) -> int:
+        """Number of entries."""
+        with self._lock:
+            return len(self._entries)
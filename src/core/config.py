@@ -1,11 +1,33 @@
 """Configuration management for AI Bid Writer."""
+import json
 import os
-from typing import Optional
-from dotenv import load_dotenv
+import re
+from pathlib import Path
+from typing import Dict, Optional
 from pydantic import BaseModel, Field
 
-# Load environment variables
-load_dotenv()
+from .cache import LRUCache
+from .skills import SkillIndex, skill_index
+
+
+def _find_dotenv() -> Optional[Path]:
+    """Nearest .env file in the working directory or above this package."""
+    for directory in (Path.cwd(), *Path(__file__).resolve().parents):
+        candidate = directory / ".env"
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+# Load environment variables. Hosts configured through real environment
+# variables have no .env file, and then python-dotenv isn't imported at all.
+_dotenv_path = _find_dotenv()
+if _dotenv_path:
+    from dotenv import load_dotenv
+    load_dotenv(_dotenv_path)
+
+# Imported once .env is loaded, since the store reads its settings on import
+from .store import Store, StoreError, get_store  # noqa: E402
 
 
 class AppConfig(BaseModel):
@@ -62,7 +84,126 @@ class AppConfig(BaseModel):
     def get_skills_list(self) -> list[str]:
         """Get skills as a list."""
         return [skill.strip() for skill in self.your_skills.split(",")]
+    
+    def get_skill_index(self) -> SkillIndex:
+        """Index of your skills with their aliases, for matching project skills (built once)."""
+        return skill_index(tuple(self.get_skills_list()))
+    
+    def for_profile(self, overrides: Dict) -> "AppConfig":
+        """Copy of this config with a user's profile fields replaced (validated)."""
+        return AppConfig(**{**self.dict(), **{field: overrides[field] for field in PROFILE_FIELDS if field in overrides}})
+
+
+# Fields a user's profile may set; provider settings and API keys stay deployment-wide
+PROFILE_FIELDS = (
+    "your_name", "your_github", "your_linkedin", "your_resume", "your_skills",
+    "default_turnaround", "include_samples", "competitive_pricing",
+)
+
+# User IDs name profile files and memory directories, so they are kept to safe characters
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.@-]{0,63}$")
+
+
+def check_user_id(user_id: str) -> str:
+    """Return ``user_id`` if it is a valid user ID, else raise ValueError."""
+    if not isinstance(user_id, str) or not USER_ID_PATTERN.match(user_id):
+        raise ValueError("User ID must be 1-64 letters, digits, '_', '.', '@' or '-', starting with a letter or digit")
+    return user_id
+
+
+class ProfileStore:
+    """Per-user profiles, each a JSON object of overrides layered over the global config.
+    
+    Profiles are files in ``directory``, or keys in ``store`` when a shared
+    store is given. Parsed profiles are cached and parsed again when the
+    stored profile changes, so an update saved by one worker process or
+    node is picked up by the others.
+    """
+    
+    def __init__(self, directory: str = ".profiles", base: Optional[AppConfig] = None, max_cached: int = 1024,
+                 store: Optional[Store] = None):
+        """Initialize with profiles in ``directory`` (or ``store``) over ``base`` (default: the global config)."""
+        self.directory = Path(directory)
+        self.base = base or config
+        self.store = store
+        self._cache = LRUCache(max_cached)
+    
+    def path(self, user_id: str) -> Path:
+        """Profile file of ``user_id``."""
+        return self.directory / f"{check_user_id(user_id)}.json"
+    
+    def key(self, user_id: str) -> str:
+        """Store key of ``user_id``'s profile."""
+        return f"profile:{check_user_id(user_id)}"
+    
+    def overrides(self, user_id: str) -> Dict:
+        """Fields stored in a user's profile ({} if there is none)."""
+        if self.store is not None:
+            raw = self.store.get(self.key(user_id))
+            return json.loads(raw) if raw else {}
+        try:
+            with open(self.path(user_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+    
+    def get(self, user_id: str) -> AppConfig:
+        """Config for ``user_id``: the global one with their profile applied."""
+        cached = self._cache.get(user_id)
+        if self.store is not None:
+            # The stored JSON is its own version: one read both checks and loads it
+            try:
+                version = self.store.get(self.key(user_id))
+            except StoreError as e:
+                print(f"⚠️  Error loading profile {user_id}: {e}")
+                return cached[1] if cached is not None else self.base
+        else:
+            try:
+                stat = self.path(user_id).stat()
+                version = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                version = None
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        try:
+            if self.store is not None:
+                overrides = json.loads(version) if version else {}
+            else:
+                overrides = self.overrides(user_id)
+            profile = self.base.for_profile(overrides)
+        except ValueError as e:
+            print(f"⚠️  Error loading profile {user_id}: {e}")
+            profile = self.base
+        self._cache.put(user_id, (version, profile))
+        return profile
+    
+    def save(self, user_id: str, fields: Dict) -> AppConfig:
+        """Update a user's profile with ``fields`` and return their config.
+        
+        Raises ValueError for fields that aren't profile fields or don't
+        validate, and StoreError if a shared store can't be reached.
+        """
+        unknown = set(fields) - set(PROFILE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+        stored = {**self.overrides(user_id), **fields}
+        profile = self.base.for_profile(stored)
+        data = {field: getattr(profile, field) for field in stored}
+        if self.store is not None:
+            self.store.set(self.key(user_id), json.dumps(data).encode("utf-8"))
+            return profile
+        path = self.path(user_id)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so readers never see a partial file
+        temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp, path)
+        return profile
 
 
 # Global config instance
 config = AppConfig.from_env()
+
+# Per-user profiles, for requests that carry a user ID (in the store when it is shared)
+profiles = ProfileStore(os.getenv("PROFILES_DIR", ".profiles"), store=get_store() if get_store().shared else None)
@@ -0,0 +1,193 @@
+"""MinHash + LSH index for spotting reposted or re-pasted projects."""
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity above which two projects count as duplicates
+DUPLICATE_THRESHOLD = 0.7
+
+# Only this much of the description is stored in history, so only this much is hashed
+DESCRIPTION_CHARS = 500
+
+SHINGLE_WORDS = 2
+
+# Rows added since the last sort are scanned linearly until there are this many
+REINDEX_EVERY = 1024
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240101)
+_A = _rng.integers(1, (1 << 31) - 1, NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, (1 << 31) - 1, NUM_PERM, dtype=np.uint64)[:, None]
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of the word 2-shingles of text, or None if it has no words."""
+    tokens = _TOKEN_PATTERN.findall(text[:DESCRIPTION_CHARS].lower())
+    if not tokens:
+        return None
+    width = min(SHINGLE_WORDS, len(tokens))
+    shingles = {" ".join(tokens[i:i + width]) for i in range(len(tokens) - width + 1)}
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+    return ((_A * hashes + _B) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """Collapse each band of ROWS_PER_BAND hash values into one uint64 bucket key."""
+    s = signatures.reshape(-1, BANDS, ROWS_PER_BAND).astype(np.uint64)
+    high = (s[..., 0] << np.uint64(32)) | s[..., 1]
+    low = (s[..., 2] << np.uint64(32)) | s[..., 3]
+    return (high * _MIX) ^ low
+
+
+class DuplicateIndex:
+    """LSH-banded MinHash signatures of every project description in history.
+    
+    Signatures are aligned with ``BidMemory.history`` rows and appended to a
+    raw uint32 file beside it. Each band's bucket keys are kept as a sorted
+    array, so lookups are binary searches and loading needs no per-row Python.
+    """
+    
+    def __init__(self, signatures_file: Path):
+        """Initialize an empty index backed by ``signatures_file``."""
+        self.signatures_file = Path(signatures_file)
+        self._signatures = np.zeros((0, NUM_PERM), dtype=np.uint32)
+        self._keys = np.zeros((0, BANDS), dtype=np.uint64)
+        self._order = np.zeros((BANDS, 0), dtype=np.int64)
+        self._sorted_keys = np.zeros((BANDS, 0), dtype=np.uint64)
+        self._rows = 0
+        self._sorted_rows = 0
+        self._persisted_rows = 0
+        self._rewrite = False
+    
+    def _reserve(self, rows: int):
+        """Grow the signature and key matrices (amortized doubling) to hold ``rows`` rows."""
+        capacity = len(self._signatures)
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 1024)
+        signatures = np.zeros((capacity, NUM_PERM), dtype=np.uint32)
+        signatures[:self._rows] = self._signatures[:self._rows]
+        keys = np.zeros((capacity, BANDS), dtype=np.uint64)
+        keys[:self._rows] = self._keys[:self._rows]
+        self._signatures, self._keys = signatures, keys
+    
+    def _store(self, start: int, signatures: np.ndarray):
+        """Write a block of signatures (all-zero rows mean "no description") at ``start``."""
+        stop = start + len(signatures)
+        self._signatures[start:stop] = signatures
+        self._keys[start:stop] = band_keys(signatures)
+    
+    def _reindex(self):
+        """Sort every band's bucket keys over all current rows."""
+        keys = self._keys[:self._rows]
+        order = np.argsort(keys, axis=0, kind="stable")
+        self._order = order.T.copy()
+        self._sorted_keys = np.take_along_axis(keys, order, axis=0).T.copy()
+        self._sorted_rows = self._rows
+    
+    def _file_rows(self) -> int:
+        """Number of complete rows in the signatures file (0 if it is being rewritten)."""
+        if self._rewrite or not self.signatures_file.exists():
+            return 0
+        return self.signatures_file.stat().st_size // (NUM_PERM * 4)
+    
+    def rebuild(self, history: List[Dict]):
+        """Reset the index and load it from the signatures file and history."""
+        size = self.signatures_file.stat().st_size if self.signatures_file.exists() else 0
+        # A file with more rows than history belongs to a different history; start over
+        self._rewrite = size % (NUM_PERM * 4) != 0 or size // (NUM_PERM * 4) > len(history)
+        self._rows = 0
+        self._sorted_rows = 0
+        self._persisted_rows = 0
+        self.sync(history)
+        self._reindex()
+    
+    def sync(self, history: List[Dict]):
+        """Extend the index to cover history, reading persisted rows before hashing."""
+        file_rows = min(self._file_rows(), len(history))
+        self._reserve(len(history))
+        if file_rows > self._rows:
+            try:
+                stored = np.fromfile(
+                    self.signatures_file, dtype=np.uint32,
+                    count=(file_rows - self._rows) * NUM_PERM, offset=self._rows * NUM_PERM * 4
+                ).reshape(-1, NUM_PERM)
+                self._store(self._rows, stored)
+                self._rows += len(stored)
+            except Exception as e:
+                print(f"⚠️  Error loading duplicate index: {e}")
+        for row in range(self._rows, len(history)):
+            self._store(row, self._signature_row(history[row].get("project_description") or ""))
+        self._rows = len(history)
+        self._persisted_rows = max(self._persisted_rows, file_rows)
+    
+    @staticmethod
+    def _signature_row(project_description: str) -> np.ndarray:
+        """Signature as a 1-row block, all zeros when the text has no words."""
+        signature = minhash(project_description)
+        if signature is None:
+            return np.zeros((1, NUM_PERM), dtype=np.uint32)
+        return signature[None, :]
+    
+    def add(self, project_description: str):
+        """Append the signature for a newly added history entry."""
+        self._reserve(self._rows + 1)
+        self._store(self._rows, self._signature_row(project_description))
+        self._rows += 1
+    
+    def persist(self):
+        """Append rows added since the last persist to the signatures file."""
+        if self._persisted_rows == self._rows and not self._rewrite:
+            return
+        start = 0 if self._rewrite else self._persisted_rows
+        try:
+            with open(self.signatures_file, 'wb' if self._rewrite else 'ab') as f:
+                self._signatures[start:self._rows].tofile(f)
+            self._persisted_rows = self._rows
+            self._rewrite = False
+        except Exception as e:
+            print(f"⚠️  Error saving duplicate index: {e}")
+    
+    def find(self, project_description: str,
+             threshold: float = DUPLICATE_THRESHOLD) -> Optional[Tuple[int, float]]:
+        """Return (row, estimated Jaccard similarity) of the closest prior duplicate, if any."""
+        signature = minhash(project_description)
+        if signature is None:
+            return None
+        
+        if self._rows - self._sorted_rows > REINDEX_EVERY:
+            self._reindex()
+        
+        query_keys = band_keys(signature[None, :])[0]
+        candidates = []
+        for band in range(BANDS):
+            sorted_keys = self._sorted_keys[band]
+            lo = np.searchsorted(sorted_keys, query_keys[band], side="left")
+            hi = np.searchsorted(sorted_keys, query_keys[band], side="right")
+            candidates.append(self._order[band, lo:hi])
+        # Rows added since the last sort
+        tail = self._keys[self._sorted_rows:self._rows]
+        candidates.append(np.flatnonzero((tail == query_keys).any(axis=1)) + self._sorted_rows)
+        
+        rows = np.unique(np.concatenate(candidates))
+        if len(rows) == 0:
+            return None
+        similarity = (self._signatures[rows] == signature).mean(axis=1)
+        # Prefer the most recent bid among equally close matches (rows are ascending)
+        best = len(rows) - 1 - int(np.argmax(similarity[::-1]))
+        if similarity[best] < threshold:
+            return None
+        return int(rows[best]), float(similarity[best])
@@ -2,15 +2,38 @@
 from typing import Optional, List, Dict
 from abc import ABC, abstractmethod
 
+from .budget import Cancelled, RequestBudget
 from .config import config
+from .tracing import set_attributes, traced
 
 
 class LLMClient(ABC):
     """Abstract base class for LLM clients."""
     
     @abstractmethod
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7) -> str:
-        """Generate text from prompt."""
+    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7,
+                 budget: Optional[RequestBudget] = None) -> str:
+        """Generate text from prompt.
+        
+        With a ``budget``, the response is streamed and abandoned (raising
+        ``Cancelled``) as soon as the request is cancelled or the stage runs
+        out of time, so the provider stops producing tokens nobody will read.
+        """
+        pass
+    
+    def chat(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None,
+             temperature: float = 0.7, budget: Optional[RequestBudget] = None, cache: bool = False) -> str:
+        """Continue a conversation of {"role": "user" | "assistant", "content": ...} turns.
+        
+        ``cache`` asks the provider to keep the conversation so far as a
+        reusable prefix for the next turn. Clients without native multi-turn
+        support send the conversation as one transcript prompt.
+        """
+        transcript = "\n\n".join(f"{message['role'].upper()}:\n{message['content']}" for message in messages)
+        return self.generate(transcript, system_prompt=system_prompt, temperature=temperature, budget=budget)
+    
+    def warm_up(self):
+        """Open the provider connection ahead of the first real request."""
         pass
 
 
@@ -27,22 +50,62 @@ class OpenAIClient(LLMClient):
         self.client = OpenAI(api_key=api_key)
         self.model = model
     
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7) -> str:
+    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7,
+                 budget: Optional[RequestBudget] = None) -> str:
         """Generate text using OpenAI API."""
-        messages: List[Dict[str, str]] = []
-        
+        return self.chat([{"role": "user", "content": prompt}], system_prompt, temperature, budget)
+    
+    @traced("llm.generate")
+    def chat(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None,
+             temperature: float = 0.7, budget: Optional[RequestBudget] = None, cache: bool = False) -> str:
+        """Continue a conversation using OpenAI API (repeated prefixes are cached automatically)."""
+        set_attributes(**{"gen_ai.system": "openai", "gen_ai.request.model": self.model, "llm.streamed": budget is not None})
         if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+            messages = [{"role": "system", "content": system_prompt}] + messages
         
-        messages.append({"role": "user", "content": prompt})
+        if budget is not None:
+            budget.check()
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=budget.remaining(),
+            )
+            parts: List[str] = []
+            with stream:
+                for chunk in stream:
+                    budget.check()
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                    if chunk.usage:  # Sent in the last chunk
+                        self._record_usage(chunk.usage)
+            return "".join(parts)
         
         response = self.client.chat.completions.create(
             model=self.model,
             messages=messages,
             temperature=temperature,
         )
+        if response.usage:
+            self._record_usage(response.usage)
         
         return response.choices[0].message.content or ""
+    
+    @staticmethod
+    def _record_usage(usage):
+        """Add token counts from a response's usage to the current span."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        set_attributes(**{
+            "gen_ai.usage.input_tokens": usage.prompt_tokens,
+            "gen_ai.usage.output_tokens": usage.completion_tokens,
+            "gen_ai.usage.cached_input_tokens": getattr(details, "cached_tokens", None),
+        })
+    
+    def warm_up(self):
+        """Open a pooled connection with a cheap metadata request."""
+        self.client.models.retrieve(self.model)
 
 
 class AnthropicClient(LLMClient):
@@ -58,21 +121,62 @@ class AnthropicClient(LLMClient):
         self.client = Anthropic(api_key=api_key)
         self.model = model
     
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7) -> str:
+    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7,
+                 budget: Optional[RequestBudget] = None) -> str:
         """Generate text using Anthropic API."""
+        return self.chat([{"role": "user", "content": prompt}], system_prompt, temperature, budget)
+    
+    @traced("llm.generate")
+    def chat(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None,
+             temperature: float = 0.7, budget: Optional[RequestBudget] = None, cache: bool = False) -> str:
+        """Continue a conversation using Anthropic API, with prompt caching when ``cache``."""
+        set_attributes(**{"gen_ai.system": "anthropic", "gen_ai.request.model": self.model, "llm.streamed": budget is not None})
+        if cache:
+            # Cache breakpoints on the system prompt and the latest turn; the next
+            # turn reads everything up to here from the cache
+            last = messages[-1]
+            messages = messages[:-1] + [{"role": last["role"], "content": [
+                {"type": "text", "text": last["content"], "cache_control": {"type": "ephemeral"}}
+            ]}]
         kwargs = {
             "model": self.model,
             "max_tokens": 2000,
             "temperature": temperature,
-            "messages": [{"role": "user", "content": prompt}]
+            "messages": messages
         }
         
         if system_prompt:
             kwargs["system"] = system_prompt
+            if cache:
+                kwargs["system"] = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+        
+        if budget is not None:
+            budget.check()
+            parts: List[str] = []
+            with self.client.messages.stream(timeout=budget.remaining(), **kwargs) as stream:
+                for text in stream.text_stream:
+                    budget.check()
+                    parts.append(text)
+                self._record_usage(stream.get_final_message().usage)
+            return "".join(parts)
         
         response = self.client.messages.create(**kwargs)
+        self._record_usage(response.usage)
         
         return response.content[0].text
+    
+    @staticmethod
+    def _record_usage(usage):
+        """Add token counts from a response's usage to the current span."""
+        set_attributes(**{
+            "gen_ai.usage.input_tokens": usage.input_tokens,
+            "gen_ai.usage.output_tokens": usage.output_tokens,
+            "gen_ai.usage.cached_input_tokens": getattr(usage, "cache_read_input_tokens", None),
+        })
+    
+    def warm_up(self):
+        """Open a pooled connection with a cheap metadata request."""
+        self.client.models.list(limit=1)
 
 
 class GeminiClient(LLMClient):
@@ -89,12 +193,23 @@ class GeminiClient(LLMClient):
         self.model_name = model
         self.api_key = api_key
     
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7) -> str:
+    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7,
+                 budget: Optional[RequestBudget] = None) -> str:
         """Generate text using Gemini API with automatic model fallback."""
-        # Combine system prompt with user prompt for Gemini
-        full_prompt = prompt
+        return self.chat([{"role": "user", "content": prompt}], system_prompt, temperature, budget)
+    
+    @traced("llm.generate")
+    def chat(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None,
+             temperature: float = 0.7, budget: Optional[RequestBudget] = None, cache: bool = False) -> str:
+        """Continue a conversation using Gemini API (repeated prefixes are cached implicitly)."""
+        set_attributes(**{"gen_ai.system": "gemini", "gen_ai.request.model": self.model_name, "llm.streamed": budget is not None})
+        # Combine system prompt with the first user turn for Gemini
+        contents = [
+            {"role": "model" if message["role"] == "assistant" else "user", "parts": [{"text": message["content"]}]}
+            for message in messages
+        ]
         if system_prompt:
-            full_prompt = f"{system_prompt}\n\n{prompt}"
+            contents[0]["parts"][0]["text"] = f"{system_prompt}\n\n{messages[0]['content']}"
         
         generation_config = {
             "temperature": temperature,
@@ -105,20 +220,40 @@ class GeminiClient(LLMClient):
         models_to_try = [self.model_name, "gemini-2.5-flash", "gemini-2.5-flash-lite", "gemini-2.5-pro", "gemini-1.5-flash", "gemini-1.5-pro"]
         last_error = None
         
-        for model_name in models_to_try:
+        for attempt, model_name in enumerate(models_to_try):
+            set_attributes(**{"gen_ai.response.model": model_name, "llm.fallback_attempts": attempt})
             try:
                 config = {
                     "temperature": temperature,
                     "max_output_tokens": 2000,
                 }
                 
+                if budget is not None:
+                    budget.check()
+                    config["http_options"] = {"timeout": max(1, int(budget.remaining() * 1000))}
+                    parts: List[str] = []
+                    usage = None
+                    for chunk in self.client.models.generate_content_stream(
+                        model=model_name,
+                        contents=contents,
+                        config=config
+                    ):
+                        budget.check()
+                        parts.append(chunk.text or "")
+                        usage = chunk.usage_metadata or usage
+                    self._record_usage(usage)
+                    return "".join(parts)
+                
                 response = self.client.models.generate_content(
                     model=model_name,
-                    contents=full_prompt,
+                    contents=contents,
                     config=config
                 )
+                self._record_usage(response.usage_metadata)
                 
                 return response.text
+            except Cancelled:
+                raise
             except Exception as e:
                 last_error = e
                 error_str = str(e).lower()
@@ -136,26 +271,48 @@ class GeminiClient(LLMClient):
             f"💡 Solution: Try OpenAI or Anthropic by setting AI_PROVIDER in .env\n"
             f"   Or wait for quota reset: https://ai.dev/usage"
         )
+    
+    @staticmethod
+    def _record_usage(usage):
+        """Add token counts from a response's usage metadata to the current span."""
+        if usage is not None:
+            set_attributes(**{
+                "gen_ai.usage.input_tokens": usage.prompt_token_count,
+                "gen_ai.usage.output_tokens": usage.candidates_token_count,
+                "gen_ai.usage.cached_input_tokens": usage.cached_content_token_count,
+            })
+    
+    def warm_up(self):
+        """Open a pooled connection with a cheap metadata request."""
+        self.client.models.get(model=self.model_name)
 
 
 def get_llm_client() -> LLMClient:
     """Get configured LLM client."""
-    provider = config.ai_provider.lower()
+    return create_llm_client(config.ai_provider)
+
+
+def create_llm_client(provider: str, api_key: Optional[str] = None, model: Optional[str] = None) -> LLMClient:
+    """LLM client for ``provider``, with the key and model from the config unless given."""
+    provider = provider.lower()
     
     if provider == "openai":
-        if not config.openai_api_key:
+        api_key = api_key or config.openai_api_key
+        if not api_key:
             raise ValueError("OPENAI_API_KEY not set in .env file")
-        return OpenAIClient(api_key=config.openai_api_key, model=config.openai_model)
+        return OpenAIClient(api_key=api_key, model=model or config.openai_model)
     
     elif provider == "anthropic":
-        if not config.anthropic_api_key:
+        api_key = api_key or config.anthropic_api_key
+        if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not set in .env file")
-        return AnthropicClient(api_key=config.anthropic_api_key, model=config.anthropic_model)
+        return AnthropicClient(api_key=api_key, model=model or config.anthropic_model)
     
     elif provider == "gemini":
-        if not config.gemini_api_key:
+        api_key = api_key or config.gemini_api_key
+        if not api_key:
             raise ValueError("GEMINI_API_KEY not set in .env file")
-        return GeminiClient(api_key=config.gemini_api_key, model=config.gemini_model)
+        return GeminiClient(api_key=api_key, model=model or config.gemini_model)
     
     else:
         raise ValueError(f"Unsupported AI provider: {provider}. Use 'openai', 'anthropic', or 'gemini'")
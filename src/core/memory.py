@@ -1,78 +1,572 @@
 """Memory and session management for learning from past bids."""
 import json
 import os
+import queue
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from pathlib import Path
 
+from .cache import LRUCache
+from .config import check_user_id
+from .store import Store, StoreError, get_store
+from .tracing import set_attributes, traced
+
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+# Number of most recent winning bids kept for learning context
+RECENT_WINS_WINDOW = 5
+
+# Number of past winning bids included as examples in the generation prompt
+CONTEXT_EXAMPLES = 3
+
+# Number of most recent bids whose full texts stay in RAM; older ones are read from disk
+HOT_WINDOW = int(os.getenv("BID_MEMORY_HOT_WINDOW", "200"))
+
+# Write-behind batching: flush after this many queued mutations or this many seconds
+WRITE_BEHIND_BATCH = 64
+WRITE_BEHIND_INTERVAL = 0.5
+
+# Queue sentinel telling the background writer to exit after draining
+_STOP = object()
+
+# Bids sent per command when importing a local history into a shared store
+IMPORT_CHUNK = 1000
+# Seconds a node may hold the import lock; a node that dies mid-import frees it for the next one
+IMPORT_LOCK_TTL = 300
+
+# Large fields kept in the text log and loaded lazily by offset
+TEXT_FIELDS = ("project_description", "generated_bid", "project_analysis")
+
+# Small fields kept in RAM for every bid
+META_FIELDS = ("timestamp", "project_name", "total_bids", "budget_range", "won",
+               "project_type", "confidence_score", "word_count", "skills")
+
+
+class BidRecord:
+    """Compact history entry: metadata in slots, large texts loaded on demand.
+    
+    Supports dict-style ``record["field"]`` / ``record.get("field")`` access so
+    callers don't need to care whether the texts are currently in memory.
+    """
+    
+    __slots__ = META_FIELDS + ("text_offset", "_texts", "_memory")
+    
+    def __init__(self, memory: "BidMemory", meta: Dict, texts: Optional[Dict] = None):
+        """Create a record from its metadata line and, if hot, its texts."""
+        for field in META_FIELDS:
+            setattr(self, field, meta.get(field))
+        self.text_offset = meta["text_offset"]  # Byte offset in the text log (a key in a shared store)
+        self._texts = texts
+        self._memory = memory
+    
+    def texts(self) -> Dict:
+        """Large text fields, from memory if hot or from the text log otherwise."""
+        if self._texts is not None:
+            return self._texts
+        return self._memory._read_texts(self.text_offset)
+    
+    def evict(self):
+        """Drop cached texts so only metadata stays resident."""
+        self._texts = None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style field access with a default."""
+        if key in TEXT_FIELDS:
+            value = self.texts().get(key)
+        elif key in META_FIELDS:
+            value = getattr(self, key)
+        else:
+            return default
+        return default if value is None else value
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in TEXT_FIELDS:
+            return self.texts().get(key)
+        if key in META_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def to_dict(self) -> Dict:
+        """Full entry as a plain dict (loads texts if needed)."""
+        entry = {field: getattr(self, field) for field in META_FIELDS}
+        entry.update(self.texts())
+        return entry
+
 
 class BidMemory:
-    """Manages bid history and learning from past performance."""
+    """Manages bid history and learning from past performance.
     
-    def __init__(self, storage_file: str = ".bid_history.json"):
-        """Initialize bid memory with storage file."""
-        self.storage_file = Path(storage_file)
-        self.history: List[Dict] = self._load_history()
+    History is stored as two append-only JSON Lines logs: a small metadata log
+    (one line per bid, plus one line per recorded result) and a text log
+    holding descriptions, bids and analyses, referenced by byte offset. Nothing
+    is read until first use, and only metadata plus the last ``hot_window``
+    texts are kept in RAM.
+    """
     
-    def _load_history(self) -> List[Dict]:
-        """Load bid history from storage."""
-        if self.storage_file.exists():
-            try:
-                with open(self.storage_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠️  Error loading history: {e}")
-                return []
-        return []
+    def __init__(self, storage_file: str = ".bid_history.json", hot_window: int = HOT_WINDOW):
+        """Initialize bid memory with storage file (loaded lazily on first use)."""
+        self.storage_file = Path(storage_file)  # Legacy JSON history, migrated on first load
+        self.meta_file = self.storage_file.with_suffix(".jsonl")
+        self.text_file = self.storage_file.with_suffix(".texts.jsonl")
+        self.lock_file = self.storage_file.with_name(self.storage_file.name + ".lock")
+        self.index_file = self.storage_file  # Base name of the index sidecar files
+        self.hot_window = hot_window
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._loaded = False
+        self._meta_offset = 0
+        self._text_reader = None
+        self._text_reader_pid: Optional[int] = None
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        # NumPy-backed sidecars, created with the history on first use
+        self.index = None
+        self.duplicates = None
+        self.analytics = None
+        self.history: List[BidRecord] = []
+        self._reset_aggregates()
+    
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive lock shared by every worker process using this file."""
+        with self._thread_lock:
+            if fcntl is None or self._lock_depth:
+                # Re-entered from a method that already holds the file lock
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with open(self.lock_file, 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+    
+    def _sync(self):
+        """Load history on first use, then pick up entries appended by other processes."""
+        with self._thread_lock:
+            if not self._loaded:
+                self._load_history()
+                return
+            rows = len(self.history)
+            updated_rows = self._read_new_meta()
+            if len(self.history) > rows or updated_rows:
+                self._sync_indexes(updated_rows)
+    
+    def _read_new_meta(self) -> List[int]:
+        """Apply metadata appended since the last read, if the log has grown (see ``_read_meta_tail``)."""
+        try:
+            size = self.meta_file.stat().st_size
+        except OSError:
+            return []
+        return self._read_meta_tail() if size > self._meta_offset else []
+    
+    def _sync_indexes(self, updated_rows: List[int]):
+        """Extend the similarity and duplicate indexes to new history rows and refresh changed results."""
+        self.index.sync(self.history)
+        self.duplicates.sync(self.history)
+        for row in updated_rows:
+            self.index.set_won(row, self.history[row].won)
+    
+    def load(self):
+        """Load history and its indexes now instead of on first use (for warm-up)."""
+        self._sync()
     
-    def _save_history(self):
-        """Save bid history to storage."""
+    def _load_history(self):
+        """Load bid history metadata from storage, migrating older formats once."""
+        self._migrate()
+        
+        # Imported here so importing this module (and starting the server) doesn't load NumPy
+        from .analytics import BidAnalytics
+        from .dedup import DuplicateIndex
+        from .retrieval import BidIndex
+        if self.index is None:
+            self.index = BidIndex(self.index_file.with_name(self.index_file.name + ".vectors"))
+            self.duplicates = DuplicateIndex(self.index_file.with_name(self.index_file.name + ".minhash"))
+        
+        self.history = []
+        self._meta_offset = 0
+        self._reset_aggregates()
+        self.analytics = BidAnalytics()
         try:
-            with open(self.storage_file, 'w') as f:
-                json.dump(self.history, f, indent=2)
+            self._read_meta_tail()
         except Exception as e:
-            print(f"⚠️  Error saving history: {e}")
+            print(f"⚠️  Error loading history: {e}")
+        self.index.rebuild(self.history)
+        self.duplicates.rebuild(self.history)
+        self._loaded = True
+        
+        # Save rows computed during load so the next start only reads them back
+        with self._locked():
+            self.index.sync(self.history)
+            self.duplicates.sync(self.history)
+            self.index.persist()
+            self.duplicates.persist()
+    
+    def _migrate(self):
+        """Convert the legacy JSON array history into the append-only logs, once."""
+        if not self.meta_file.exists() and self.storage_file.exists():
+            with self._locked():
+                if not self.meta_file.exists():
+                    self._migrate_legacy_history()
+    
+    def _migrate_legacy_history(self):
+        """Convert a pre-existing JSON array history into the append-only logs."""
+        try:
+            with open(self.storage_file, 'r') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Error loading history: {e}")
+            return
+        
+        with open(self.text_file, 'ab') as texts, open(self.meta_file, 'ab') as meta:
+            offset = texts.tell()
+            for entry in legacy:
+                line = self._encode({field: entry.get(field) for field in TEXT_FIELDS})
+                texts.write(line)
+                fields = {field: entry.get(field) for field in META_FIELDS}
+                fields["word_count"] = len((entry.get("generated_bid") or "").split())
+                fields["skills"] = entry.get("skills") or (entry.get("project_analysis") or {}).get("required_skills")
+                meta.write(self._encode(dict(fields, text_offset=offset)))
+                offset += len(line)
+    
+    @staticmethod
+    def _encode(entry: Dict) -> bytes:
+        """Serialize one log line."""
+        return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+    
+    def _read_meta_tail(self) -> List[int]:
+        """Apply complete metadata lines written since the last read.
+        
+        Returns the rows whose result changed so callers can refresh indexes.
+        """
+        updated_rows = []
+        if not self.meta_file.exists():
+            return updated_rows
+        with open(self.meta_file, 'rb') as f:
+            f.seek(self._meta_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Another process is mid-append; pick it up next time
+                self._meta_offset += len(line)
+                self._apply_meta(json.loads(line), updated_rows)
+        return updated_rows
+    
+    def _apply_meta(self, entry: Dict, updated_rows: List[int]) -> Optional[BidRecord]:
+        """Apply one metadata line: a new bid (returned) or a result for an earlier one."""
+        if "row" in entry:
+            self._apply_result(entry["row"], entry["won"])
+            updated_rows.append(entry["row"])
+            return None
+        record = BidRecord(self, entry)
+        self.history.append(record)
+        self._track_bid(len(self.history) - 1, record)
+        return record
+    
+    def _read_texts(self, offset: int) -> Dict:
+        """Read the large text fields of one bid from the text log."""
+        try:
+            with self._thread_lock:
+                # A handle inherited across fork shares its file position; reopen per process
+                if self._text_reader is None or self._text_reader_pid != os.getpid():
+                    self._text_reader = open(self.text_file, 'rb')
+                    self._text_reader_pid = os.getpid()
+                self._text_reader.seek(offset)
+                return json.loads(self._text_reader.readline())
+        except Exception as e:
+            print(f"⚠️  Error loading bid text: {e}")
+            return {}
+    
+    def _to_dicts(self, records: List[BidRecord]) -> List[Dict]:
+        """Full entries of ``records`` (loading texts as needed)."""
+        return [record.to_dict() for record in records]
+    
+    @staticmethod
+    def _outcome(won: Optional[bool]) -> str:
+        """Map a bid's won flag to its outcome bucket."""
+        if won is True:
+            return "won"
+        if won is False:
+            return "lost"
+        return "pending"
+    
+    def _reset_aggregates(self):
+        """Clear running win/loss aggregates before (re)loading history."""
+        self._outcome_counts: Counter = Counter()
+        self._type_counts: Dict[str, Counter] = defaultdict(Counter)
+        self._recent_wins: deque = deque(maxlen=RECENT_WINS_WINDOW)
+        self._pending_by_name: Dict[str, List[int]] = defaultdict(list)
+    
+    def _track_bid(self, index: int, bid: BidRecord):
+        """Fold a single history entry into the running aggregates."""
+        outcome = self._outcome(bid.won)
+        self._outcome_counts[outcome] += 1
+        self._type_counts[bid.project_type or "Unknown"][outcome] += 1
+        if outcome == "won":
+            self._recent_wins.append(bid)
+        elif outcome == "pending":
+            self._pending_by_name[bid.project_name or ""].append(index)
+    
+    def _apply_result(self, row: int, won: bool):
+        """Move a pending bid into the won or lost bucket."""
+        bid = self.history[row]
+        if bid.won is not None:
+            return
+        pending = self._pending_by_name.get(bid.project_name or "")
+        if pending and row in pending:
+            pending.remove(row)
+            if not pending:
+                del self._pending_by_name[bid.project_name or ""]
+        
+        bid.won = won
+        outcome = self._outcome(won)
+        type_counts = self._type_counts[bid.project_type or "Unknown"]
+        self._outcome_counts["pending"] -= 1
+        self._outcome_counts[outcome] += 1
+        type_counts["pending"] -= 1
+        type_counts[outcome] += 1
+        if won:
+            self._recent_wins.append(bid)
+        self.analytics.set_outcome(row, won)
+    
+    def _write_batch(self, batch: List[Tuple]):
+        """Apply queued mutations in memory and append them to the logs in one write each.
+        
+        Each mutation is ("add", meta, texts) or ("result", project_name, won).
+        """
+        with self._locked():
+            self._sync()
+            text_offset = self.text_file.stat().st_size if self.text_file.exists() else 0
+            text_lines, meta_lines = [], []
+            added = 0
+            for mutation in batch:
+                if mutation[0] == "add":
+                    _, meta, texts = mutation
+                    line = self._encode(texts)
+                    meta["text_offset"] = text_offset
+                    text_offset += len(line)
+                    text_lines.append(line)
+                    meta_lines.append(self._encode(meta))
+                    
+                    record = BidRecord(self, meta, texts)
+                    self.history.append(record)
+                    self._track_bid(len(self.history) - 1, record)
+                    if len(self.history) > self.hot_window:
+                        self.history[-self.hot_window - 1].evict()
+                    self.index.add(record)
+                    self.duplicates.add(texts["project_description"])
+                    added += 1
+                else:
+                    _, project_name, won = mutation
+                    pending = self._pending_by_name.get(project_name)
+                    if not pending:
+                        continue
+                    # Most recent pending bid for this project
+                    row = pending[-1]
+                    meta_lines.append(self._encode({"row": row, "won": won}))
+                    self._apply_result(row, won)
+                    self.index.set_won(row, won)
+            
+            try:
+                if text_lines:
+                    with open(self.text_file, 'ab') as f:
+                        f.write(b"".join(text_lines))
+                if meta_lines:
+                    data = b"".join(meta_lines)
+                    with open(self.meta_file, 'ab') as f:
+                        f.write(data)
+                    self._meta_offset += len(data)
+            except Exception as e:
+                print(f"⚠️  Error saving history: {e}")
+                # Memory is ahead of disk now; reload from disk on next access
+                self._loaded = False
+                return
+            
+            if added:
+                self.index.persist()
+                self.duplicates.persist()
+    
+    def _submit(self, mutation: Tuple):
+        """Queue a mutation for the background writer, or write it now."""
+        with self._thread_lock:
+            # Checked under the lock, so nothing is queued behind close()'s stop marker
+            if self._queue is not None:
+                self._queue.put(mutation)
+                return
+        self._write_batch([mutation])
+    
+    def start_write_behind(self, batch_size: int = WRITE_BEHIND_BATCH,
+                           interval: float = WRITE_BEHIND_INTERVAL):
+        """Persist mutations from a background thread instead of the caller's.
+        
+        Queued bids become visible to reads once the writer flushes them, at
+        most ``interval`` seconds later; use ``flush()`` to wait for that.
+        """
+        with self._thread_lock:
+            if self._writer is not None:
+                return
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(
+                target=self._write_behind_loop, args=(self._queue, batch_size, interval),
+                name="bid-memory-writer", daemon=True
+            )
+            self._writer.start()
     
-    def add_bid(self, project_name: str, project_description: str, 
+    def _write_behind_loop(self, pending: queue.Queue, batch_size: int, interval: float):
+        """Collect queued mutations into batches and write each batch at once."""
+        stopping = False
+        while not stopping:
+            batch = [pending.get()]
+            deadline = time.monotonic() + interval
+            while len(batch) < batch_size and batch[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                stopping = True
+            mutations = [m for m in batch if m is not _STOP]
+            try:
+                if mutations:
+                    self._write_batch(mutations)
+            except Exception as e:
+                print(f"⚠️  Error saving history: {e}")
+            finally:
+                for _ in batch:
+                    pending.task_done()
+    
+    def flush(self):
+        """Block until every queued mutation has been written."""
+        pending = self._queue
+        if pending is not None:
+            pending.join()
+    
+    def close(self):
+        """Drain the write-behind queue, stop the background writer and close the text log.
+        
+        The memory stays usable afterwards, writing synchronously.
+        """
+        with self._thread_lock:
+            writer, self._writer = self._writer, None
+            pending, self._queue = self._queue, None
+            reader, self._text_reader = self._text_reader, None
+            if pending is not None:
+                pending.put(_STOP)
+        if reader is not None and self._text_reader_pid == os.getpid():
+            reader.close()
+        if writer is not None:
+            writer.join()
+    
+    @traced("BidMemory.add_bid")
+    def add_bid(self, project_name: str, project_description: str,
                 generated_bid: str, total_bids: Optional[int] = None,
-                budget_range: Optional[str] = None, won: Optional[bool] = None):
+                budget_range: Optional[str] = None, won: Optional[bool] = None,
+                project_type: Optional[str] = None, project_analysis: Optional[Dict] = None,
+                confidence_score: Optional[float] = None, skills: Optional[List[str]] = None):
         """Add a new bid to history."""
-        bid_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "project_name": project_name,
+        texts = {
             "project_description": project_description[:500],  # Truncate for storage
             "generated_bid": generated_bid,
+            "project_analysis": project_analysis,
+        }
+        meta = {
+            "timestamp": datetime.now().isoformat(),
+            "project_name": project_name,
             "total_bids": total_bids,
             "budget_range": budget_range,
             "won": won,  # None = pending, True = won, False = lost
+            "project_type": project_type,
+            "confidence_score": confidence_score,
+            "word_count": len(generated_bid.split()),
+            "skills": skills,
         }
-        self.history.append(bid_entry)
-        self._save_history()
+        set_attributes(**{"memory.write_behind": self._queue is not None})
+        self._submit(("add", meta, texts))
     
     def get_recent_bids(self, limit: int = 10) -> List[Dict]:
         """Get recent bids for context."""
-        return self.history[-limit:]
+        self._sync()
+        return self._to_dicts(self.history[-limit:])
     
     def get_winning_patterns(self) -> Dict:
         """Analyze winning bids to find patterns."""
-        won_bids = [b for b in self.history if b.get("won") is True]
-        lost_bids = [b for b in self.history if b.get("won") is False]
+        with self._thread_lock:
+            # The writer thread updates the aggregates under this lock; snapshot them together
+            self._sync()
+            total = len(self.history)
+            won_count = self._outcome_counts["won"]
+            lost_count = self._outcome_counts["lost"]
+            recent_wins = list(self._recent_wins)
+            by_project_type = {project_type: dict(counts) for project_type, counts in self._type_counts.items()}
         
         return {
-            "total_bids": len(self.history),
-            "won_count": len(won_bids),
-            "lost_count": len(lost_bids),
-            "win_rate": len(won_bids) / len(self.history) if self.history else 0,
-            "recent_wins": won_bids[-5:] if won_bids else [],
+            "total_bids": total,
+            "won_count": won_count,
+            "lost_count": lost_count,
+            "win_rate": won_count / total if total else 0,
+            "recent_wins": self._to_dicts(recent_wins),  # Texts read outside the lock
+            "by_project_type": by_project_type,
+        }
+    
+    def find_similar_wins(self, project_text: str, k: int = CONTEXT_EXAMPLES) -> List[Dict]:
+        """Get the k past winning bids whose projects are most similar to project_text."""
+        with self._thread_lock:
+            # The writer thread may be growing the index arrays; look up and resolve rows together
+            self._sync()
+            records = [self.history[row] for row, _ in self.index.search(project_text, k)]
+        return self._to_dicts(records)
+    
+    def find_duplicate(self, project_description: str) -> Optional[Dict]:
+        """Find a previously bid project that is a near-duplicate of this description."""
+        with self._thread_lock:
+            self._sync()
+            match = self.duplicates.find(project_description)
+            if match is None:
+                return None
+            row, similarity = match
+            bid = self.history[row]
+        texts = bid.texts()
+        return {
+            "project_name": bid.project_name,
+            "timestamp": bid.timestamp,
+            "similarity": round(similarity, 3),
+            "generated_bid": texts.get("generated_bid"),
+            "project_analysis": texts.get("project_analysis"),
+            "confidence_score": bid.confidence_score,
+            "won": bid.won,
         }
     
-    def get_context_for_generation(self) -> str:
-        """Get context string to improve bid generation."""
+    @traced("BidMemory.get_context_for_generation")
+    def get_context_for_generation(self, project_text: Optional[str] = None) -> str:
+        """Get context string to improve bid generation.
+        
+        When project_text is given, the examples are the most similar past wins
+        rather than simply the most recent ones.
+        """
+        resident = self._loaded
+        self._sync()
+        set_attributes(**{"memory.history_resident": resident, "memory.history_size": len(self.history)})
         if len(self.history) < 3:
             return ""
         
         patterns = self.get_winning_patterns()
-        recent = self.get_recent_bids(5)
         
         context = f"\n\n📊 LEARNING FROM PAST BIDS:\n"
         context += f"- Total bids submitted: {patterns['total_bids']}\n"
@@ -80,8 +574,14 @@ class BidMemory:
         if patterns['won_count'] > 0:
             context += f"- Success rate: {patterns['win_rate']:.1%}\n"
             context += f"- Winning bids: {patterns['won_count']}\n\n"
-            context += "Recent successful approaches:\n"
-            for bid in patterns['recent_wins'][-3:]:
+            examples = self.find_similar_wins(project_text) if project_text else []
+            if examples:
+                context += "Successful approaches on similar projects:\n"
+            else:
+                examples = patterns['recent_wins'][-CONTEXT_EXAMPLES:]
+                context += "Recent successful approaches:\n"
+            set_attributes(**{"memory.examples": len(examples)})
+            for bid in examples:
                 context += f"  • Project: {bid['project_name'][:50]}...\n"
                 context += f"    Approach: {bid['generated_bid'][:150]}...\n\n"
         
@@ -89,23 +589,303 @@ class BidMemory:
     
     def update_bid_result(self, project_name: str, won: bool):
         """Update whether a bid was won or lost."""
-        for bid in reversed(self.history):
-            if bid["project_name"] == project_name and bid.get("won") is None:
-                bid["won"] = won
-                self._save_history()
-                break
+        self._submit(("result", project_name, won))
+    
+    def get_analytics(self) -> Dict:
+        """Get vectorized win-rate breakdowns over the full history."""
+        self._sync()
+        self.analytics.refresh(self.history)
+        return self.analytics.summary()
+    
+    def export_analytics(self) -> bytes:
+        """Get the analytics snapshot as a Parquet file."""
+        self._sync()
+        self.analytics.refresh(self.history)
+        return self.analytics.to_parquet()
     
     def get_stats(self) -> Dict:
         """Get statistics for display."""
-        patterns = self.get_winning_patterns()
+        with self._thread_lock:
+            self._sync()
+            total = len(self.history)
+            won_count = self._outcome_counts["won"]
+            return {
+                "total_bids": total,
+                "won": won_count,
+                "lost": self._outcome_counts["lost"],
+                "pending": self._outcome_counts["pending"],
+                "win_rate": f"{won_count / total:.1%}" if total > 0 else "N/A",
+                "by_project_type": {
+                    project_type: dict(counts) for project_type, counts in self._type_counts.items()
+                },
+            }
+
+
+class SharedBidMemory(BidMemory):
+    """Bid memory whose history lives in a shared store, so every node reads and appends one log.
+    
+    Metadata lines form a list in the store and texts a hash, keyed by a
+    random ID. Each node keeps its own view and indexes in RAM (with the
+    index rows cached in local sidecar files) and catches up by reading the
+    list from where it left off. A write batch is one round-trip that stores
+    the texts, appends the metadata and reads the list back from this node's
+    position, so all nodes apply entries in the same order without a lock.
+    The first node to load an empty shared history copies its local file
+    history into it.
+    """
+    
+    def __init__(self, store: Store, name: str = "default", storage_file: str = ".bid_history.json",
+                 hot_window: int = HOT_WINDOW):
+        """Initialize on ``store``; ``storage_file`` is the local history to import and names the sidecars."""
+        super().__init__(storage_file, hot_window)
+        self.store = store
+        self.meta_key = f"history:{name}:meta"
+        self.text_key = f"history:{name}:texts"
+        self.index_file = self.storage_file.with_name(self.storage_file.name + ".shared")
+    
+    def _read_meta_tail(self) -> List[int]:
+        """Apply metadata appended to the shared list since the last read (one round-trip)."""
+        try:
+            lines = self.store.range(self.meta_key, self._meta_offset)
+        except StoreError as e:
+            print(f"⚠️  Error loading history: {e}")
+            return []  # Serve what is already loaded until the store is back
+        return self._apply_tail(lines)
+    
+    def _read_new_meta(self) -> List[int]:
+        """Apply new metadata; reading the list tail is itself the check for growth."""
+        return self._read_meta_tail()
+    
+    def _apply_tail(self, lines: List[bytes], hot: Optional[Dict[str, Dict]] = None) -> List[int]:
+        """Apply list items read from this node's position; ``hot`` holds texts this node just wrote."""
+        updated_rows: List[int] = []
+        for line in lines:
+            self._meta_offset += 1
+            record = self._apply_meta(json.loads(line), updated_rows)
+            if record is None:
+                continue
+            if hot and record.text_offset in hot:
+                record._texts = hot[record.text_offset]
+            if len(self.history) > self.hot_window:
+                self.history[-self.hot_window - 1].evict()
+        return updated_rows
+    
+    def _read_texts(self, offset: str) -> Dict:
+        """Read the large text fields of one bid from the store."""
+        return self._fetch_texts([offset])[0]
+    
+    def _fetch_texts(self, refs: List[str]) -> List[Dict]:
+        """Text fields of several bids in one round-trip."""
+        try:
+            values = self.store.hget(self.text_key, refs)
+        except StoreError as e:
+            print(f"⚠️  Error loading bid text: {e}")
+            return [{} for _ in refs]
+        return [json.loads(value) if value else {} for value in values]
+    
+    def _to_dicts(self, records: List[BidRecord]) -> List[Dict]:
+        """Full entries of ``records``, with the texts of cold ones fetched together."""
+        cold = [record for record in records if record._texts is None]
+        fetched = dict(zip([record.text_offset for record in cold], self._fetch_texts([record.text_offset for record in cold])))
+        entries = []
+        for record in records:
+            entry = {field: getattr(record, field) for field in META_FIELDS}
+            entry.update(record._texts if record._texts is not None else fetched[record.text_offset])
+            entries.append(entry)
+        return entries
+    
+    def _write_batch(self, batch: List[Tuple]):
+        """Append queued mutations to the shared history, then apply them in the store's order.
+        
+        A result for a bid added earlier in the same batch is sent after that
+        bid, in a second round-trip, so it can find the bid's row.
+        """
+        with self._thread_lock:
+            self._sync()
+            texts: Dict[str, bytes] = {}
+            hot: Dict[str, Dict] = {}
+            meta_lines: List[bytes] = []
+            added_names = set()
+            resulted_rows = set()
+            for mutation in batch:
+                if mutation[0] == "add":
+                    _, meta, entry_texts = mutation
+                    ref = uuid.uuid4().hex
+                    meta["text_offset"] = ref
+                    texts[ref] = self._encode(entry_texts)
+                    hot[ref] = entry_texts
+                    meta_lines.append(self._encode(meta))
+                    added_names.add(meta["project_name"])
+                else:
+                    _, project_name, won = mutation
+                    if project_name in added_names:
+                        self._append(texts, meta_lines, hot)
+                        texts, hot, meta_lines, added_names = {}, {}, [], set()
+                    # Most recent pending bid for this project not already given a result here
+                    pending = [row for row in self._pending_by_name.get(project_name, []) if row not in resulted_rows]
+                    if not pending:
+                        continue
+                    resulted_rows.add(pending[-1])
+                    meta_lines.append(self._encode({"row": pending[-1], "won": won}))
+            self._append(texts, meta_lines, hot)
+    
+    def _append(self, texts: Dict[str, bytes], meta_lines: List[bytes], hot: Dict[str, Dict]):
+        """Store texts and append metadata lines, reading back everything new in the same round-trip."""
+        if not meta_lines:
+            return
+        pipeline = self.store.pipeline()
+        if texts:
+            pipeline.hset(self.text_key, texts)
+        pipeline.push(self.meta_key, meta_lines)
+        pipeline.range(self.meta_key, self._meta_offset)
+        try:
+            tail = pipeline.execute()[-1]
+        except StoreError as e:
+            # Anything the store did apply is picked up by the next read
+            print(f"⚠️  Error saving history: {e}")
+            return
+        
+        rows = len(self.history)
+        updated_rows = self._apply_tail(tail, hot)
+        self._sync_indexes(updated_rows)
+        if len(self.history) > rows:
+            with self._locked():
+                self.index.persist()
+                self.duplicates.persist()
+    
+    def _migrate(self):
+        """Copy this node's file history into the shared history if that is empty (once per store)."""
+        if not (self.meta_file.exists() or self.storage_file.exists()):
+            return
+        lock_key = f"{self.meta_key}:importing"
+        try:
+            imported, head = self.store.pipeline().get(f"{self.meta_key}:imported").range(self.meta_key, 0, 0).execute()
+            if imported or head:
+                return
+            if not self.store.set(lock_key, b"1", ttl=IMPORT_LOCK_TTL, only_new=True):
+                return  # Another node is importing its history
+        except StoreError as e:
+            print(f"⚠️  Error importing history: {e}")
+            return
+        try:
+            local = BidMemory(str(self.storage_file))
+            local.load()
+            pipeline = self.store.pipeline()
+            for start in range(0, len(local.history), IMPORT_CHUNK):
+                texts, meta_lines = {}, []
+                for record in local.history[start:start + IMPORT_CHUNK]:
+                    ref = uuid.uuid4().hex
+                    texts[ref] = self._encode(record.texts())
+                    meta_lines.append(self._encode(dict({field: getattr(record, field) for field in META_FIELDS}, text_offset=ref)))
+                pipeline.hset(self.text_key, texts)
+                pipeline.push(self.meta_key, meta_lines)
+            pipeline.execute()
+            # Marked only once the import is in, so a failed one is retried by the next node to start
+            self.store.set(f"{self.meta_key}:imported", b"1")
+            local.close()
+            print(f"✅ Imported {len(local.history)} bids from {self.storage_file} into the shared history")
+        except StoreError as e:
+            print(f"⚠️  Error importing history: {e}")
+        finally:
+            try:
+                self.store.delete(lock_key)
+            except StoreError:
+                pass  # Expires on its own
+
+
+def open_bid_memory(storage_file: str = ".bid_history.json", name: str = "default") -> BidMemory:
+    """Bid memory in local files, or in the shared store as ``name`` when STORE_URL is set."""
+    store = get_store()
+    if store.shared:
+        return SharedBidMemory(store, name, storage_file)
+    return BidMemory(storage_file)
+
+
+# Global memory instance (history is read on first use, not at import)
+bid_memory = open_bid_memory()
+
+
+class MemoryShards:
+    """One bid memory per user, each with its own history files under ``directory``.
+    
+    A shard's history and indexes are loaded on first use. Only the
+    ``max_loaded`` most recently used shards are kept; the least recently
+    used is handed to a background thread that closes it (draining its
+    pending writes), so the request that pushed it out doesn't wait, and it
+    is reloaded from its files when that user comes back. Requests still
+    holding an evicted shard finish on it safely, since every shard locks
+    its files.
+    """
+    
+    def __init__(self, directory: str = ".bid_memory", max_loaded: int = 64):
+        """Initialize with no shards loaded."""
+        self.directory = Path(directory)
+        self.write_behind = False
+        self.opened = 0
+        self._shards = LRUCache(max(1, max_loaded), on_evict=lambda _, memory: self._close_later(memory))
+        self._closing: queue.Queue = queue.Queue()  # Evicted shards waiting to be closed
+        self._closer: Optional[threading.Thread] = None
+        self._closer_pid: Optional[int] = None
+        self._closer_lock = threading.Lock()
+    
+    def get(self, user_id: str) -> BidMemory:
+        """Bid memory of ``user_id``, loaded if it isn't already."""
+        return self._shards.get_or_create(check_user_id(user_id), lambda: self._open(user_id))
+    
+    def _open(self, user_id: str) -> BidMemory:
+        """New handle on a user's history files (read on first use)."""
+        directory = self.directory / user_id
+        directory.mkdir(parents=True, exist_ok=True)
+        memory = open_bid_memory(str(directory / ".bid_history.json"), name=f"user:{user_id}")
+        if self.write_behind:
+            memory.start_write_behind()
+        self.opened += 1
+        return memory
+    
+    def start_write_behind(self):
+        """Give every shard, loaded now or later, a background writer."""
+        self.write_behind = True
+        for memory in self._shards.values():
+            memory.start_write_behind()
+    
+    def _close_later(self, memory: BidMemory):
+        """Queue an evicted shard for the closer thread, starting it in this process if needed."""
+        with self._closer_lock:
+            if self._closer is None or self._closer_pid != os.getpid():
+                self._closer = threading.Thread(target=self._close_loop, name="bid-memory-closer", daemon=True)
+                self._closer_pid = os.getpid()
+                self._closer.start()
+            self._closing.put(memory)
+    
+    def _close_loop(self):
+        """Close evicted shards one at a time."""
+        while True:
+            memory = self._closing.get()
+            try:
+                memory.close()
+            except Exception as e:
+                print(f"⚠️  Error closing bid history: {e}")
+            finally:
+                self._closing.task_done()
+    
+    def close(self):
+        """Close every loaded shard and wait for evicted ones to finish closing, draining pending writes."""
+        for _, memory in self._shards.clear():
+            memory.close()
+        self._closing.join()
+    
+    def stats(self) -> Dict:
+        """Shards loaded now, the limit, and how many have been opened and evicted."""
         return {
-            "total_bids": patterns["total_bids"],
-            "won": patterns["won_count"],
-            "lost": patterns["lost_count"],
-            "pending": patterns["total_bids"] - patterns["won_count"] - patterns["lost_count"],
-            "win_rate": f"{patterns['win_rate']:.1%}" if patterns['total_bids'] > 0 else "N/A"
+            "loaded": len(self._shards),
+            "max_loaded": self._shards.max_entries,
+            "opened": self.opened,
+            "evicted": self._shards.evictions,
         }
 
 
-# Global memory instance
-bid_memory = BidMemory()
+# Per-user bid memories, for requests that carry a user ID
+memory_shards = MemoryShards(
+    os.getenv("BID_MEMORY_DIR", ".bid_memory"),
+    max_loaded=int(os.getenv("BID_MEMORY_SHARDS", "64"))
+)
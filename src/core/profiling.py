@@ -0,0 +1,169 @@
+"""On-demand sampling profiler for the running server (standard library only)."""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# Seconds between CPU samples (100 Hz)
+SAMPLE_INTERVAL = 0.01
+
+# Frames kept per allocation traceback while tracing memory
+ALLOCATION_FRAMES = 32
+
+# Leaf frames of threads that are waiting rather than working: (file name, function)
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+# A frame: (function, file, first line of the function)
+Frame = Tuple[str, str, int]
+Stack = Tuple[Frame, ...]
+
+_running = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _path_prefixes() -> List[str]:
+    """Import roots, longest first, stripped from file names to keep labels short."""
+    roots = {os.path.join(os.path.abspath(path), "") for path in sys.path if path and os.path.isdir(path)}
+    return sorted(roots, key=len, reverse=True)
+
+
+def _short_path(filename: str, prefixes: List[str]) -> str:
+    """File name relative to the import root it lives under."""
+    for prefix in prefixes:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+def _frame_stack(frame, prefixes: List[str]) -> Stack:
+    """Stack of a Python frame, outermost call first."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        stack.append((name, _short_path(code.co_filename, prefixes), code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _is_idle(stack: Stack) -> bool:
+    """Whether a thread's stack ends in a known wait."""
+    name, path, _ = stack[-1]
+    return (os.path.basename(path), name.rsplit(".", 1)[-1]) in IDLE_FRAMES
+
+
+def sample_cpu(seconds: float, interval: float = SAMPLE_INTERVAL, include_idle: bool = False) -> Counter:
+    """Sample every thread's Python stack for ``seconds``; returns sample counts per stack.
+    
+    Each stack is rooted at a ``thread:<name>`` frame. Stacks of waiting
+    threads are left out unless ``include_idle``.
+    """
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        prefixes = _path_prefixes()
+        me = threading.get_ident()
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = _frame_stack(frame, prefixes)
+                if stack and (include_idle or not _is_idle(stack)):
+                    stacks[((f"thread:{names.get(ident, ident)}", "", 0),) + stack] += 1
+            time.sleep(interval)
+        return stacks
+    finally:
+        _running.release()
+
+
+def sample_allocations(seconds: float, frames: int = ALLOCATION_FRAMES) -> Counter:
+    """Bytes allocated during ``seconds`` and still live at the end, per allocating stack.
+    
+    Starts tracemalloc for the window unless it is already running (it slows
+    allocation-heavy code noticeably while on).
+    """
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    started = not tracemalloc.is_tracing()
+    try:
+        if started:
+            tracemalloc.start(frames)
+        prefixes = _path_prefixes()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        time.sleep(seconds)
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        stacks: Counter = Counter()
+        for diff in after.compare_to(before, "traceback"):
+            if diff.size_diff > 0:
+                # tracemalloc lists the most recent call first and records lines, not functions
+                stack = tuple((f"{_short_path(frame.filename, prefixes)}:{frame.lineno}", "", 0)
+                              for frame in reversed(diff.traceback))
+                stacks[stack] += diff.size_diff
+        return stacks
+    finally:
+        if started:
+            tracemalloc.stop()
+        _running.release()
+
+
+def _label(frame: Frame) -> str:
+    """Display name of a frame."""
+    name, path, line = frame
+    return f"{name} ({path}:{line})" if path else name
+
+
+def to_collapsed(stacks: Counter) -> str:
+    """Collapsed-stack text ("frame;frame;frame weight" per line) for flamegraph tools."""
+    lines = []
+    for stack, weight in stacks.most_common():
+        lines.append(";".join(_label(frame).replace(";", ",") for frame in stack) + f" {weight}")
+    return "\n".join(lines) + "\n"
+
+
+def to_speedscope(stacks: Counter, name: str, unit: str = "none", weight_scale: float = 1.0) -> Dict:
+    """Speedscope file with one sampled profile per root frame (thread)."""
+    frames: List[Dict] = []
+    frame_index: Dict[Frame, int] = {}
+    profiles: Dict[str, Dict] = {}
+    for stack, weight in stacks.items():
+        root, rest = (stack[0], stack[1:]) if stack[0][0].startswith("thread:") else (("all", "", 0), stack)
+        indexes = []
+        for frame in rest:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                entry: Dict = {"name": frame[0]}
+                if frame[1]:
+                    entry.update(file=frame[1], line=frame[2])
+                frames.append(entry)
+            indexes.append(frame_index[frame])
+        profile = profiles.setdefault(root[0], {
+            "type": "sampled", "name": root[0], "unit": unit,
+            "startValue": 0, "endValue": 0, "samples": [], "weights": [],
+        })
+        profile["samples"].append(indexes)
+        profile["weights"].append(weight * weight_scale)
+        profile["endValue"] += weight * weight_scale
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "ai-bid-writer",
+        "shared": {"frames": frames},
+        "profiles": sorted(profiles.values(), key=lambda profile: -profile["endValue"]),
+    }
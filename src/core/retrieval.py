@@ -0,0 +1,154 @@
+"""Similarity index over past bids for retrieving relevant learning context."""
+import math
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Dimensionality of the hashed n-gram vectors (100k bids ≈ 100 MB at float32)
+DEFAULT_DIM = 256
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "for",
+    "from", "have", "i", "i'm", "if", "in", "is", "it", "me", "my", "need", "of",
+    "on", "or", "our", "so", "that", "the", "this", "to", "we", "will", "with",
+    "you", "your",
+])
+
+
+def vectorize(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Embed text as an L2-normalized vector of signed, hashed word uni/bigrams."""
+    tokens = [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    
+    counts: Dict[int, float] = {}
+    for feature in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        bucket = h % dim
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        counts[bucket] = counts.get(bucket, 0.0) + sign
+    
+    vector = np.zeros(dim, dtype=np.float32)
+    for bucket, count in counts.items():
+        # Sublinear term frequency keeps repeated boilerplate from dominating
+        vector[bucket] = math.copysign(1.0 + math.log(abs(count)), count) if count else 0.0
+    
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def bid_text(bid: Dict) -> str:
+    """Text of a history entry used for similarity."""
+    return f"{bid.get('project_name') or ''}\n{bid.get('project_description') or ''}"
+
+
+class BidIndex:
+    """Hashed n-gram vectors for every bid in history, one row per entry.
+    
+    Rows are kept in a growable NumPy matrix aligned with ``BidMemory.history``
+    and appended to a raw float32 file next to the history, so restarts only
+    vectorize entries added since the last persist.
+    """
+    
+    def __init__(self, vectors_file: Path, dim: int = DEFAULT_DIM):
+        """Initialize an empty index backed by ``vectors_file``."""
+        self.vectors_file = Path(vectors_file)
+        self.dim = dim
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._won = np.zeros(0, dtype=bool)
+        self._rows = 0
+        self._persisted_rows = 0
+        self._rewrite = False
+    
+    def _reserve(self, rows: int):
+        """Grow the backing arrays (amortized doubling) to hold ``rows`` rows."""
+        capacity = len(self._matrix)
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 1024)
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:self._rows] = self._matrix[:self._rows]
+        won = np.zeros(capacity, dtype=bool)
+        won[:self._rows] = self._won[:self._rows]
+        self._matrix, self._won = matrix, won
+    
+    def _file_rows(self) -> int:
+        """Number of complete rows in the vectors file (0 if it is being rewritten)."""
+        if self._rewrite or not self.vectors_file.exists():
+            return 0
+        return self.vectors_file.stat().st_size // (self.dim * 4)
+    
+    def rebuild(self, history: List[Dict]):
+        """Reset the index and load it from the vectors file and history."""
+        size = self.vectors_file.stat().st_size if self.vectors_file.exists() else 0
+        # A file with more rows than history belongs to a different history; start over
+        self._rewrite = size % (self.dim * 4) != 0 or size // (self.dim * 4) > len(history)
+        self._rows = 0
+        self._persisted_rows = 0
+        self.sync(history)
+    
+    def sync(self, history: List[Dict]):
+        """Extend the index to cover history, reading persisted rows before vectorizing.
+        
+        Only new rows are touched; results for existing rows arrive through ``set_won``.
+        """
+        first_new = self._rows
+        file_rows = min(self._file_rows(), len(history))
+        self._reserve(len(history))
+        if file_rows > self._rows:
+            try:
+                stored = np.fromfile(
+                    self.vectors_file, dtype=np.float32,
+                    count=(file_rows - self._rows) * self.dim, offset=self._rows * self.dim * 4
+                ).reshape(-1, self.dim)
+                self._matrix[self._rows:self._rows + len(stored)] = stored
+                self._rows += len(stored)
+            except Exception as e:
+                print(f"⚠️  Error loading bid index: {e}")
+        for row in range(self._rows, len(history)):
+            self._matrix[row] = vectorize(bid_text(history[row]), self.dim)
+        self._won[first_new:len(history)] = [bid.get("won") is True for bid in history[first_new:]]
+        self._rows = len(history)
+        self._persisted_rows = max(self._persisted_rows, file_rows)
+    
+    def add(self, bid: Dict):
+        """Append the vector for a newly added history entry."""
+        self._reserve(self._rows + 1)
+        self._matrix[self._rows] = vectorize(bid_text(bid), self.dim)
+        self._won[self._rows] = bid.get("won") is True
+        self._rows += 1
+    
+    def set_won(self, row: int, won: Optional[bool]):
+        """Record the outcome of the bid at ``row``."""
+        self._won[row] = won is True
+    
+    def persist(self):
+        """Append rows added since the last persist to the vectors file."""
+        if self._persisted_rows == self._rows and not self._rewrite:
+            return
+        start = 0 if self._rewrite else self._persisted_rows
+        try:
+            with open(self.vectors_file, 'wb' if self._rewrite else 'ab') as f:
+                self._matrix[start:self._rows].tofile(f)
+            self._persisted_rows = self._rows
+            self._rewrite = False
+        except Exception as e:
+            print(f"⚠️  Error saving bid index: {e}")
+    
+    def search(self, text: str, k: int = 3, won_only: bool = True) -> List[Tuple[int, float]]:
+        """Return up to ``k`` (row, cosine similarity) pairs most similar to ``text``."""
+        if self._rows == 0:
+            return []
+        
+        scores = self._matrix[:self._rows] @ vectorize(text, self.dim)
+        if won_only:
+            scores = np.where(self._won[:self._rows], scores, -np.inf)
+        
+        k = min(k, self._rows)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top if scores[row] > 0]
@@ -0,0 +1,213 @@
+"""Earliest-deadline-first admission control for LLM work."""
+import asyncio
+import heapq
+import itertools
+import math
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from .store import Store, StoreError
+
+# Units accepted in a parsed "Bidding ends in ..." value
+TIME_UNIT_SECONDS = {
+    "week": 7 * 86400, "day": 86400, "hour": 3600, "hr": 3600,
+    "minute": 60, "min": 60, "second": 1, "sec": 1,
+}
+TIME_PART_PATTERN = re.compile(r"(\d+)\s*(week|day|hour|hr|minute|min|second|sec)", re.IGNORECASE)
+
+# Projects without a known closing time are treated as closing this far out (lowest priority)
+DEFAULT_DEADLINE_SECONDS = 7 * 86400
+
+
+def seconds_remaining(time_remaining: Optional[str]) -> Optional[float]:
+    """Seconds left from a value like "6 days, 23 hours" (None if it has no duration)."""
+    if not time_remaining:
+        return None
+    parts = TIME_PART_PATTERN.findall(time_remaining)
+    if not parts:
+        return None
+    return float(sum(int(amount) * TIME_UNIT_SECONDS[unit.lower()] for amount, unit in parts))
+
+
+def deadline_for(time_remaining: Optional[str], now: Optional[float] = None) -> float:
+    """Absolute deadline (wall-clock seconds) for a project's parsed time remaining."""
+    now = time.time() if now is None else now
+    remaining = seconds_remaining(time_remaining)
+    return now + (remaining if remaining is not None else DEFAULT_DEADLINE_SECONDS)
+
+
+class Overloaded(Exception):
+    """Raised when a request is not admitted; ``retry_after`` is a suggested wait in seconds."""
+    
+    def __init__(self, retry_after: int):
+        """Record the suggested wait."""
+        super().__init__(f"Server busy, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Admission:
+    """A granted slot; ``downgrade`` asks the holder to skip optional LLM calls."""
+    
+    def __init__(self, downgrade: bool):
+        """Record whether to run the reduced pipeline."""
+        self.downgrade = downgrade
+
+
+class DeadlineScheduler:
+    """Limits concurrent LLM pipelines and orders waiting ones by deadline.
+    
+    ``slots`` pipelines run at once. Waiters are served earliest deadline
+    first. When ``max_queue`` are waiting, a new request either displaces
+    the waiter with the latest deadline or, if it is itself the latest, is
+    refused. When at least ``downgrade_depth`` are waiting, admitted
+    requests closing later than ``urgent_seconds`` run the reduced pipeline.
+    All methods run on the event loop thread.
+    """
+    
+    def __init__(self, slots: int = 4, max_queue: int = 32, downgrade_depth: int = 8,
+                 urgent_seconds: float = 3600):
+        """Initialize an idle scheduler."""
+        self.slots = slots
+        self.max_queue = max_queue
+        self.downgrade_depth = downgrade_depth
+        self.urgent_seconds = urgent_seconds
+        self._running = 0
+        self._waiters: List[list] = []  # Heap of [deadline, sequence, future]
+        self._sequence = itertools.count()
+        self._service_time = 10.0  # Moving average of seconds a pipeline holds its slot
+        self._counts = {"admitted": 0, "queued": 0, "rejected": 0, "displaced": 0, "downgraded": 0}
+    
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a request joining the back of the queue."""
+        return max(1, math.ceil(self._service_time * (len(self._waiters) + 1) / self.slots))
+    
+    @asynccontextmanager
+    async def slot(self, deadline: float):
+        """Hold a pipeline slot, waiting in deadline order; raises Overloaded if refused."""
+        admission = await self._acquire(deadline)
+        started = time.monotonic()
+        try:
+            yield admission
+        finally:
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - started)
+            self._release()
+    
+    async def _acquire(self, deadline: float) -> Admission:
+        """Take a free slot or wait for one."""
+        if self._running < self.slots and not self._waiters:
+            self._running += 1
+            return self._admit(deadline, backlog=0)
+        
+        if len(self._waiters) >= self.max_queue:
+            latest = max(self._waiters)
+            if latest[0] <= deadline:
+                self._counts["rejected"] += 1
+                raise Overloaded(self.retry_after())
+            # Shed the waiter that can best afford to come back later
+            self._waiters.remove(latest)
+            heapq.heapify(self._waiters)
+            self._counts["displaced"] += 1
+            latest[2].set_exception(Overloaded(self.retry_after()))
+        
+        future = asyncio.get_running_loop().create_future()
+        entry = [deadline, next(self._sequence), future]
+        heapq.heappush(self._waiters, entry)
+        self._counts["queued"] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self._release()  # Granted a slot just as the client went away; pass it on
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+        return self._admit(deadline, backlog=len(self._waiters))
+    
+    def _admit(self, deadline: float, backlog: int) -> Admission:
+        """Grant a slot, downgrading non-urgent work while the backlog is deep."""
+        self._counts["admitted"] += 1
+        downgrade = backlog >= self.downgrade_depth and deadline - time.time() > self.urgent_seconds
+        if downgrade:
+            self._counts["downgraded"] += 1
+        return Admission(downgrade)
+    
+    def _release(self):
+        """Hand the slot to the earliest-deadline waiter, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._running -= 1
+    
+    def saturated(self) -> bool:
+        """Whether every slot is taken or requests are waiting (optional work should hold off)."""
+        return self._running >= self.slots or bool(self._waiters)
+    
+    def stats(self) -> dict:
+        """Queue depth, running pipelines and admission counters."""
+        return {
+            "running": self._running,
+            "waiting": len(self._waiters),
+            "slots": self.slots,
+            "max_queue": self.max_queue,
+            "avg_service_seconds": round(self._service_time, 2),
+            **self._counts,
+        }
+
+
+class RateLimiter:
+    """Fixed-window request counter kept in a store.
+    
+    With a shared store the counter, and so the limit, covers every node,
+    which keeps a deployment within a provider rate limit shared by all of
+    them. Windows are aligned to the wall clock so every node counts into
+    the same one.
+    """
+    
+    def __init__(self, store: Store, name: str, limit: int, window: float = 60.0):
+        """Allow ``limit`` requests per ``window`` seconds (0 = unlimited)."""
+        self.store = store
+        self.name = name
+        self.limit = limit
+        self.window = window
+    
+    def _key(self, now: float) -> str:
+        """Store key of the window containing ``now``."""
+        return f"rate:{self.name}:{int(now // self.window)}"
+    
+    def acquire(self):
+        """Count one request, raising Overloaded once the current window is full."""
+        if self.limit <= 0:
+            return
+        now = time.time()
+        window = int(now // self.window)
+        try:
+            count = self.store.incr(self._key(now), ttl=self.window * 2)
+        except StoreError as e:
+            # An unreachable store shouldn't stop bidding; the scheduler still caps concurrency
+            print(f"⚠️  Error counting requests: {e}")
+            return
+        if count > self.limit:
+            raise Overloaded(max(1, math.ceil((window + 1) * self.window - now)))
+    
+    def try_acquire(self, reserve: int = 0) -> bool:
+        """Count one low-priority request, only while more than ``reserve`` of the window is left.
+        
+        Refusals aren't counted, so optional work never takes quota from
+        requests that use ``acquire``; concurrent callers may overshoot by a few.
+        """
+        if self.limit <= 0:
+            return True
+        key = self._key(time.time())
+        try:
+            if int(self.store.get(key) or 0) + reserve >= self.limit:
+                return False
+            self.store.incr(key, ttl=self.window * 2)
+        except StoreError as e:
+            print(f"⚠️  Error counting requests: {e}")
+            return False  # Optional work can wait until the store is back
+        return True
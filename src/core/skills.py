@@ -0,0 +1,234 @@
+"""Skill index: normalized names, aliases and fuzzy matching of project skills to yours."""
+import functools
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Alternative names, keyed by canonical name (all compared after normalization)
+ALIASES: Dict[str, Tuple[str, ...]] = {
+    "python": ("py", "python3", "cpython"),
+    "javascript": ("js", "ecmascript", "es6", "vanilla js"),
+    "typescript": ("ts",),
+    "node.js": ("node", "nodejs", "node js"),
+    "react": ("react.js", "reactjs", "react js"),
+    "vue.js": ("vue", "vuejs", "vue js"),
+    "angular": ("angularjs", "angular.js"),
+    "next.js": ("nextjs", "next js"),
+    "html": ("html5",),
+    "css": ("css3",),
+    "php": ("php7", "php8"),
+    "c++": ("cpp", "cplusplus"),
+    "c#": ("csharp", "c sharp"),
+    "golang": ("go lang",),
+    "postgresql": ("postgres", "psql"),
+    "mongodb": ("mongo",),
+    "mysql": ("my sql",),
+    "web scraping": ("scraping", "web scraper", "web crawling", "data scraping", "screen scraping", "data extraction", "crawling"),
+    "data science": ("data scientist",),
+    "data analysis": ("data analytics", "data analyst"),
+    "machine learning": ("ml",),
+    "artificial intelligence": ("ai",),
+    "deep learning": ("dl",),
+    "natural language processing": ("nlp",),
+    "computer vision": ("cv", "opencv"),
+    "excel": ("microsoft excel", "ms excel", "excel vba", "spreadsheets"),
+    "wordpress": ("wp", "word press"),
+    "amazon web services": ("aws",),
+    "google cloud platform": ("gcp", "google cloud"),
+    "search engine optimization": ("seo",),
+    "user interface design": ("ui design", "ui"),
+    "user experience design": ("ux design", "ux"),
+    "restful api": ("rest api", "restful", "api development"),
+}
+
+# Words that qualify a skill without changing it ("Python programming" is Python)
+FILLER_WORDS = frozenset([
+    "programming", "development", "developer", "dev", "language", "framework",
+    "expert", "expertise", "skills", "skill", "advanced", "basic", "experienced",
+    "coding", "scripting", "engineer", "engineering", "specialist",
+])
+
+# Characters kept inside tokens, so "c++", "c#" and "node.js" survive
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+VERSION_PATTERN = re.compile(r"^v?\d+(?:\.\d+)*x?$")
+# A version glued to a name ("python3.11"), dropped only when what remains is a known name ("web3" stays)
+GLUED_VERSION_PATTERN = re.compile(r"(?<=[a-z])v?\d+(?:\.\d+)*x?$")
+
+# Minimum trigram (Dice) similarity for a fuzzy match; catches typos, not different skills
+FUZZY_THRESHOLD = 0.75
+# Terms shorter than this (after normalization) only match exactly: "go" is not "golang"
+FUZZY_MIN_CHARS = 4
+# Shorter names only count as mentions in free text when they are your skill's own name ("js", "ai" don't)
+MENTION_MIN_CHARS = 4
+
+# Project skill names remembered with their match (the cache starts over when full)
+MATCH_CACHE_SIZE = 50000
+
+# Longest run of words within a term checked against known skills ("python web scraping")
+MAX_PHRASE_WORDS = 3
+
+
+def normalize(term: str) -> str:
+    """Lowercase words of a skill name, without versions or filler ("Python 3.x Programming" -> "python")."""
+    tokens = TOKEN_PATTERN.findall(term.lower().replace("_", " ").replace("-", " ").replace("/", " "))
+    words = [t for t in tokens if not VERSION_PATTERN.match(t)]
+    # A lone filler word is the skill itself ("Development")
+    return " ".join([t for t in words if t not in FILLER_WORDS] or words)
+
+
+def trigrams(term: str) -> Set[str]:
+    """Character trigrams of a normalized term, padded so short words still have some."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Skills named by several words that are not the skill their words name: "React Native" is
+# not React, "Objective-C" is not C (normalized; runs inside these are never matched alone)
+COMPOUND_SKILLS = frozenset(normalize(name) for name in (
+    "React Native", "Objective-C", "Node-RED", "Apache Spark", "Apache Kafka", "Apache Airflow",
+    "Google Sheets", "Google Ads", "Power BI", "Power Automate", "Unreal Engine",
+))
+
+
+class SkillIndex:
+    """Your skills, indexed for matching the names projects use for them.
+    
+    Each of your skills gets a canonical key; every alias of it maps to the
+    same key. A project skill matches when its normalized name, or a run of
+    up to three of its words that doesn't split a compound skill ("React
+    Native" is not React), is a known name; otherwise when its character
+    trigrams are close enough to one. Fuzzy lookups for a whole batch of
+    names are one matrix product, and every result is memoized.
+    """
+    
+    def __init__(self, skills: Sequence[str]):
+        """Build the name table and trigram matrix for ``skills``."""
+        self.skills = [skill.strip() for skill in skills if skill.strip()]
+        canonical_of: Dict[str, str] = {}
+        for canonical, aliases in ALIASES.items():
+            for name in (canonical,) + aliases:
+                canonical_of[normalize(name)] = normalize(canonical)
+        
+        # Known name -> the first of your skills it stands for
+        self.names: Dict[str, str] = {}
+        for skill in self.skills:
+            key = normalize(skill)
+            key = canonical_of.get(key, key)
+            for name, canonical in canonical_of.items():
+                if canonical == key:
+                    self.names.setdefault(name, skill)
+            self.names.setdefault(key, skill)
+            self.names.setdefault(normalize(skill), skill)
+        
+        self._fuzzy_names = [name for name in self.names if len(name) >= FUZZY_MIN_CHARS]
+        vocabulary: Dict[str, int] = {}
+        for name in self._fuzzy_names:
+            for gram in trigrams(name):
+                vocabulary.setdefault(gram, len(vocabulary))
+        self._vocabulary = vocabulary
+        self._matrix = None  # (names x trigrams) 0/1 matrix, built on first fuzzy lookup
+        self._cache: Dict[str, Optional[str]] = {}  # Project skill name -> your skill
+    
+    def _exact(self, name: str) -> Optional[str]:
+        """Your skill for a normalized name or for the longest known run of its words."""
+        if name in self.names:
+            return self.names[name]
+        unversioned = " ".join(GLUED_VERSION_PATTERN.sub("", word) for word in name.split())
+        if unversioned in self.names:
+            return self.names[unversioned]
+        words = name.split()
+        # Word ranges of compound skills in the name; no run may cut into one
+        compounds = [
+            (start, start + size)
+            for size in range(2, min(MAX_PHRASE_WORDS, len(words)) + 1)
+            for start in range(len(words) - size + 1)
+            if " ".join(words[start:start + size]) in COMPOUND_SKILLS
+        ]
+        for size in range(min(MAX_PHRASE_WORDS, len(words) - 1), 0, -1):
+            for start in range(len(words) - size + 1):
+                end = start + size
+                if any(low < end and start < high and not (start <= low and high <= end) for low, high in compounds):
+                    continue
+                phrase = " ".join(words[start:end])
+                if phrase in self.names:
+                    return self.names[phrase]
+        return None
+    
+    def _fuzzy(self, names: List[str]) -> List[Optional[str]]:
+        """Your skill closest to each normalized name by trigram Dice similarity, if close enough."""
+        if not names or not self._fuzzy_names:
+            return [None] * len(names)
+        import numpy as np
+        
+        if self._matrix is None:
+            matrix = np.zeros((len(self._fuzzy_names), len(self._vocabulary)), dtype=np.float32)
+            for row, name in enumerate(self._fuzzy_names):
+                matrix[row, [self._vocabulary[gram] for gram in trigrams(name)]] = 1.0
+            self._sizes = matrix.sum(axis=1)
+            self._matrix = matrix  # Set last: other threads may be checking it
+        
+        queries = np.zeros((len(names), len(self._vocabulary)), dtype=np.float32)
+        query_sizes = np.empty(len(names), dtype=np.float32)
+        for row, name in enumerate(names):
+            grams = trigrams(name)
+            query_sizes[row] = len(grams)
+            queries[row, [self._vocabulary[gram] for gram in grams if gram in self._vocabulary]] = 1.0
+        
+        dice = 2 * (queries @ self._matrix.T) / (query_sizes[:, None] + self._sizes[None, :])
+        best = dice.argmax(axis=1)
+        return [
+            self.names[self._fuzzy_names[index]] if len(name) >= FUZZY_MIN_CHARS and dice[row, index] >= FUZZY_THRESHOLD else None
+            for row, (name, index) in enumerate(zip(names, best))
+        ]
+    
+    def match(self, terms: Iterable[str]) -> List[Optional[str]]:
+        """Your skill for each project skill name (None where nothing matches)."""
+        terms = list(terms)
+        misses = {term for term in terms if term not in self._cache}
+        if misses:
+            if len(self._cache) + len(misses) > MATCH_CACHE_SIZE:
+                self._cache.clear()
+            names = {term: normalize(term) for term in misses}
+            unique = sorted(set(names.values()))
+            found = {name: self._exact(name) for name in unique}
+            unresolved = [name for name in unique if found[name] is None]
+            found.update(zip(unresolved, self._fuzzy(unresolved)))
+            self._cache.update((term, found[name]) for term, name in names.items())
+        return [self._cache[term] for term in terms]
+    
+    def match_many(self, projects: Sequence[Sequence[str]]) -> List[List[Optional[str]]]:
+        """``match`` for a batch of projects' skill lists, with one fuzzy lookup for all of them."""
+        flat = self.match(term for terms in projects for term in terms)
+        results, start = [], 0
+        for terms in projects:
+            results.append(flat[start:start + len(terms)])
+            start += len(terms)
+        return results
+    
+    def score(self, required_skills: Sequence[str]) -> Tuple[List[str], float]:
+        """Required skills you have, and their share of all required skills (0-100)."""
+        matched = [skill for skill, mine in zip(required_skills, self.match(required_skills)) if mine]
+        return matched, (len(matched) / len(required_skills) * 100) if required_skills else 0.0
+    
+    @functools.cached_property
+    def mention_pattern(self) -> Optional[re.Pattern]:
+        """Regex finding any known name of your skills as whole words in lowercase text."""
+        own = {normalize(skill) for skill in self.skills}
+        names = [name for name in self.names if len(name) >= MENTION_MIN_CHARS or name in own]
+        if not names:
+            return None
+        # Longest first, so "data science" wins over "data" at the same position
+        alternatives = sorted(names, key=len, reverse=True)
+        return re.compile(r"(?<![\w+#.])(" + "|".join(re.escape(name) for name in alternatives) + r")(?![\w+#])")
+    
+    def mentions(self, text: str) -> Set[str]:
+        """Your skills named anywhere in ``text`` (by any alias)."""
+        if self.mention_pattern is None:
+            return set()
+        return {self.names[name] for name in self.mention_pattern.findall(text.lower())}
+
+
+# One per distinct skill list in use (each user profile can have its own)
+@functools.lru_cache(maxsize=128)
+def skill_index(skills: Tuple[str, ...]) -> SkillIndex:
+    """Shared index for a skill list, built on first use."""
+    return SkillIndex(skills)
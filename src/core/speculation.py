@@ -0,0 +1,130 @@
+"""Speculative execution of work a request is likely to need shortly."""
+import contextvars
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+from .budget import Cancelled, RequestBudget
+from .cache import TTLCache
+
+# How often a budgeted wait checks for cancellation
+BUDGET_POLL_SECONDS = 0.25
+
+
+def project_key(kind: str, *parts) -> str:
+    """Key for work on a project, insensitive to case and whitespace differences."""
+    normalized = "\n".join(" ".join(str(part or "").lower().split()) for part in parts)
+    return f"{kind}:{hashlib.sha1(normalized.encode('utf-8')).hexdigest()}"
+
+
+class Speculator:
+    """Starts work in the background and hands the future to whoever asks for it.
+    
+    At most ``max_concurrent`` speculations run at once; further ones are
+    skipped rather than queued, so speculation never builds a backlog.
+    ``admit``, when given, is asked before each start and can refuse it (for
+    example when a rate limit shared with real requests is nearly used up).
+    Unclaimed results expire after ``ttl`` seconds and count as wasted.
+    """
+    
+    def __init__(self, max_concurrent: int = 2, ttl: float = 120.0, max_entries: int = 128,
+                 admit: Optional[Callable[[], bool]] = None):
+        """Initialize with no work in flight."""
+        self.max_concurrent = max_concurrent
+        self.admit = admit
+        self._futures = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._running = 0
+        self._counts = {"started": 0, "used": 0, "skipped": 0, "throttled": 0, "failed": 0}
+    
+    def start(self, key: str, fn: Callable, *args, **kwargs) -> bool:
+        """Run ``fn`` in the background under ``key`` unless it is already there, at the cap, or refused."""
+        with self._lock:
+            if self._futures.get(key) is not None:
+                return False
+            if self._running >= self.max_concurrent:
+                self._counts["skipped"] += 1
+                return False
+            self._running += 1  # Reserved while ``admit`` decides, outside the lock
+        
+        if self.admit is not None and not self.admit():
+            with self._lock:
+                self._running -= 1
+                self._counts["throttled"] += 1
+            return False
+        
+        with self._lock:
+            if self._futures.get(key) is not None:  # Started by another caller meanwhile
+                self._running -= 1
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent, thread_name_prefix="speculative"
+                )
+            self._counts["started"] += 1
+            # Runs in the caller's context, so its spans join the caller's trace
+            future = self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+            self._futures.put(key, future)
+        future.add_done_callback(self._finished)
+        return True
+    
+    def _finished(self, future: Future):
+        """Free the concurrency slot of a finished speculation."""
+        with self._lock:
+            self._running -= 1
+            if not future.cancelled() and future.exception() is not None:
+                self._counts["failed"] += 1
+    
+    def take(self, key: str) -> Optional[Future]:
+        """Claim the speculation under ``key`` (finished or still running), if any."""
+        future = self._futures.pop(key)
+        if future is not None:
+            with self._lock:
+                self._counts["used"] += 1
+        return future
+    
+    def result(self, key: str, budget: Optional[RequestBudget] = None) -> Optional[Any]:
+        """Result of the speculation under ``key``, waiting for it if needed; None if absent or failed.
+        
+        With a ``budget``, waiting stops (raising Cancelled) once the request is
+        cancelled or its current stage is out of time.
+        """
+        future = self.take(key)
+        if future is None:
+            return None
+        try:
+            if budget is None:
+                return future.result()
+            while True:
+                budget.check()
+                try:
+                    return future.result(timeout=min(BUDGET_POLL_SECONDS, budget.remaining()))
+                except FutureTimeout:
+                    if future.done():
+                        raise  # The work itself timed out
+        except Cancelled:
+            raise
+        except Exception as e:
+            print(f"⚠️  Error in speculative work: {e}")
+            return None
+    
+    def stats(self) -> Dict:
+        """Counters plus the share of finished speculations nobody claimed."""
+        with self._lock:
+            counts = dict(self._counts)
+            counts["running"] = self._running
+        counts["pending"] = len(self._futures)
+        # Started but neither claimed nor still waiting to be: expired or evicted
+        counts["wasted"] = max(counts["started"] - counts["used"] - counts["pending"], 0)
+        settled = counts["used"] + counts["wasted"]
+        counts["waste_ratio"] = round(counts["wasted"] / settled, 4) if settled else None
+        return counts
+    
+    def shutdown(self):
+        """Cancel queued speculations and stop the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
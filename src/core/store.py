@@ -0,0 +1,485 @@
+"""Shared state storage: in-process, or a Redis-protocol server shared by every node.
+
+Parse handles, counters and bid history can live in a ``Store``. The
+in-process ``MemoryStore`` serves a single node; ``RedisStore`` speaks the
+Redis protocol (RESP2) to any compatible server (Redis, Valkey, KeyDB,
+...), so several nodes share the same state. Operations queued on a
+``pipeline()`` are sent together and answered in one round-trip.
+"""
+import os
+import socket
+import ssl
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlsplit
+
+from .tracing import set_attributes, traced
+
+# Shared store (redis://[:password@]host[:port][/db], or rediss:// for TLS); unset keeps state per process
+STORE_URL = os.getenv("STORE_URL", "")
+# Prefix of every key, so several deployments can share one server
+STORE_PREFIX = os.getenv("STORE_PREFIX", "bidwriter:")
+# Seconds to wait for the server before an operation fails
+STORE_TIMEOUT = float(os.getenv("STORE_TIMEOUT", "2"))
+# Idle connections kept open per process
+STORE_POOL_SIZE = int(os.getenv("STORE_POOL_SIZE", "8"))
+
+
+class StoreError(Exception):
+    """A store operation failed: the server is unreachable or answered with an error."""
+
+
+def _bytes(value: Any) -> bytes:
+    """Wire form of a key, value or argument."""
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+
+class Operations(ABC):
+    """The store operations, run at once on a store or queued on a pipeline."""
+    
+    @abstractmethod
+    def _op(self, name: str, *args) -> Any:
+        """Run or queue one operation."""
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Value of ``key``, or None if missing or expired."""
+        return self._op("get", key)
+    
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, only_new: bool = False) -> bool:
+        """Store ``value``, expiring after ``ttl`` seconds; with ``only_new``, only if ``key`` is missing."""
+        return self._op("set", key, value, ttl, only_new)
+    
+    def delete(self, key: str) -> int:
+        """Remove ``key``; returns 1 if it existed."""
+        return self._op("delete", key)
+    
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Add ``amount`` to the counter at ``key`` and return its new value (its expiry is reset to ``ttl``)."""
+        return self._op("incr", key, amount, ttl)
+    
+    def push(self, key: str, values: Sequence[bytes]) -> int:
+        """Append ``values`` to the list at ``key``; returns its new length."""
+        return self._op("push", key, list(values))
+    
+    def range(self, key: str, start: int = 0, end: int = -1) -> List[bytes]:
+        """Items ``start`` to ``end`` (inclusive; negative counts from the end) of the list at ``key``."""
+        return self._op("range", key, start, end)
+    
+    def hset(self, key: str, mapping: Dict[str, bytes]) -> int:
+        """Set fields of the hash at ``key``; returns how many were new."""
+        return self._op("hset", key, dict(mapping))
+    
+    def hget(self, key: str, fields: Sequence[str]) -> List[Optional[bytes]]:
+        """Values of ``fields`` in the hash at ``key`` (None where missing)."""
+        return self._op("hget", key, list(fields))
+
+
+class Pipeline(Operations):
+    """Operations queued to run together; ``execute()`` returns their results in order."""
+    
+    def __init__(self, store: "Store"):
+        """Start with nothing queued."""
+        self.store = store
+        self.ops: List[Tuple[str, tuple]] = []
+    
+    def _op(self, name: str, *args) -> "Pipeline":
+        """Queue one operation."""
+        self.ops.append((name, args))
+        return self
+    
+    def execute(self) -> List[Any]:
+        """Run the queued operations in one round-trip."""
+        ops, self.ops = self.ops, []
+        return self.store.execute(ops) if ops else []
+
+
+class Store(Operations):
+    """Key-value, counter, list and hash storage; see ``MemoryStore`` and ``RedisStore``."""
+    
+    shared = False  # Whether other processes and nodes see the same data
+    
+    def _op(self, name: str, *args) -> Any:
+        """Run one operation now."""
+        return self.execute([(name, args)])[0]
+    
+    def pipeline(self) -> Pipeline:
+        """Queue of operations to send in one round-trip."""
+        return Pipeline(self)
+    
+    @abstractmethod
+    def execute(self, ops: List[Tuple[str, tuple]]) -> List[Any]:
+        """Run (operation name, arguments) pairs in order and return their results.
+        
+        Raises StoreError if any failed; the others have still been applied.
+        """
+
+
+class MemoryStore(Store):
+    """Store in this process's memory, for a single node (or tests).
+    
+    Beyond ``max_keys`` keys the least recently written is dropped; expired
+    keys are dropped when next touched, or by a sweep at most once a second.
+    """
+    
+    def __init__(self, max_keys: int = 100000):
+        """Initialize an empty store."""
+        self.max_keys = max_keys
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._expiry: Dict[str, float] = {}
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+    
+    def execute(self, ops: List[Tuple[str, tuple]]) -> List[Any]:
+        """Run the operations under the store's lock, so a pipeline is atomic here."""
+        with self._lock:
+            now = time.monotonic()
+            if self._expiry and now - self._last_sweep > 1.0:
+                for key in [key for key, expires in self._expiry.items() if expires <= now]:
+                    self._remove(key)
+                self._last_sweep = now
+            results, errors = [], []
+            for name, args in ops:
+                try:
+                    results.append(getattr(self, f"_{name}")(now, *args))
+                except StoreError as e:
+                    # Like a server pipeline: the rest still run, then the first error is raised
+                    results.append(None)
+                    errors.append(e)
+            while len(self._data) > self.max_keys:
+                self._remove(next(iter(self._data)))
+        if errors:
+            raise errors[0]
+        return results
+    
+    def _remove(self, key: str):
+        """Drop a key and its expiry (caller holds the lock)."""
+        self._data.pop(key, None)
+        self._expiry.pop(key, None)
+    
+    def _live(self, key: str, now: float, kind: type) -> Any:
+        """Value at ``key`` if present and unexpired (StoreError if it's another kind)."""
+        if key in self._expiry and self._expiry[key] <= now:
+            self._remove(key)
+        value = self._data.get(key)
+        if value is not None and not isinstance(value, kind):
+            raise StoreError(f"WRONGTYPE {key} holds another kind of value")
+        return value
+    
+    def _write(self, key: str, value: Any, now: float, ttl: Optional[float] = None):
+        """Store ``value`` as the most recently written key, with ``ttl`` if given."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if ttl is not None:
+            self._expiry[key] = now + ttl
+    
+    # One method per operation, called with the lock held and the current time
+    
+    def _get(self, now: float, key: str) -> Optional[bytes]:
+        return self._live(key, now, bytes)
+    
+    def _set(self, now: float, key: str, value: bytes, ttl: Optional[float], only_new: bool) -> bool:
+        if only_new and self._live(key, now, object) is not None:
+            return False
+        self._remove(key)
+        self._write(key, _bytes(value), now, ttl)
+        return True
+    
+    def _delete(self, now: float, key: str) -> int:
+        existed = self._live(key, now, object) is not None
+        self._remove(key)
+        return int(existed)
+    
+    def _incr(self, now: float, key: str, amount: int, ttl: Optional[float]) -> int:
+        value = self._live(key, now, bytes)
+        try:
+            total = int(value or 0) + amount
+        except ValueError:
+            raise StoreError(f"{key} is not a counter")
+        self._write(key, _bytes(total), now, ttl)
+        return total
+    
+    def _push(self, now: float, key: str, values: List[bytes]) -> int:
+        items = self._live(key, now, list)
+        if items is None:
+            items = []
+        items.extend(_bytes(value) for value in values)
+        self._write(key, items, now)
+        return len(items)
+    
+    def _range(self, now: float, key: str, start: int, end: int) -> List[bytes]:
+        items = self._live(key, now, list) or []
+        return items[start:None if end == -1 else end + 1]
+    
+    def _hset(self, now: float, key: str, mapping: Dict[str, bytes]) -> int:
+        fields = self._live(key, now, dict)
+        if fields is None:
+            fields = {}
+        added = len(set(mapping) - set(fields))
+        fields.update((field, _bytes(value)) for field, value in mapping.items())
+        self._write(key, fields, now)
+        return added
+    
+    def _hget(self, now: float, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        values = self._live(key, now, dict) or {}
+        return [values.get(field) for field in fields]
+
+
+class _ReplyError(str):
+    """An error reply, kept in place so the rest of a pipeline's replies can still be read."""
+
+
+class _Connection:
+    """One socket to the server, with a buffered reader for replies."""
+    
+    def __init__(self, sock: socket.socket):
+        """Wrap a connected socket."""
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+    
+    def close(self):
+        """Close the socket, ignoring errors."""
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisStore(Store):
+    """Store on a Redis-protocol server, shared by every process and node using it.
+    
+    Speaks RESP2 over a small per-process pool of sockets, so no client
+    package is needed. Each ``execute`` writes all of its commands at once
+    and then reads all the replies: a pipeline costs one round-trip however
+    many operations it holds.
+    """
+    
+    shared = True
+    
+    def __init__(self, url: str, prefix: str = STORE_PREFIX, timeout: float = STORE_TIMEOUT,
+                 pool_size: int = STORE_POOL_SIZE):
+        """Parse ``url``; nothing connects until the first operation."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("redis", "rediss"):
+            raise ValueError(f"Unsupported store URL {url!r}: use redis:// or rediss://")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.tls = parts.scheme == "rediss"
+        self.username = unquote(parts.username) if parts.username else None
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.strip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._idle: List[_Connection] = []
+        self._pool_pid: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> _Connection:
+        """Open, authenticate and select the database on a new connection."""
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.tls:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        connection = _Connection(sock)
+        setup = []
+        if self.password:
+            setup.append(["AUTH", self.username, self.password] if self.username else ["AUTH", self.password])
+        if self.db:
+            setup.append(["SELECT", self.db])
+        if setup:
+            try:
+                connection.sock.sendall(b"".join(self._encode(command) for command in setup))
+                replies = [self._read_reply(connection.reader) for _ in setup]
+            except (OSError, ValueError):
+                connection.close()
+                raise
+            errors = [reply for reply in replies if isinstance(reply, _ReplyError)]
+            if errors:
+                connection.close()
+                raise StoreError(f"Store rejected connection setup: {errors[0]}")
+        return connection
+    
+    def _acquire(self) -> _Connection:
+        """An idle connection from this process's pool, or a new one."""
+        with self._lock:
+            if self._pool_pid != os.getpid():
+                # Sockets inherited across fork are the parent's; never share them
+                self._idle = []
+                self._pool_pid = os.getpid()
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+    
+    def _release(self, connection: _Connection):
+        """Return a healthy connection to the pool (closing it if the pool is full)."""
+        with self._lock:
+            if self._pool_pid == os.getpid() and len(self._idle) < self.pool_size:
+                self._idle.append(connection)
+                return
+        connection.close()
+    
+    @staticmethod
+    def _encode(command: List[Any]) -> bytes:
+        """A command as a RESP array of bulk strings."""
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            data = _bytes(arg)
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+    
+    @classmethod
+    def _read_reply(cls, reader) -> Any:
+        """Read one reply; error replies are returned as _ReplyError, not raised."""
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by the store")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8")
+        if kind == b"-":
+            return _ReplyError(body.decode("utf-8", errors="replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = reader.read(size + 2)
+            if len(data) != size + 2:
+                raise ConnectionError("connection closed by the store")
+            return data[:-2]
+        if kind == b"*":
+            size = int(body)
+            return None if size < 0 else [cls._read_reply(reader) for _ in range(size)]
+        raise ConnectionError(f"unexpected reply from the store: {line[:40]!r}")
+    
+    def _commands(self, name: str, args: tuple) -> Tuple[List[List[Any]], Callable[[List[Any]], Any]]:
+        """RESP commands for one operation, and how to turn their replies into its result."""
+        key = self.prefix + args[0]
+        if name == "get":
+            return [["GET", key]], lambda replies: replies[0]
+        if name == "set":
+            _, value, ttl, only_new = args
+            command = ["SET", key, value]
+            if ttl is not None:
+                command += ["PX", max(1, int(ttl * 1000))]
+            if only_new:
+                command.append("NX")
+            return [command], lambda replies: replies[0] is not None
+        if name == "delete":
+            return [["DEL", key]], lambda replies: replies[0]
+        if name == "incr":
+            _, amount, ttl = args
+            commands = [["INCRBY", key, amount]]
+            if ttl is not None:
+                commands.append(["PEXPIRE", key, max(1, int(ttl * 1000))])
+            return commands, lambda replies: replies[0]
+        if name == "push":
+            if not args[1]:
+                return [["LLEN", key]], lambda replies: replies[0]
+            return [["RPUSH", key, *args[1]]], lambda replies: replies[0]
+        if name == "range":
+            return [["LRANGE", key, args[1], args[2]]], lambda replies: replies[0]
+        if name == "hset":
+            if not args[1]:
+                return [], lambda replies: 0
+            return [["HSET", key, *(item for pair in args[1].items() for item in pair)]], lambda replies: replies[0]
+        if name == "hget":
+            if not args[1]:
+                return [], lambda replies: []
+            return [["HMGET", key, *args[1]]], lambda replies: replies[0]
+        raise ValueError(f"Unknown store operation: {name}")
+    
+    @traced("store.execute")
+    def execute(self, ops: List[Tuple[str, tuple]]) -> List[Any]:
+        """Send every operation's commands at once, then read all the replies."""
+        plans = [self._commands(name, args) for name, args in ops]
+        commands = [command for command_list, _ in plans for command in command_list]
+        set_attributes(**{"store.operations": len(ops), "store.commands": len(commands)})
+        
+        replies: List[Any] = []
+        if commands:
+            try:
+                connection = self._acquire()
+            except (OSError, ValueError) as e:
+                raise StoreError(f"Store {self.host}:{self.port} unavailable: {e}")
+            try:
+                connection.sock.sendall(b"".join(self._encode(command) for command in commands))
+                replies = [self._read_reply(connection.reader) for _ in commands]
+            except (OSError, ValueError) as e:
+                # Replies may be half-read; the connection can't be reused
+                connection.close()
+                raise StoreError(f"Store {self.host}:{self.port} unavailable: {e}")
+            self._release(connection)
+        
+        errors = [reply for reply in replies if isinstance(reply, _ReplyError)]
+        if errors:
+            raise StoreError(f"Store error: {errors[0]}")
+        results, position = [], 0
+        for command_list, decode in plans:
+            results.append(decode(replies[position:position + len(command_list)]))
+            position += len(command_list)
+        return results
+
+
+_store: Optional[Store] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Store:
+    """This process's store: shared at STORE_URL when set, else in memory."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RedisStore(STORE_URL) if STORE_URL else MemoryStore()
+        return _store
+
+
+class StoreCache:
+    """Cache with the ``TTLCache`` interface whose entries live in a store.
+    
+    With a shared store every node sees the same entries. Values pass
+    through ``encode`` and ``decode`` (to and from bytes); a store that
+    can't be reached reads as a miss.
+    """
+    
+    def __init__(self, store: Store, namespace: str, ttl: float,
+                 encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]):
+        """Keep entries under ``namespace`` for ``ttl`` seconds."""
+        self.store = store
+        self.namespace = namespace
+        self.ttl = ttl
+        self.encode = encode
+        self.decode = decode
+    
+    def put(self, key: str, value: Any):
+        """Store ``value`` under ``key``, replacing and refreshing any existing entry."""
+        try:
+            self.store.set(self.namespace + key, self.encode(value), ttl=self.ttl)
+        except StoreError as e:
+            print(f"⚠️  Error saving to {self.namespace.rstrip(':')} cache: {e}")
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Value stored under ``key``, or None if missing or expired."""
+        try:
+            raw = self.store.get(self.namespace + key)
+        except StoreError as e:
+            print(f"⚠️  Error reading {self.namespace.rstrip(':')} cache: {e}")
+            return None
+        return None if raw is None else self.decode(raw)
+    
+    def pop(self, key: str) -> Optional[Any]:
+        """Remove and return the value under ``key``, or None if missing or expired."""
+        value = self.get(key)
+        if value is not None:
+            try:
+                self.store.delete(self.namespace + key)
+            except StoreError as e:
+                print(f"⚠️  Error deleting from {self.namespace.rstrip(':')} cache: {e}")
+        return value
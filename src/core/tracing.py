@@ -0,0 +1,213 @@
+"""OpenTelemetry tracing for the bid pipeline.
+
+Spans are no-ops unless the opentelemetry packages are installed and
+``configure_tracing`` has set up an exporter.
+"""
+import functools
+import os
+import re
+from contextlib import contextmanager
+from typing import Dict, Iterator, Mapping, Optional
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:
+    propagate = trace = None
+
+TRACER_NAME = "ai-bid-writer"
+
+
+class _NoopSpan:
+    """Stand-in span when opentelemetry is not installed."""
+    
+    def set_attribute(self, key: str, value):
+        """Ignore the attribute."""
+    
+    def set_attributes(self, attributes: Dict):
+        """Ignore the attributes."""
+
+
+def _clean(attributes: Mapping) -> Dict:
+    """Drop None values, which span attributes can't hold."""
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator:
+    """Record the enclosed block as a span (a child of the current one)."""
+    if trace is None:
+        yield _NoopSpan()
+        return
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(name, attributes=_clean(attributes)) as current:
+        yield current
+
+
+@contextmanager
+def request_span(method: str, route: Optional[str], path: str, headers: Mapping[str, str]) -> Iterator:
+    """Server span for an HTTP request, continuing the caller's trace if it sent one.
+    
+    ``route`` is the matched path template ("/refine-sessions/{session_id}"),
+    so spans and sampling group by endpoint rather than by URL; requests
+    matching no route are named by their method alone. Reuses the current
+    span when the web framework already opened one.
+    """
+    if trace is None:
+        yield _NoopSpan()
+        return
+    outer = trace.get_current_span()
+    if outer.get_span_context().is_valid:
+        # The framework already records requests (FastAPI's built-in telemetry); use its span
+        yield outer
+        return
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(
+        f"{method} {route}" if route else method,
+        context=propagate.extract(headers),
+        kind=trace.SpanKind.SERVER,
+        attributes=_clean({"http.request.method": method, "http.route": route, "url.path": path}),
+    ) as current:
+        yield current
+
+
+def set_response_status(current, status_code: int):
+    """Record an HTTP status on a request span, marking server errors as failed."""
+    current.set_attribute("http.response.status_code", status_code)
+    if status_code >= 500 and trace is not None:
+        current.set_status(trace.Status(trace.StatusCode.ERROR))
+
+
+def traced(name: str):
+    """Decorator recording each call of the function as a span named ``name``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def set_attributes(**attributes):
+    """Add attributes to the current span, if any."""
+    if trace is not None:
+        trace.get_current_span().set_attributes(_clean(attributes))
+
+
+def parse_route_rates(value: str) -> Dict[str, float]:
+    """Per-route sample rates from "/route=rate,/other=rate"."""
+    rates = {}
+    for item in value.split(","):
+        route, _, rate = item.partition("=")
+        if route.strip() and rate.strip():
+            rates[route.strip()] = float(rate)
+    return rates
+
+
+def _route_sampler(default_rate: float, route_rates: Dict[str, float]):
+    """Sampler choosing a trace's rate by the route of its request span."""
+    from opentelemetry.sdk.trace.sampling import ParentBased, Sampler, TraceIdRatioBased
+    
+    class RouteSampler(Sampler):
+        """Samples root spans at the rate configured for their route (or URL path)."""
+        
+        def __init__(self):
+            """Build one ratio sampler per configured route."""
+            self._default = TraceIdRatioBased(default_rate)
+            self._routes = {route: TraceIdRatioBased(rate) for route, rate in route_rates.items()}
+            # Template keys also match raw paths, for spans opened before routing ran
+            self._templates = [
+                (re.compile(re.sub(r"\\\{[^/]*?\\\}", "[^/]+", re.escape(route)) + "$"), sampler)
+                for route, sampler in self._routes.items() if "{" in route
+            ]
+        
+        def _sampler(self, attributes: Mapping):
+            """Sampler for the span's route template, else its URL path, else the default."""
+            route = attributes.get("http.route")
+            if route in self._routes:
+                return self._routes[route]
+            path = attributes.get("url.path")
+            if path in self._routes:
+                return self._routes[path]
+            for pattern, sampler in self._templates:
+                if path and pattern.match(path):
+                    return sampler
+            return self._default
+        
+        def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None,
+                          links=None, trace_state=None):
+            """Apply the rate of the span's route, or the default rate."""
+            sampler = self._sampler(attributes or {})
+            return sampler.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+        
+        def get_description(self) -> str:
+            """Describe the configured rates."""
+            return f"RouteSampler(default={default_rate}, routes={route_rates})"
+    
+    # Spans inside a request follow its decision; background work samples at the default rate
+    return ParentBased(root=RouteSampler())
+
+
+def _exporter(kind: str, path: Optional[str]):
+    """Span exporter for ``kind``: otlp, console or file."""
+    if kind == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            raise ImportError(
+                "OTLP exporter package not installed. Run: pip install opentelemetry-exporter-otlp-proto-http"
+            )
+        return OTLPSpanExporter()  # Endpoint and headers from the standard OTEL_EXPORTER_OTLP_* variables
+    
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "file":
+        # One JSON span per line, for offline analysis
+        return ConsoleSpanExporter(
+            out=open(path or "traces.jsonl", "a", encoding="utf-8"),
+            formatter=lambda finished: finished.to_json(indent=None) + "\n"
+        )
+    raise ValueError(f"Unsupported trace exporter: {kind}. Use 'otlp', 'console', 'file' or 'none'")
+
+
+def configure_tracing() -> bool:
+    """Install a tracer provider from the environment; False when tracing is off.
+    
+    OTEL_TRACES_EXPORTER picks the exporters (comma-separated otlp, console,
+    file; default none). TRACE_FILE is the file exporter's path,
+    TRACE_SAMPLE_RATE the default sample rate and TRACE_SAMPLE_ROUTES
+    per-route overrides such as "/health=0,/smart-generate-bid=1"; routes
+    with parameters are given by template ("/refine-sessions/{session_id}=0").
+    """
+    kinds = [kind.strip().lower() for kind in os.getenv("OTEL_TRACES_EXPORTER", "none").split(",")]
+    kinds = [kind for kind in kinds if kind and kind != "none"]
+    if not kinds:
+        return False
+    if trace is None:
+        raise ImportError("OpenTelemetry package not installed. Run: pip install opentelemetry-sdk")
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        raise ImportError("OpenTelemetry SDK not installed. Run: pip install opentelemetry-sdk")
+    
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", TRACER_NAME)}),
+        sampler=_route_sampler(
+            float(os.getenv("TRACE_SAMPLE_RATE", "1.0")),
+            parse_route_rates(os.getenv("TRACE_SAMPLE_ROUTES", ""))
+        )
+    )
+    for kind in kinds:
+        provider.add_span_processor(BatchSpanProcessor(_exporter(kind, os.getenv("TRACE_FILE"))))
+    trace.set_tracer_provider(provider)
+    return True
+
+
+def shutdown_tracing():
+    """Flush and stop exporters installed by ``configure_tracing``."""
+    if trace is None:
+        return
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
@@ -0,0 +1,298 @@
+"""Project feed triage: parse pages, score them locally and draft bids for the best few.
+
+Scoring uses no LLM call, so a feed of thousands of pages can be ranked in
+about a minute; only the top candidates go through the bid generator. A
+checkpoint file records each project once scored and each bid once written,
+so an interrupted run picks up where it stopped.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from ..utils.parser import ProjectParser, ParsedProject, PLACEHOLDER_DESCRIPTIONS
+from .skills import skill_index
+
+# Weights of the score components (each is 0-1 before weighting)
+SKILL_WEIGHT = 0.6
+BUDGET_WEIGHT = 0.25
+COMPETITION_WEIGHT = 0.15
+
+# Budget midpoint (in the listing's currency) that earns the full budget component
+FULL_BUDGET_AMOUNT = 1000.0
+# Bid count at which the competition component halves
+HALF_COMPETITION_BIDS = 25
+
+# Matched skills that earn the full skill component
+FULL_SKILL_MATCHES = 3
+
+# Projects scored together (their skill tags are matched in one lookup)
+SCORE_BATCH = 256
+
+# Files read from a feed directory
+PAGE_SUFFIXES = (".html", ".htm", ".txt", ".md")
+
+AMOUNT_PATTERN = re.compile(r'\$?\s*([\d,]+(?:\.\d*)?)')
+
+
+def budget_amount(budget_range: Optional[str]) -> Optional[float]:
+    """Midpoint of a budget like "$30.00 – 250.00 AUD" or "$250 USD" (currency ignored)."""
+    if not budget_range:
+        return None
+    amounts = []
+    for match in AMOUNT_PATTERN.finditer(budget_range):
+        try:
+            amounts.append(float(match.group(1).replace(",", "")))
+        except ValueError:
+            continue
+    return sum(amounts[:2]) / len(amounts[:2]) if amounts else None
+
+
+class ProjectScorer:
+    """Scores parsed projects by skill match, budget and competition, without an LLM.
+    
+    Skills are matched through the skill index: the parsed skill tags by
+    name, alias or close spelling, and the title and description by any
+    known name as whole words.
+    """
+    
+    def __init__(self, skills: List[str], min_budget: Optional[float] = None,
+                 max_bids: Optional[int] = None):
+        """Prepare the matcher for ``skills``; projects below ``min_budget`` or above ``max_bids`` score 0."""
+        self.skill_index = skill_index(tuple(skills))
+        self.min_budget = min_budget
+        self.max_bids = max_bids
+    
+    def score_many(self, projects: List[ParsedProject]) -> List[Dict]:
+        """Score (0-100) of each project, with its components, matched skills and budget midpoint.
+        
+        The skill tags of the whole batch are matched in one lookup.
+        """
+        tag_matches = self.skill_index.match_many([parsed.required_skills or [] for parsed in projects])
+        return [self._score(parsed, tags) for parsed, tags in zip(projects, tag_matches)]
+    
+    def score(self, parsed: ParsedProject) -> Dict:
+        """Score of one project (see ``score_many``)."""
+        return self.score_many([parsed])[0]
+    
+    def _score(self, parsed: ParsedProject, tag_matches: List[Optional[str]]) -> Dict:
+        """Score a project whose skill tags have been matched."""
+        matched = {skill for skill in tag_matches if skill}
+        matched.update(self.skill_index.mentions(f"{parsed.project_name or ''}\n{parsed.project_description}"))
+        matched = sorted(matched)
+        amount = budget_amount(parsed.budget_range or parsed.average_bid)
+        
+        skill = min(1.0, len(matched) / FULL_SKILL_MATCHES)
+        # Log scale: $100 is worth much more than $10, $10,000 little more than $1,000
+        budget = min(1.0, math.log1p(amount) / math.log1p(FULL_BUDGET_AMOUNT)) if amount else 0.5
+        competition = 1.0 / (1.0 + (parsed.total_bids or 0) / HALF_COMPETITION_BIDS)
+        score = 100 * (SKILL_WEIGHT * skill + BUDGET_WEIGHT * budget + COMPETITION_WEIGHT * competition)
+        
+        if parsed.project_description in PLACEHOLDER_DESCRIPTIONS or not matched:
+            score = 0.0
+        if self.min_budget is not None and amount is not None and amount < self.min_budget:
+            score = 0.0
+        if self.max_bids is not None and (parsed.total_bids or 0) > self.max_bids:
+            score = 0.0
+        return {
+            "score": round(score, 1),
+            "matched_skills": matched,
+            "budget_amount": amount,
+            "components": {"skill": round(skill, 3), "budget": round(budget, 3), "competition": round(competition, 3)},
+        }
+
+
+def page_key(page_id: Optional[str], raw_content: str) -> str:
+    """Checkpoint key of a page: its id, else a hash of its content."""
+    if page_id:
+        return page_id
+    return "sha1:" + hashlib.sha1(raw_content.encode("utf-8")).hexdigest()
+
+
+def read_feed(source: str) -> Iterator[Tuple[str, str]]:
+    """(key, raw page) pairs from a directory of pages, an NDJSON file or "-" for NDJSON on stdin.
+    
+    NDJSON lines are {"raw_content": ..., "id": ...} objects or bare JSON
+    strings; directory pages are keyed by their relative path.
+    """
+    if source != "-" and os.path.isdir(source):
+        root = Path(source)
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and path.suffix.lower() in PAGE_SUFFIXES:
+                yield str(path.relative_to(root)), path.read_text(encoding="utf-8", errors="replace")
+        return
+    
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for index, line in enumerate(stream):
+            if not line.strip():
+                continue
+            page = json.loads(line)
+            if isinstance(page, str):
+                yield page_key(None, page), page
+            elif isinstance(page, dict) and isinstance(page.get("raw_content"), str):
+                page_id = page.get("id")
+                yield page_key(str(page_id) if page_id is not None else None, page["raw_content"]), page["raw_content"]
+            else:
+                raise ValueError(f"Line {index + 1}: expected a string or an object with raw_content")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class Checkpoint:
+    """Append-only JSON Lines record of scored projects and written bids.
+    
+    Each line is {"stage": "scored" | "bid", "key": ..., ...}. Lines are
+    flushed as they are written; a line cut short by a crash is ignored on
+    the next load.
+    """
+    
+    def __init__(self, path: Optional[str]):
+        """Load the records already in ``path`` (no file: nothing is kept)."""
+        self.path = path
+        self.scored: Dict[str, Dict] = {}
+        self.bids: Dict[str, Dict] = {}
+        self._file: Optional[IO] = None
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("stage") == "scored":
+                        self.scored[record["key"]] = record
+                    elif record.get("stage") == "bid":
+                        self.bids[record["key"]] = record
+        if path:
+            self._file = open(path, "a", encoding="utf-8")
+            if self._file.tell() and not self._ends_with_newline(path):
+                self._file.write("\n")  # Start after a line cut short by a crash
+    
+    @staticmethod
+    def _ends_with_newline(path: str) -> bool:
+        """Whether the file's last byte is a line break."""
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+    
+    def add(self, record: Dict):
+        """Keep a record and append it to the file."""
+        (self.scored if record["stage"] == "scored" else self.bids)[record["key"]] = record
+        if self._file:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+    
+    def close(self):
+        """Sync and close the file."""
+        if self._file:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+class StageStats:
+    """Items and seconds per pipeline stage."""
+    
+    def __init__(self):
+        """Start with no stages."""
+        self.items: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+    
+    def add(self, stage: str, seconds: float, items: int = 1):
+        """Count ``items`` processed in ``seconds`` by ``stage``."""
+        self.items[stage] = self.items.get(stage, 0) + items
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+    
+    def rows(self) -> List[Tuple[str, int, float, float]]:
+        """(stage, items, seconds, items per minute) in the order stages first ran."""
+        return [
+            (stage, items, self.seconds[stage], items * 60 / self.seconds[stage] if self.seconds[stage] else 0.0)
+            for stage, items in self.items.items()
+        ]
+
+
+def score_feed(pages: Iterable[Tuple[str, str]], scorer: ProjectScorer, checkpoint: Checkpoint,
+               stats: StageStats, workers: Optional[int] = None) -> int:
+    """Parse and score pages not yet in the checkpoint; returns how many were skipped as done."""
+    skipped = 0
+    keys: List[str] = []
+    
+    def pending() -> Iterator[str]:
+        nonlocal skipped
+        for key, raw_content in pages:
+            if key in checkpoint.scored:
+                skipped += 1
+                continue
+            keys.append(key)
+            yield raw_content
+    
+    parsed_pages = ProjectParser.parse_many(pending(), workers=workers)
+    scored = 0
+    while True:
+        # Reading and parsing overlap in the process pool; this is the time spent waiting on both
+        started = time.perf_counter()
+        batch = list(islice(parsed_pages, SCORE_BATCH))
+        if not batch:
+            break
+        stats.add("read+parse", time.perf_counter() - started, len(batch))
+        
+        started = time.perf_counter()
+        results = scorer.score_many(batch)
+        stats.add("score", time.perf_counter() - started, len(batch))
+        for parsed, result in zip(batch, results):
+            checkpoint.add({"stage": "scored", "key": keys[scored], **result, "project": parsed.dict()})
+            scored += 1
+    return skipped
+
+
+def top_candidates(checkpoint: Checkpoint, k: int) -> List[Dict]:
+    """The ``k`` best-scoring projects with a score above 0."""
+    ranked = sorted(checkpoint.scored.values(), key=lambda record: (-record["score"], record["key"]))
+    return [record for record in ranked if record["score"] > 0][:k]
+
+
+def draft_bids(candidates: List[Dict], bid_generator, checkpoint: Checkpoint, stats: StageStats,
+               concurrency: int = 2) -> List[Dict]:
+    """Write bids for candidates without one in the checkpoint, ``concurrency`` at a time.
+    
+    Drafts aren't saved to bid history, since they haven't been submitted.
+    Returns a bid record per candidate, in candidate order; failed drafts
+    carry an ``error`` and are retried on the next run.
+    """
+    def draft(record: Dict) -> Dict:
+        project = ParsedProject(**record["project"])
+        try:
+            bid = bid_generator.draft(
+                project_description=project.project_description,
+                project_name=project.project_name or "Project",
+                bid_rank=project.bid_rank,
+                total_bids=project.total_bids,
+                your_bid_amount=project.average_bid
+            )
+            return {"stage": "bid", "key": record["key"], "score": record["score"], **bid.dict()}
+        except Exception as e:
+            print(f"⚠️  Error writing bid for {record['key']}: {e}")
+            return {"stage": "bid", "key": record["key"], "score": record["score"], "error": str(e)}
+    
+    failed: Dict[str, Dict] = {}
+    todo = [record for record in candidates if record["key"] not in checkpoint.bids]
+    if todo:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for future in as_completed([pool.submit(draft, record) for record in todo]):
+                result = future.result()
+                if "error" in result:
+                    failed[result["key"]] = result
+                else:
+                    checkpoint.add(result)
+        stats.add("generate", time.perf_counter() - started, len(todo))
+    return [checkpoint.bids.get(record["key"]) or failed[record["key"]] for record in candidates]
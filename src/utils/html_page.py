@@ -0,0 +1,215 @@
+"""Streaming extraction of project fields from a saved project page's HTML."""
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+# Elements whose content is never rendered as text
+SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'template', 'svg', 'iframe', 'head'])
+# Site navigation rather than project content
+CHROME_TAGS = frozenset(['nav', 'footer'])
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr',
+])
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'li', 'main', 'ol', 'p', 'pre', 'section', 'table', 'td', 'th',
+    'tr', 'ul',
+])
+
+# Open elements searched for the match of a closing tag; stray closers deeper than this are ignored
+END_TAG_SEARCH_DEPTH = 64
+# Parent elements climbed from a flag image looking for the city next to it
+FLAG_CLIMB_LEVELS = 3
+
+# Links to a skill's job listing, e.g. /jobs/python/ or https://www.freelancer.com/jobs/php
+SKILL_LINK_PATTERN = re.compile(r'^(?:https?://[^/]+)?/jobs/[\w.+#-]+/?$')
+WHITESPACE_RUN_PATTERN = re.compile(r'\s+')
+
+
+def collapse(text: str) -> str:
+    """Text with every whitespace run collapsed to one space."""
+    return WHITESPACE_RUN_PATTERN.sub(' ', text).strip()
+
+
+class ProjectPageExtractor(HTMLParser):
+    """Single-pass extractor fed a project page's HTML in chunks.
+    
+    Rendered text is kept in two sinks: the description element's text,
+    and the rest of the page (labels and numbers for the text field
+    patterns). Title, description, skills and client location are read
+    from the elements that hold them.
+    """
+    
+    def __init__(self):
+        """Initialize an empty extraction."""
+        super().__init__(convert_charrefs=True)
+        # Open elements: [tag, index of the first text part inside it, role]
+        self._stack: List[list] = []
+        self._skip = 0
+        self._chrome = 0
+        self._text_parts: List[str] = []
+        self._description_parts: Optional[List[str]] = None
+        self._descriptions: List[str] = []
+        self._skills_depth = 0
+        self._link_parts: Optional[List[str]] = None
+        self._link_is_skill = False
+        self._h1_parts: Optional[List[str]] = None
+        self._title_parts: Optional[List[str]] = None
+        self._flag: Optional[Dict] = None
+        
+        self.h1: Optional[str] = None
+        self.title: Optional[str] = None
+        self.meta: Dict[str, str] = {}
+        self.container_skills: List[str] = []
+        self.link_skills: List[str] = []
+        self.country: Optional[str] = None
+        self.city: Optional[str] = None
+    
+    @property
+    def text(self) -> str:
+        """Rendered page text outside the description, one block per line."""
+        return ''.join(self._text_parts)
+    
+    @property
+    def description(self) -> Optional[str]:
+        """Longest description element's text, paragraphs separated by blank lines."""
+        if not self._descriptions:
+            return None
+        return max(self._descriptions, key=len)
+    
+    def _sink(self) -> List[str]:
+        """Where rendered text currently goes."""
+        return self._description_parts if self._description_parts is not None else self._text_parts
+    
+    def handle_starttag(self, tag: str, attrs: List):
+        """Track the element's role and start a new block if it is one."""
+        attributes = {name: value or '' for name, value in attrs}
+        if tag == 'meta':
+            key = attributes.get('property') or attributes.get('name')
+            if key and 'content' in attributes:
+                self.meta.setdefault(key.lower(), attributes['content'])
+            return
+        if tag == 'title' and self.title is None and (not self._stack or self._stack[-1][0] == 'head'):
+            self._title_parts = []
+            return
+        if self._skip:
+            if tag not in VOID_TAGS:
+                self._stack.append([tag, len(self._text_parts), None])
+            return
+        
+        if tag == 'img':
+            alt = attributes.get('alt') or attributes.get('title') or ''
+            if alt.startswith('Flag of') and self._flag is None and self.country is None:
+                # The city is text in an element around the flag, found when it closes
+                self._flag = {'country': alt[len('Flag of'):].strip(), 'depth': len(self._stack), 'levels': 0}
+            return
+        if tag in BLOCK_TAGS or '-' in tag:  # Custom elements render as blocks
+            self._sink().append('\n')
+        if tag in VOID_TAGS:
+            return
+        
+        role = None
+        marker = ' '.join((attributes.get('class', ''), attributes.get('id', ''),
+                           attributes.get('itemprop', ''))).lower()
+        if tag in SKIP_TAGS:
+            role = 'skip'
+            self._skip += 1
+        elif tag in CHROME_TAGS:
+            role = 'chrome'
+            self._chrome += 1
+        elif 'description' in marker and self._description_parts is None and not self._chrome:
+            role = 'description'
+            self._description_parts = []
+        elif 'skill' in marker and not self._chrome:
+            role = 'skills'
+            self._skills_depth += 1
+        elif tag == 'h1' and self.h1 is None and self._h1_parts is None:
+            role = 'h1'
+            self._h1_parts = []
+        elif tag == 'a' and self._link_parts is None:
+            role = 'link'
+            self._link_parts = []
+            self._link_is_skill = bool(SKILL_LINK_PATTERN.match(attributes.get('href', '').strip()))
+        self._stack.append([tag, len(self._text_parts), role])
+    
+    def handle_endtag(self, tag: str):
+        """Close the element and any unclosed elements inside it."""
+        if tag == 'title' and self._title_parts is not None:
+            self.title = collapse(''.join(self._title_parts))
+            self._title_parts = None
+            return
+        stack = self._stack
+        for position in range(len(stack) - 1, max(-1, len(stack) - 1 - END_TAG_SEARCH_DEPTH), -1):
+            if stack[position][0] == tag:
+                while len(stack) > position:
+                    self._close(stack.pop())
+                break
+        if (tag in BLOCK_TAGS or '-' in tag) and not self._skip:
+            self._sink().append('\n')
+    
+    def _close(self, element: list):
+        """Finish whatever role the element had."""
+        _, text_start, role = element
+        if role == 'skip':
+            self._skip -= 1
+        elif role == 'chrome':
+            self._chrome -= 1
+        elif role == 'description':
+            paragraphs = [collapse(line) for line in ''.join(self._description_parts).split('\n')]
+            self._descriptions.append('\n\n'.join(p for p in paragraphs if p))
+            self._description_parts = None
+        elif role == 'skills':
+            self._skills_depth -= 1
+        elif role == 'h1':
+            self.h1 = collapse(''.join(self._h1_parts)) or None
+            self._h1_parts = None
+        elif role == 'link':
+            text = collapse(''.join(self._link_parts))
+            if self._link_is_skill and text and not self._chrome:
+                self.link_skills.append(text)
+            self._link_parts = None
+        
+        flag = self._flag
+        if flag and len(self._stack) < flag['depth']:
+            city = collapse(''.join(self._text_parts[text_start:]))
+            if city or flag['levels'] >= FLAG_CLIMB_LEVELS:
+                self._set_location(flag['country'], city)
+            else:
+                flag['depth'] = len(self._stack)
+                flag['levels'] += 1
+    
+    def _set_location(self, country: str, city: str):
+        """Record the client's country and city, dropping a repeated country name."""
+        if city.lower().endswith(country.lower()):
+            city = city[:len(city) - len(country)].rstrip(' ,')
+        self.country = country
+        self.city = city[:100] or None
+        self._flag = None
+    
+    def handle_data(self, data: str):
+        """Route rendered text to the sinks collecting it."""
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        if self._skip:
+            return
+        # Line breaks in the source are just spaces; blocks start new lines
+        data = WHITESPACE_RUN_PATTERN.sub(' ', data)
+        self._sink().append(data)
+        if self._h1_parts is not None:
+            self._h1_parts.append(data)
+        if self._link_parts is not None:
+            self._link_parts.append(data)
+        if self._skills_depth and not self._chrome:
+            text = collapse(data)
+            if text:
+                self.container_skills.append(text)
+    
+    def close(self):
+        """Flush buffered input and close every element left open."""
+        super().close()
+        while self._stack:
+            self._close(self._stack.pop())
+        if self._flag:
+            self._set_location(self._flag['country'], '')
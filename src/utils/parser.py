@@ -1,8 +1,89 @@
 """Parser for extracting project details from pasted content."""
+import multiprocessing
+import os
 import re
-from typing import Optional, Dict, Any
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Optional, Dict, Iterable, Iterator, List, Tuple
 from pydantic import BaseModel
 
+from src.core.tracing import span
+from src.utils.html_page import ProjectPageExtractor
+
+# Descriptions returned when no real project text could be extracted
+EMPTY_CONTENT_DESCRIPTION = "Please paste the complete project description from Freelancer.com including the full project details."
+UNPARSEABLE_CONTENT_DESCRIPTION = "Unable to extract clean description. Please paste the FULL project page content starting from the project title."
+PLACEHOLDER_DESCRIPTIONS = (EMPTY_CONTENT_DESCRIPTION, UNPARSEABLE_CONTENT_DESCRIPTION)
+
+# Pasted content beyond this many characters is ignored
+MAX_CONTENT_CHARS = int(os.getenv("PARSER_MAX_CHARS", "500000"))
+# Wall-clock budget for one parse; past it the scan stops and keeps what it found
+PARSE_TIME_BUDGET = float(os.getenv("PARSER_TIME_BUDGET_MS", "250")) / 1000
+# Saved HTML pages carry markup and scripts, so they may be larger than pasted text
+MAX_HTML_CHARS = int(os.getenv("PARSER_MAX_HTML_CHARS", "4000000"))
+# HTML is fed to the streaming parser this many characters at a time, checking the
+# time budget between pieces (deeply nested tags cost ~20 µs each)
+HTML_FEED_CHARS = 8192
+
+# Keyword vocabularies (matched as substrings of a lowercased line)
+UI_NOISE = (
+    'open', 'bids', 'details', 'proposals', 'project details',
+    'average bid', 'bidding ends', 'flag of', 'member since',
+    'skills required', 'about the client', 'place a bid',
+    'fixed-price', 'hourly', 'milestone'
+)
+DESCRIPTION_START = (
+    "i'm", "i am", "we need", "we are", "we're", "looking for",
+    "need a", "need an", "seeking", "required:", "project:",
+    "this project", "the project", "my project"
+)
+PAGE_NOISE = ('click here', 'sign up', 'login', 'register', 'browse', 'search')
+SKILLS_HEADER = ('skills required', 'skill required')
+SKILLS_STOP = (
+    'about the client', 'project details', 'bids', 'average',
+    'bidding ends', 'member since', 'place a bid'
+)
+
+# Exact lines that are UI labels rather than a title or a skill
+TITLE_LABELS = frozenset(['open', 'bids', 'details', 'proposals', 'project details', 'average bid'])
+SKILL_LABELS = frozenset(['open', 'details', 'proposals', 'fixed', 'hourly'])
+
+# Field patterns, only tried on lines containing their label. Every pattern
+# is written so adjacent quantifiers never compete for the same characters
+# (numbers are [\d,]+(?:\.\d*)? rather than [\d,]+\.?\d*, line breaks are
+# [^\S\n]*\n\s* rather than \s*\n+\s*), so a failed attempt backtracks over
+# each character at most once and every search is linear in its input.
+AMOUNT = r'[\d,]+(?:\.\d*)?'
+BUDGET_PATTERN = re.compile(rf'\${AMOUNT}\s*[-–—]\s*\$?{AMOUNT}\s*[A-Z]{{3}}')
+AVERAGE_BUDGET_PATTERN = re.compile(rf'Average bid\s*\${AMOUNT}\s*[A-Z]{{3}}')
+AVERAGE_BID_PATTERN = re.compile(rf'Average bid\s*\$?({AMOUNT})\s*([A-Z]{{3}})')
+# A count is only tried from the first digit of a run (later starts end the same way)
+TOTAL_BIDS_PATTERN = re.compile(r'(?:Bids[^\S\n]*\n\s*(\d+)|(?<!\d)(\d+)\s+bids?)', re.IGNORECASE)
+TIME_REMAINING_PATTERN = re.compile(r'Bidding ends in\s+(.+?)(?:\n|$)')
+RANK_PATTERN = re.compile(r'rank at #(\d+)')
+FLAG_PATTERN = re.compile(r'\s+([A-Z]+)')  # Country code after "Flag of"
+# Reversed number (\d+(?:\.\d*)?) read from the end of a line
+NUMBER_SUFFIX_PATTERN = re.compile(r'(?:\d*\.)?\d+')
+DIGITS_PATTERN = re.compile(r'\d+')
+WHITESPACE_PATTERN = re.compile(r'\s*')
+BUDGET_LINE_PATTERN = re.compile(rf'^\${AMOUNT}\s*[-–—]')
+AMOUNT_LINE_PATTERN = re.compile(r'^\$[\d,]+')
+WORD_RUN_PATTERN = re.compile(r'[\w\s]*')
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+
+# How far past a candidate line a field pattern may reach (values on the next line)
+CROSS_LINE_CHARS = 512
+# Content scanned, or lines read, between checks of the time budget (short label
+# lines each search a CROSS_LINE_CHARS window, so lines are counted too)
+BUDGET_CHECK_CHARS = 16384
+BUDGET_CHECK_LINES = 256
+
+# Bulk parsing: pages sent to a worker process at a time, and chunks queued per worker
+PARSE_CHUNK_PAGES = 16
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
 
 class ParsedProject(BaseModel):
     """Parsed project information."""
@@ -16,259 +97,395 @@ class ParsedProject(BaseModel):
     client_location: Optional[str] = None
     client_rating: Optional[str] = None
     required_skills: Optional[list[str]] = []
+    truncated: bool = False  # Input was cut at MAX_CONTENT_CHARS or the time budget ran out
 
 
-class ProjectParser:
-    """Parses pasted project content to extract structured information."""
+class KeywordMatcher:
+    """Test a line for any of a set of lowercase keywords in one regex search.
+    
+    The keywords are compiled into a trie-shaped pattern, so shared prefixes
+    are matched once and each position is tried against all keywords in a
+    single step, like an Aho-Corasick automaton.
+    """
+    
+    def __init__(self, keywords: Tuple[str, ...]):
+        """Compile the matcher for ``keywords``."""
+        self.keywords = keywords
+        self._pattern = re.compile(self._trie_pattern(keywords))
     
     @staticmethod
-    def parse(raw_content: str) -> ParsedProject:
-        """Parse raw pasted content and extract project details."""
-        
-        # Extract project name (usually the first line or title)
-        project_name = ProjectParser._extract_project_name(raw_content)
+    def _trie_pattern(keywords: Tuple[str, ...]) -> str:
+        """Regex for the keywords, branching one character at a time."""
+        trie: Dict[str, Dict] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
         
-        # Extract project description (the main requirements text)
-        project_description = ProjectParser._extract_description(raw_content)
+        def build(node: Dict[str, Dict]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if '' in node:
+                return ''  # A keyword ends here; matching it is enough
+            return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
         
-        # Extract budget
-        budget_range = ProjectParser._extract_budget(raw_content)
-        
-        # Extract bid information
-        bid_info = ProjectParser._extract_bid_info(raw_content)
-        
-        # Extract client information
-        client_info = ProjectParser._extract_client_info(raw_content)
-        
-        # Extract required skills
-        required_skills = ProjectParser._extract_skills(raw_content)
-        
-        return ParsedProject(
-            project_name=project_name,
-            project_description=project_description,
-            budget_range=budget_range,
-            bid_rank=bid_info.get('rank'),
-            total_bids=bid_info.get('total'),
-            average_bid=bid_info.get('average'),
-            time_remaining=bid_info.get('time_remaining'),
-            client_location=client_info.get('location'),
-            client_rating=client_info.get('rating'),
-            required_skills=required_skills
-        )
+        return build(trie)
+    
+    def search(self, lowered: str) -> bool:
+        """Whether a lowercased line contains any of the keywords."""
+        return self._pattern.search(lowered) is not None
+
+
+NOISE_MATCHER = KeywordMatcher(UI_NOISE)
+START_MATCHER = KeywordMatcher(DESCRIPTION_START)
+PAGE_NOISE_MATCHER = KeywordMatcher(PAGE_NOISE)
+SKILLS_HEADER_MATCHER = KeywordMatcher(SKILLS_HEADER)
+SKILLS_STOP_MATCHER = KeywordMatcher(SKILLS_STOP)
+
+
+class ProjectParser:
+    """Parses pasted project content to extract structured information."""
     
     @staticmethod
-    def _extract_project_name(content: str) -> Optional[str]:
-        """Extract project title/name."""
-        lines = content.strip().split('\n')
-        # Usually the first significant line
-        for line in lines[:10]:
-            line = line.strip()
-            if line and len(line) < 100 and not line.startswith('$'):
-                # Skip common headers and UI elements
-                if line.lower() not in ['open', 'bids', 'details', 'proposals', 'project details', 'average bid']:
-                    # Skip lines that are just numbers
-                    if not re.match(r'^\d+$', line):
-                        return line
-        return None
+    def parse(raw_content: str, max_chars: Optional[int] = None,
+              time_budget: float = PARSE_TIME_BUDGET) -> ParsedProject:
+        """Parse pasted text or a saved project page's HTML, detected from the content."""
+        html = ProjectParser.looks_like_html(raw_content)
+        with span("ProjectParser.parse", **{"parse.html": html, "parse.chars": len(raw_content)}) as current:
+            if html:
+                parsed = ProjectParser.parse_html(raw_content, max_chars or MAX_HTML_CHARS, time_budget)
+            else:
+                parsed = ProjectParser.parse_text(raw_content, max_chars or MAX_CONTENT_CHARS, time_budget)
+            current.set_attribute("parse.truncated", parsed.truncated)
+            return parsed
     
     @staticmethod
-    def _extract_description(content: str) -> str:
-        """Extract ONLY the actual project description, removing ALL UI noise."""
+    def looks_like_html(raw_content: str) -> bool:
+        """Whether content is an HTML document rather than copied page text."""
+        head = raw_content[:1024].lstrip().lower()
+        return head.startswith('<') and ('<!doctype html' in head or '<html' in head)
+    
+    @staticmethod
+    def parse_html(html: str, max_chars: int = MAX_HTML_CHARS,
+                   time_budget: float = PARSE_TIME_BUDGET) -> ParsedProject:
+        """Parse the saved HTML of a project page in one streaming pass.
         
-        # If content is too short, it's probably not valid
-        if not content or len(content.strip()) < 50:
-            return "Please paste the complete project description from Freelancer.com including the full project details."
+        Title, description, skills and client location come from the elements
+        holding them. The rest of the rendered text, without the description,
+        goes through the text field patterns for budget, bids and rating.
+        """
+        truncated = len(html) > max_chars
+        html = html[:max_chars]
+        deadline = time.monotonic() + time_budget
+        page = ProjectPageExtractor()
+        for start in range(0, len(html), HTML_FEED_CHARS):
+            if time.monotonic() > deadline:
+                truncated = True
+                break
+            page.feed(html[start:start + HTML_FEED_CHARS])
+        page.close()
+        
+        parsed = ProjectParser.parse_text(
+            page.text, MAX_CONTENT_CHARS, max(deadline - time.monotonic(), 0.0)
+        )
+        description = page.description
+        if not description or len(description) < 50:
+            description = page.meta.get('og:description') or page.meta.get('description') or description
+        title = page.meta.get('og:title') or (page.title or '').split(' | ')[0]
+        skills = [
+            skill for skill in page.container_skills
+            if 2 < len(skill) < 50 and skill.lower() not in SKILL_LABELS
+            and not SKILLS_HEADER_MATCHER.search(skill.lower())
+        ] or page.link_skills
         
-        # Remove everything before the actual description starts
-        # Look for the first paragraph that starts with "I'm" or "I am" or similar
-        description_start_patterns = [
-            r"I'm", r"I am", r"We need", r"We are", r"We're", r"Looking for",
-            r"Need a", r"Need an", r"Seeking", r"Required:", r"Project:",
-            r"This project", r"The project", r"My project"
-        ]
+        if description and len(description) >= 50:
+            parsed.project_description = description
+        parsed.project_name = page.h1 or title or parsed.project_name
+        if skills:
+            parsed.required_skills = list(dict.fromkeys(skills))[:10]
+        if page.country:
+            parsed.client_location = f"{page.city}, {page.country}" if page.city else page.country
+        parsed.truncated = parsed.truncated or truncated
+        return parsed
+    
+    @staticmethod
+    def parse_text(raw_content: str, max_chars: int = MAX_CONTENT_CHARS,
+                   time_budget: float = PARSE_TIME_BUDGET) -> ParsedProject:
+        """Parse raw pasted content and extract all project details in one scan.
         
+        Runs in time linear in the input. Content past ``max_chars`` is
+        ignored, and the scan stops once ``time_budget`` seconds have passed;
+        either way the result is marked ``truncated``.
+        """
+        truncated = len(raw_content) > max_chars
+        content = raw_content[:max_chars]
         lines = content.split('\n')
+        deadline = time.monotonic() + time_budget
+        check_at = BUDGET_CHECK_CHARS
+        check_line = BUDGET_CHECK_LINES
+        
+        # Title: first plausible line among the first 10 (counted from the first non-blank line)
+        project_name = None
+        title_lines_left = 10
+        
+        # Description: prose from the first line that reads like a brief; long
+        # paragraphs are kept as a fallback if no such line is found
+        description_lines: List[str] = []
         description_started = False
-        description_lines = []
+        description_ended = False
+        substantial_lines: List[str] = []
+        
+        # Skills: up to 14 lines after the first "Skills Required" header
+        skills: List[str] = []
+        skills_lines_left: Optional[int] = None
+        
+        budget_range = None
+        average_budget = None
+        info: Dict[str, Any] = {}
         
-        for line in lines:
+        offset = 0
+        previous_start = 0  # Start of the previous non-blank line
+        location_checked_until = 0  # Runs of text before this offset have been searched
+        for index, line in enumerate(lines):
+            start = offset
+            end = offset + len(line)
+            offset = end + 1
+            if start >= check_at or index >= check_line:
+                if time.monotonic() > deadline:
+                    truncated = True
+                    break
+                check_at = start + BUDGET_CHECK_CHARS
+                check_line = index + BUDGET_CHECK_LINES
             stripped = line.strip()
+            lowered = stripped.lower()
             
-            # Skip empty lines
-            if not stripped:
-                if description_started:
-                    description_lines.append('')  # Keep paragraph breaks
-                continue
-            
-            # Skip obvious UI elements (case-insensitive)
-            lower_stripped = stripped.lower()
-            if any(noise in lower_stripped for noise in [
-                'open', 'bids', 'details', 'proposals', 'project details',
-                'average bid', 'bidding ends', 'flag of', 'member since',
-                'skills required', 'about the client', 'place a bid',
-                'fixed-price', 'hourly', 'milestone'
-            ]):
-                # But allow if it's part of a longer sentence (not just a header)
-                if len(stripped) < 40:
-                    continue
-            
-            # Skip budget lines
-            if re.match(r'^\$[\d,]+\.?\d*\s*[-–—]', stripped):
-                continue
+            if title_lines_left and (stripped or title_lines_left < 10):
+                title_lines_left -= 1
+                if (stripped and len(stripped) < 100 and not stripped.startswith('$')
+                        and lowered not in TITLE_LABELS and not stripped.isdecimal()):
+                    project_name = stripped
+                    title_lines_left = 0
             
-            # Skip single numbers (like bid counts)
-            if re.match(r'^\d+$', stripped):
-                continue
+            if skills_lines_left:
+                skills_lines_left -= 1
+                if SKILLS_STOP_MATCHER.search(lowered):
+                    # Hit the next section
+                    skills_lines_left = 0
+                elif (2 < len(stripped) < 50 and lowered not in SKILL_LABELS
+                        and not AMOUNT_LINE_PATTERN.match(stripped)):
+                    skills.append(stripped)
+            elif skills_lines_left is None and SKILLS_HEADER_MATCHER.search(lowered):
+                skills_lines_left = 14
             
-            # Skip very short lines (likely UI labels)
-            if len(stripped) < 25:
+            if not stripped:
+                if description_started and not description_ended:
+                    description_lines.append('')  # Keep paragraph breaks
                 continue
             
-            # Check if description starts
-            if not description_started:
-                for pattern in description_start_patterns:
-                    if re.search(pattern, stripped, re.IGNORECASE):
+            # Description: skip UI labels, budget lines, bare numbers and short lines
+            if len(stripped) >= 100 and len(substantial_lines) < 3 and not PAGE_NOISE_MATCHER.search(lowered):
+                substantial_lines.append(stripped)
+            if (not description_ended and len(stripped) >= 25
+                    and not (len(stripped) < 40 and NOISE_MATCHER.search(lowered))
+                    and not (stripped.startswith('$') and BUDGET_LINE_PATTERN.match(stripped))
+                    and not stripped.isdecimal()):
+                if not description_started:
+                    if START_MATCHER.search(lowered):
                         description_started = True
                         description_lines.append(stripped)
-                        break
-            else:
-                # We're in the description, keep adding until we hit a stop marker
-                if any(stop in stripped for stop in ['Skills Required', 'About the Client']) and len(stripped) < 30:
-                    break
-                description_lines.append(stripped)
-        
-        if description_lines:
-            # Join and clean up
-            full_description = '\n\n'.join(description_lines).strip()
-            # If we got at least 100 characters, it's probably valid
-            if len(full_description) >= 100:
-                return full_description
-        
-        # Enhanced fallback: try to find ANY substantial paragraph
-        substantial_lines = []
-        for line in lines:
-            stripped = line.strip()
-            # Find lines that are substantial (100+ chars) and don't look like UI
-            if len(stripped) >= 100:
-                lower = stripped.lower()
-                # Skip if it's obviously UI noise
-                if not any(noise in lower for noise in ['click here', 'sign up', 'login', 'register', 'browse', 'search']):
-                    substantial_lines.append(stripped)
-        
-        if substantial_lines:
-            return '\n\n'.join(substantial_lines[:3])  # Return first 3 substantial paragraphs
+                elif len(stripped) < 30 and ('Skills Required' in stripped or 'About the Client' in stripped):
+                    description_ended = True
+                else:
+                    description_lines.append(stripped)
+            
+            # Field patterns run only on lines with their label; the window reaches
+            # into the following lines for values printed below the label
+            window_end = end + CROSS_LINE_CHARS
+            if budget_range is None and '$' in stripped:
+                match = ProjectParser._search(BUDGET_PATTERN, content, start, window_end)
+                if match:
+                    budget_range = match.group(0)
+            if 'Average bid' in stripped:
+                if average_budget is None:
+                    match = ProjectParser._search(AVERAGE_BUDGET_PATTERN, content, start, window_end)
+                    if match:
+                        average_budget = match.group(0).replace('Average bid ', '')
+                if 'average' not in info:
+                    match = ProjectParser._search(AVERAGE_BID_PATTERN, content, start, window_end)
+                    if match:
+                        info['average'] = f"${match.group(1)} {match.group(2)}"
+            if 'total' not in info and 'bid' in lowered:
+                # "42\nbids" starts on the line before
+                match = ProjectParser._search(TOTAL_BIDS_PATTERN, content, previous_start, window_end)
+                if match:
+                    info['total'] = ProjectParser._count(match.group(1) or match.group(2))
+            if 'time_remaining' not in info and 'Bidding ends in' in stripped:
+                match = ProjectParser._search(TIME_REMAINING_PATTERN, content, start, window_end)
+                if match:
+                    info['time_remaining'] = match.group(1).strip()
+            if 'rank' not in info and 'rank at #' in stripped:
+                match = ProjectParser._search(RANK_PATTERN, content, start, window_end)
+                if match:
+                    info['rank'] = ProjectParser._count(match.group(1))
+            if 'location' not in info and 'Flag of' in stripped and end >= location_checked_until:
+                # "City Flag of COUNTRY" lies in one run of word/space characters,
+                # which may span several lines around this one
+                if start < location_checked_until:
+                    run_start = location_checked_until
+                else:
+                    run_start = ProjectParser._word_run_start(lines, index, start)
+                location_checked_until = WORD_RUN_PATTERN.match(content, end).end()
+                location = ProjectParser._location(content, run_start, location_checked_until)
+                if location:
+                    info['location'] = location
+            if 'rating' not in info and (stripped[-1].isdigit() or stripped[-1] == '.'):
+                rating = ProjectParser._rating(content, start + len(line.rstrip()))
+                if rating:
+                    info['rating'] = rating
+            
+            previous_start = start
         
-        # Last resort: return what we have with a note
-        return "Unable to extract clean description. Please paste the FULL project page content starting from the project title."
+        return ParsedProject(
+            project_name=project_name,
+            project_description=ProjectParser._finish_description(
+                content, description_lines, substantial_lines
+            ),
+            budget_range=budget_range or average_budget,
+            bid_rank=info.get('rank'),
+            total_bids=info.get('total'),
+            average_bid=info.get('average'),
+            time_remaining=info.get('time_remaining'),
+            client_location=info.get('location'),
+            client_rating=info.get('rating'),
+            required_skills=skills[:10],  # Limit to 10 skills max
+            truncated=truncated
+        )
     
     @staticmethod
-    def _extract_budget(content: str) -> Optional[str]:
-        """Extract budget range."""
-        # Look for patterns like "$30.00 – 250.00 AUD"
-        budget_pattern = r'\$[\d,]+\.?\d*\s*[-–—]\s*\$?[\d,]+\.?\d*\s*[A-Z]{3}'
-        match = re.search(budget_pattern, content)
-        if match:
-            return match.group(0)
+    def parse_many(contents: Iterable[str], workers: Optional[int] = None,
+                   chunk_size: int = PARSE_CHUNK_PAGES) -> Iterator[ParsedProject]:
+        """Parse many pages in a process pool, yielding results in input order.
         
-        # Look for "Average bid $XXX"
-        avg_pattern = r'Average bid\s*\$[\d,]+\.?\d*\s*[A-Z]{3}'
-        match = re.search(avg_pattern, content)
-        if match:
-            return match.group(0).replace('Average bid ', '')
+        Only a few chunks per worker are queued at a time, so ``contents`` can
+        be a lazy stream of any length. ``workers`` defaults to the CPU count.
+        """
+        workers = workers or os.cpu_count() or 1
+        contents = iter(contents)
+        if workers == 1:
+            for content in contents:
+                yield ProjectParser.parse(content)
+            return
         
-        return None
+        # Spawned workers import only the parser, not the caller's threads or clients
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            pending: deque = deque()
+            while True:
+                chunk = list(islice(contents, chunk_size))
+                if chunk:
+                    pending.append(executor.submit(ProjectParser.parse_chunk, chunk))
+                if pending and (not chunk or len(pending) >= workers * CHUNKS_IN_FLIGHT_PER_WORKER):
+                    yield from pending.popleft().result()
+                elif not chunk:
+                    return
     
     @staticmethod
-    def _extract_bid_info(content: str) -> Dict[str, Any]:
-        """Extract bid rank, total bids, average bid."""
-        info = {}
-        
-        # Extract total bids - look for "Bids\n\n42" or "42 bids"
-        bids_pattern = r'(?:Bids\s*\n+\s*(\d+)|(\d+)\s+bids?)'
-        match = re.search(bids_pattern, content, re.IGNORECASE)
-        if match:
-            info['total'] = int(match.group(1) or match.group(2))
-        
-        # Extract average bid
-        avg_pattern = r'Average bid\s*\$?([\d,]+\.?\d*)\s*([A-Z]{3})'
-        match = re.search(avg_pattern, content)
-        if match:
-            info['average'] = f"${match.group(1)} {match.group(2)}"
-        
-        # Extract time remaining
-        time_pattern = r'Bidding ends in\s+(.+?)(?:\n|$)'
-        match = re.search(time_pattern, content)
-        if match:
-            info['time_remaining'] = match.group(1).strip()
-        
-        # Try to find current bid rank from "Your current bid will rank at #X"
-        rank_pattern = r'rank at #(\d+)'
-        match = re.search(rank_pattern, content)
-        if match:
-            info['rank'] = int(match.group(1))
-        
-        return info
+    def parse_chunk(contents: List[str]) -> List[ParsedProject]:
+        """Parse a list of pages (the unit of work sent to pool workers)."""
+        return [ProjectParser.parse(content) for content in contents]
     
     @staticmethod
-    def _extract_client_info(content: str) -> Dict[str, str]:
-        """Extract client location and rating."""
-        info = {}
-        
-        # Extract location - usually before "Flag of COUNTRY"
-        location_pattern = r'([\w\s]+)\s*Flag of\s+([A-Z]+)'
-        match = re.search(location_pattern, content)
-        if match:
-            city = match.group(1).strip()
-            country = match.group(2).strip()
-            info['location'] = f"{city}, {country}"
+    def _search(pattern: re.Pattern, content: str, start: int, end: int) -> Optional[re.Match]:
+        """First match of ``pattern`` starting in ``content[start:end]``."""
+        match = pattern.search(content, start, end)
+        if match and match.end() == end:
+            # May have been cut short by the window; redo it against the full text
+            match = pattern.search(content, match.start())
+        return match
+    
+    @staticmethod
+    def _count(digits: str) -> Optional[int]:
+        """Parse a bid count or rank, ignoring absurdly long digit runs."""
+        return int(digits) if len(digits) <= 9 else None
+    
+    @staticmethod
+    def _location(content: str, start: int, end: int) -> Optional[str]:
+        r"""Client location from the text between ``start`` and ``end``.
         
-        # Extract rating - look for pattern like "0.0" followed by review count
-        rating_pattern = r'(\d+\.?\d*)\s*\n\s*(\d+)'
-        match = re.search(rating_pattern, content)
-        if match:
-            rating = match.group(1)
-            reviews = match.group(2)
-            info['rating'] = f"{rating} ({reviews} reviews)"
+        Same result as the first match of ``([\w\s]+)\s*Flag of\s+([A-Z]+)``,
+        without its quadratic backtracking: the city is the whole run of
+        word/space characters before the last "Flag of COUNTRY" in that run.
+        """
+        run_start = start
+        for boundary in NON_WORD_PATTERN.finditer(content, start, end):
+            location = ProjectParser._location_in_run(content, run_start, boundary.start())
+            if location:
+                return location
+            run_start = boundary.end()
+        return ProjectParser._location_in_run(content, run_start, end)
+    
+    @staticmethod
+    def _location_in_run(content: str, start: int, end: int) -> Optional[str]:
+        """Location from one run of word/space characters, if it has a "Flag of COUNTRY"."""
+        limit = end
+        while True:
+            # The city needs at least one character before "Flag of"
+            flag = content.rfind('Flag of', start + 1, limit)
+            if flag == -1:
+                return None
+            country = FLAG_PATTERN.match(content, flag + len('Flag of'), end)
+            if country:
+                return f"{content[start:flag].strip()}, {country.group(1)}"
+            limit = flag + len('Flag of') - 1
+    
+    @staticmethod
+    def _rating(content: str, number_end: int) -> Optional[str]:
+        r"""Rating from a number ending a line and a review count starting the next non-blank one.
         
-        return info
-
+        Same result as ``(\d+\.?\d*)\s*\n\s*(\d+)`` searched from the line,
+        read backwards and forwards from the line end in linear time.
+        """
+        line_start = content.rfind('\n', 0, number_end) + 1
+        number = NUMBER_SUFFIX_PATTERN.match(content[line_start:number_end][::-1])
+        if not number:
+            return None
+        gap_end = WHITESPACE_PATTERN.match(content, number_end).end()
+        if content.find('\n', number_end, gap_end) == -1:
+            return None
+        reviews = DIGITS_PATTERN.match(content, gap_end)
+        if not reviews:
+            return None
+        return f"{number.group(0)[::-1]} ({reviews.group(0)} reviews)"
+    
     @staticmethod
-    def _extract_skills(content: str) -> list[str]:
-        """Extract required skills from content."""
-        skills = []
+    def _word_run_start(lines: List[str], index: int, start: int) -> int:
+        """Offset where the run of word/space characters reaching line ``index`` begins."""
+        position = start
+        for row in range(index - 1, -1, -1):
+            line = lines[row]
+            position -= len(line) + 1
+            # Last non-word character of the line, found from the end
+            match = NON_WORD_PATTERN.search(line[::-1])
+            if match:
+                return position + len(line) - match.start()
+        return 0
+    
+    @staticmethod
+    def _finish_description(content: str, description_lines: List[str],
+                            substantial_lines: List[str]) -> str:
+        """Pick the description from the scanned lines, falling back to long paragraphs."""
+        # If content is too short, it's probably not valid
+        if not content or len(content.strip()) < 50:
+            return EMPTY_CONTENT_DESCRIPTION
         
-        # Look for "Skills Required" section
-        lines = content.split('\n')
-        skills_section_found = False
+        if description_lines:
+            full_description = '\n\n'.join(description_lines).strip()
+            # If we got at least 100 characters, it's probably valid
+            if len(full_description) >= 100:
+                return full_description
         
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            
-            # Found skills section
-            if 'skills required' in stripped.lower() or 'skill required' in stripped.lower():
-                skills_section_found = True
-                # Get next few lines as skills
-                for j in range(i + 1, min(i + 15, len(lines))):
-                    skill_line = lines[j].strip()
-                    # Stop if we hit another section
-                    if any(stop in skill_line.lower() for stop in [
-                        'about the client', 'project details', 'bids', 'average',
-                        'bidding ends', 'member since', 'place a bid'
-                    ]):
-                        break
-                    # Skip empty lines
-                    if not skill_line or len(skill_line) < 2:
-                        continue
-                    # Skip lines that look like UI elements
-                    if skill_line.lower() in ['open', 'details', 'proposals', 'fixed', 'hourly']:
-                        continue
-                    # Skip budget lines
-                    if re.match(r'^\$[\d,]+', skill_line):
-                        continue
-                    # Add as skill if it's reasonable length
-                    if 2 < len(skill_line) < 50:
-                        skills.append(skill_line)
-                
-                break
+        if substantial_lines:
+            return '\n\n'.join(substantial_lines)  # First 3 substantial paragraphs
         
-        return skills[:10]  # Limit to 10 skills max
+        # Last resort: return what we have with a note
+        return UNPARSEABLE_CONTENT_DESCRIPTION
@@ -0,0 +1,129 @@
+"""Seeded generators of pasted project pages, for parser tests and benchmarks."""
+import random
+from typing import Iterator, List
+
+TITLES = [
+    "Website Text Scraping to Excel", "Build a Shopify store", "Python script for PDF invoices",
+    "React dashboard for sales data", "Fix WordPress plugin bug", "Mobile app UI design",
+    "Data entry from scanned forms", "Telegram bot for orders", "SEO audit for small business",
+]
+OPENERS = [
+    "I'm looking for", "I am looking for", "We need", "We are seeking", "We're hiring", "Looking for",
+    "Need a", "Need an", "Seeking", "Required:", "Project:", "This project needs", "The project is",
+    "My project requires", "Hello freelancers, please read",
+]
+PHRASES = [
+    "an experienced developer to build a tool that collects product prices every day",
+    "someone who can export the results to a clean spreadsheet with one row per item",
+    "a reliable freelancer with references and a portfolio of similar projects",
+    "the work to be finished within two weeks with daily progress updates",
+    "clean code, comments and a short document explaining how to run it",
+    "support for login protected pages and pagination across about 300 pages",
+    "a fixed price proposal with milestones for each deliverable",
+]
+NOISE = [
+    "Open", "Bids", "Details", "Proposals", "Project details", "Place a bid on this project",
+    "Fixed-price", "Hourly", "Milestone payments", "Member since Mar 3, 2019", "About the Client",
+    "Click here to sign up", "Browse similar jobs", "Report project", "Share",
+]
+SKILLS = ["Python", "Web Scraping", "Excel", "Data Entry", "React", "Node.js", "PHP", "WordPress",
+          "Shopify", "Graphic Design", "SEO", "MySQL", "Selenium", "Django", "C++"]
+CITIES = ["London", "New York", "Sydney", "Karachi", "Berlin", "Toronto", "Lagos", "Dhaka"]
+COUNTRIES = ["GB", "US", "AU", "PK", "DE", "CA", "NG", "BD"]
+CURRENCIES = ["USD", "AUD", "EUR", "GBP", "INR", "CAD"]
+DASHES = ["-", "–", "—"]
+
+
+def _amount(rng: random.Random) -> str:
+    """A price like "30", "250.00" or "1,500"."""
+    value = rng.choice([rng.randint(5, 999), rng.randint(1000, 20000)])
+    text = f"{value:,}" if rng.random() < 0.5 else str(value)
+    return text + (".00" if rng.random() < 0.5 else "")
+
+
+def _description(rng: random.Random) -> List[str]:
+    """One to four paragraphs, usually opening with a phrase that marks a brief."""
+    paragraphs = []
+    for index in range(rng.randint(1, 4)):
+        words = " ".join(rng.sample(PHRASES, rng.randint(1, 3)))
+        opener = rng.choice(OPENERS) if index == 0 and rng.random() < 0.85 else "Also"
+        paragraphs.append(f"{opener} {words}.")
+    return paragraphs
+
+
+def page(rng: random.Random) -> str:
+    """A copied project page with its sections in a typical or shuffled order."""
+    sections: List[List[str]] = []
+    sections.append([rng.choice(TITLES)])
+    sections.append([rng.choice(["Open", "Closed"]), ""])
+    low = _amount(rng)
+    sections.append([f"${low} {rng.choice(DASHES)} {rng.choice(['$', ''])}{_amount(rng)} {rng.choice(CURRENCIES)}"])
+    bids = str(rng.randint(0, 120))
+    sections.append(["Bids", rng.choice(["", "\n"]) + bids] if rng.random() < 0.6 else [f"{bids} bids"])
+    sections.append([f"Average bid{rng.choice([' ', '  ', chr(10)])}${_amount(rng)} {rng.choice(CURRENCIES)}"])
+    if rng.random() < 0.7:
+        sections.append([f"Bidding ends in {rng.randint(1, 6)} days, {rng.randint(1, 23)} hours"])
+    if rng.random() < 0.5:
+        sections.append([f"Your current bid will rank at #{rng.randint(1, 60)}"])
+    sections.append(["Project details", ""] + [p for paragraph in _description(rng) for p in (paragraph, "")])
+    skill_lines = ["Skills Required"] + rng.sample(SKILLS, rng.randint(1, 8))
+    sections.append(skill_lines)
+    client = ["About the Client"]
+    if rng.random() < 0.8:
+        index = rng.randrange(len(CITIES))
+        client.append(f"{CITIES[index]}{rng.choice([' ', ''])}Flag of {COUNTRIES[index]}")
+    if rng.random() < 0.8:
+        client += [f"{rng.randint(0, 5)}.{rng.randint(0, 9)}", str(rng.randint(0, 300))]
+    client.append(rng.choice(NOISE))
+    sections.append(client)
+    
+    head, rest = sections[:2], sections[2:]
+    if rng.random() < 0.3:
+        rng.shuffle(rest)
+    lines = [line for section in head + rest for line in section]
+    # Scatter interface noise and blank lines between sections
+    for _ in range(rng.randint(0, 4)):
+        lines.insert(rng.randint(1, len(lines)), rng.choice(NOISE + [""]))
+    indent = rng.choice(["", "  ", "\t"])
+    return "\n".join(indent + line if line and rng.random() < 0.2 else line for line in lines)
+
+
+def pages(count: int, seed: int = 0) -> Iterator[str]:
+    """``count`` pages from a fixed seed, so every run sees the same corpus."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield page(rng)
+
+
+def large_paste(target_chars: int, seed: int = 0) -> str:
+    """Several pages pasted one after another, about ``target_chars`` long."""
+    rng = random.Random(seed)
+    parts, size = [], 0
+    while size < target_chars:
+        parts.append(page(rng))
+        size += len(parts[-1]) + 2
+    return "\n\n".join(parts)
+
+
+def mutated(text: str, rng: random.Random) -> str:
+    """``text`` with a few lines joined, characters dropped or runs repeated, as messy copies are."""
+    chars = list(text)
+    for _ in range(rng.randint(1, 6)):
+        if not chars:
+            break
+        position = rng.randrange(len(chars))
+        roll = rng.random()
+        if roll < 0.3 and "\n" in chars[position:]:
+            chars[chars.index("\n", position)] = " "  # Join a line to the next
+        elif roll < 0.6:
+            del chars[position:position + rng.randint(1, 8)]
+        else:
+            chars[position:position] = chars[position:position + rng.randint(1, 12)]
+    return "".join(chars)
+
+
+def messy_pages(count: int, seed: int = 0) -> Iterator[str]:
+    """``count`` mutated pages from a fixed seed."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield mutated(page(rng), rng)
@@ -0,0 +1,210 @@
+"""A small Redis-protocol (RESP2) server standing in for Redis in the store tests.
+
+Handles the commands ``RedisStore`` sends (GET, SET with PX/NX, DEL, INCRBY,
+PEXPIRE, RPUSH, LLEN, LRANGE, HSET, HMGET, AUTH, SELECT, PING), keeps one
+key space per database, and counts connections, commands and reply batches
+so tests can check how many round-trips an operation took.
+"""
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CommandError(Exception):
+    """A command the server answers with an error reply."""
+
+
+def encode(value: Any) -> bytes:
+    """A reply in RESP2: str as a simple string, int, bytes, None as nil, list as an array."""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, CommandError):
+        return b"-" + str(value).encode("utf-8") + b"\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+" + value.encode("utf-8") + b"\r\n"
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def parse_command(buffer: bytes) -> Optional[Tuple[List[bytes], bytes]]:
+    """The first complete command in ``buffer`` and what follows it, or None if it is incomplete."""
+    if b"\r\n" not in buffer:
+        return None
+    if not buffer.startswith(b"*"):
+        raise CommandError("ERR Protocol error: expected '*'")
+    head = buffer.index(b"\r\n")
+    position, args = head + 2, []
+    for _ in range(int(buffer[1:head])):
+        end = buffer.find(b"\r\n", position)
+        if end < 0:
+            return None
+        size = int(buffer[position + 1:end])
+        position = end + 2
+        if len(buffer) < position + size + 2:
+            return None
+        args.append(buffer[position:position + size])
+        position += size + 2
+    return args, buffer[position:]
+
+
+class RespServer:
+    """Threaded stand-in server on a free local port; ``password`` turns on AUTH."""
+    
+    def __init__(self, password: Optional[str] = None, username: Optional[str] = None):
+        """Bind to a free port; ``start()`` begins serving."""
+        self.password = password
+        self.username = username
+        self.databases: Dict[int, Dict[bytes, Any]] = {}
+        self.expiry: Dict[Tuple[int, bytes], float] = {}
+        self.stats = {"connections": 0, "commands": 0, "batches": 0}
+        self.lock = threading.Lock()
+        server = self
+        
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server.serve(self.request)
+        
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler, bind_and_activate=False)
+        self._server.daemon_threads = True
+        self._server.allow_reuse_address = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self.port = self._server.server_address[1]
+    
+    def url(self, db: int = 0, password: Optional[str] = None, username: Optional[str] = None) -> str:
+        """redis:// URL of this server."""
+        auth = f"{username or ''}:{password}@" if password else ""
+        return f"redis://{auth}127.0.0.1:{self.port}/{db}"
+    
+    def start(self) -> "RespServer":
+        """Serve on a background thread."""
+        threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+    
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def serve(self, sock):
+        """Answer one connection: every command received together gets its replies sent together."""
+        with self.lock:
+            self.stats["connections"] += 1
+        session = {"db": 0, "authed": self.password is None}
+        buffer = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return
+            buffer += chunk
+            replies = []
+            while True:
+                try:
+                    parsed = parse_command(buffer)
+                except CommandError as e:
+                    sock.sendall(encode(e))
+                    return
+                if parsed is None:
+                    break
+                args, buffer = parsed
+                with self.lock:
+                    self.stats["commands"] += 1
+                    try:
+                        replies.append(self.run(session, args))
+                    except CommandError as e:
+                        replies.append(e)
+            if replies:
+                with self.lock:
+                    self.stats["batches"] += 1
+                sock.sendall(b"".join(encode(reply) for reply in replies))
+    
+    def _live(self, db: int, key: bytes) -> Any:
+        """Value at ``key`` unless it has expired."""
+        deadline = self.expiry.get((db, key))
+        if deadline is not None and deadline <= time.time():
+            self.databases[db].pop(key, None)
+            self.expiry.pop((db, key), None)
+        return self.databases.setdefault(db, {}).get(key)
+    
+    def _typed(self, db: int, key: bytes, kind: type) -> Any:
+        """Value at ``key``, which must be of ``kind`` if it exists."""
+        value = self._live(db, key)
+        if value is not None and not isinstance(value, kind):
+            raise CommandError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+    
+    def run(self, session: Dict, args: List[bytes]) -> Any:
+        """Reply to one command."""
+        name, args = args[0].upper().decode(), args[1:]
+        if name == "AUTH":
+            username = args[0].decode() if len(args) > 1 else None
+            session["authed"] = args[-1].decode() == self.password and username == self.username
+            if not session["authed"]:
+                raise CommandError("WRONGPASS invalid username-password pair or user is disabled.")
+            return "OK"
+        if not session["authed"]:
+            raise CommandError("NOAUTH Authentication required.")
+        if name == "PING":
+            return "PONG"
+        if name == "SELECT":
+            session["db"] = int(args[0])
+            return "OK"
+        db = session["db"]
+        data = self.databases.setdefault(db, {})
+        key = args[0]
+        if name == "GET":
+            return self._typed(db, key, bytes)
+        if name == "SET":
+            options = [option.upper() for option in args[2:]]
+            if b"NX" in options and self._live(db, key) is not None:
+                return None
+            data[key] = args[1]
+            self.expiry.pop((db, key), None)
+            if b"PX" in options:
+                self.expiry[(db, key)] = time.time() + int(options[options.index(b"PX") + 1]) / 1000
+            return "OK"
+        if name == "DEL":
+            existed = self._live(db, key) is not None
+            data.pop(key, None)
+            self.expiry.pop((db, key), None)
+            return int(existed)
+        if name == "INCRBY":
+            value = int(self._typed(db, key, bytes) or 0) + int(args[1])
+            data[key] = str(value).encode()
+            return value
+        if name == "PEXPIRE":
+            if self._live(db, key) is None:
+                return 0
+            self.expiry[(db, key)] = time.time() + int(args[1]) / 1000
+            return 1
+        if name == "RPUSH":
+            items = self._typed(db, key, list)
+            if items is None:
+                items = data[key] = []
+            items.extend(args[1:])
+            return len(items)
+        if name == "LLEN":
+            return len(self._typed(db, key, list) or [])
+        if name == "LRANGE":
+            items = self._typed(db, key, list) or []
+            start, end = int(args[1]), int(args[2])
+            start = max(0, start + len(items) if start < 0 else start)
+            end = end + len(items) if end < 0 else end
+            return items[start:end + 1]
+        if name == "HSET":
+            fields = self._typed(db, key, dict)
+            if fields is None:
+                fields = data[key] = {}
+            new = 0
+            for index in range(1, len(args), 2):
+                new += args[index] not in fields
+                fields[args[index]] = args[index + 1]
+            return new
+        if name == "HMGET":
+            fields = self._typed(db, key, dict) or {}
+            return [fields.get(field) for field in args[1:]]
+        raise CommandError(f"ERR unknown command '{name}'")
@@ -0,0 +1,109 @@
+"""Tests for the MicroBatcher: closing batches by size and window, errors and cancelled submitters."""
+import threading
+import time
+
+import pytest
+
+from src.core.batching import MicroBatcher
+from src.core.budget import Cancelled, RequestBudget
+
+
+class Recorder:
+    """Batch function that records each batch's items and doubles them."""
+    
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.delay = delay
+    
+    def __call__(self, entries):
+        self.batches.append([item for item, _ in entries])
+        time.sleep(self.delay)
+        return [item * 2 for item, _ in entries]
+
+
+def submit_all(batcher: MicroBatcher, items):
+    results = {}
+    
+    def submit(item):
+        results[item] = batcher.submit(item)
+    
+    threads = [threading.Thread(target=submit, args=(item,)) for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_full_batch_closes_before_window():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_size=3, window=10)
+    started = time.monotonic()
+    results = submit_all(batcher, [1, 2, 3])
+    assert time.monotonic() - started < 2
+    assert results == {1: 2, 2: 4, 3: 6}
+    assert [sorted(batch) for batch in recorder.batches] == [[1, 2, 3]]
+
+
+def test_window_closes_partial_batch():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_size=8, window=0.1)
+    started = time.monotonic()
+    assert batcher.submit(5) == 10
+    assert 0.09 <= time.monotonic() - started < 2
+    assert recorder.batches == [[5]]
+
+
+def test_overflow_starts_next_batch():
+    recorder = Recorder(delay=0.05)
+    batcher = MicroBatcher(recorder, max_size=2, window=0.2)
+    results = submit_all(batcher, [1, 2, 3, 4, 5])
+    assert results == {item: item * 2 for item in range(1, 6)}
+    assert sorted(len(batch) for batch in recorder.batches) == [1, 2, 2]
+    stats = batcher.stats()
+    assert stats["items"] == 5
+    assert stats["batches"] == 3
+    assert stats["largest"] == 2
+    assert stats["pending"] == 0
+
+
+def test_batch_error_reaches_every_submitter():
+    def fail(entries):
+        raise RuntimeError("provider down")
+    
+    batcher = MicroBatcher(fail, max_size=2, window=1)
+    errors = []
+    
+    def submit(item):
+        try:
+            batcher.submit(item)
+        except RuntimeError as e:
+            errors.append(str(e))
+    
+    threads = [threading.Thread(target=submit, args=(item,)) for item in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert errors == ["provider down", "provider down"]
+
+
+def test_cancelled_submitter_is_left_out_of_its_batch():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_size=8, window=0.3)
+    budget = RequestBudget(30)
+    threading.Timer(0.05, budget.cancel).start()
+    kept = threading.Thread(target=lambda: batcher.submit(2))
+    kept.start()
+    with pytest.raises(Cancelled):
+        batcher.submit(1, budget)
+    kept.join(5)
+    assert recorder.batches == [[2]]
+
+
+def test_submitter_budget_passed_to_batch():
+    seen = []
+    batcher = MicroBatcher(lambda entries: [seen.append(budget) for _, budget in entries], max_size=1, window=1)
+    budget = RequestBudget(30)
+    batcher.submit("item", budget)
+    assert seen == [budget]
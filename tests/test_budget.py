@@ -0,0 +1,113 @@
+"""Tests for request budgets: stage shares, cancellation and budgets shared by a batch."""
+import threading
+import time
+
+import pytest
+
+from src.agents.analyzer import ProjectAnalyzer
+from src.core.budget import Cancelled, RequestBudget
+
+
+def test_stages_split_time_left_by_share():
+    budget = RequestBudget(8, shares={"analyze": 1, "generate": 2, "optimize": 1})
+    with budget.stage("analyze"):
+        assert 1.9 < budget.remaining() <= 2
+        assert budget.stage_name == "analyze"
+    assert 7.9 < budget.remaining() <= 8  # Back to the whole request between stages
+    with budget.stage("optimize"):
+        assert 7.9 < budget.remaining() <= 8  # The last stage gets everything left
+    with budget.stage("review"):  # Not in the shares: everything left
+        assert 7.9 < budget.remaining() <= 8
+
+
+def test_unused_stage_time_rolls_over():
+    budget = RequestBudget(4, shares={"analyze": 1, "generate": 1})
+    with budget.stage("analyze"):
+        pass  # Finished at once
+    with budget.stage("generate"):
+        assert budget.remaining() > 3.9
+
+
+def test_exhausted_stage_raises_while_request_has_time():
+    budget = RequestBudget(0.4, shares={"analyze": 1, "generate": 3})
+    with budget.stage("analyze"):
+        time.sleep(0.15)
+        with pytest.raises(Cancelled, match="time budget exhausted during analyze") as stopped:
+            budget.check()
+        assert stopped.value.stage == "analyze"
+    assert budget.remaining_total() > 0
+    budget.check()
+    assert not budget.client_gone
+
+
+def test_cancel_stops_the_next_check_and_stage():
+    budget = RequestBudget(30)
+    with budget.stage("generate"):
+        budget.cancel()
+        with pytest.raises(Cancelled, match="client disconnected during generate"):
+            budget.check()
+    assert budget.client_gone
+    with pytest.raises(Cancelled):
+        with budget.stage("optimize"):
+            pass
+
+
+def test_shared_budget_lasts_as_long_as_most_patient_member():
+    budget = RequestBudget.shared([RequestBudget(1), RequestBudget(30)])
+    assert 29 < budget.remaining_total() <= 30
+
+
+def test_shared_budget_is_cancelled_once_every_member_is():
+    members = [RequestBudget(30), RequestBudget(30)]
+    budget = RequestBudget.shared(members)
+    members[0].cancel()
+    budget.check()
+    assert not budget.client_gone
+    members[1].cancel()
+    assert budget.client_gone
+    with pytest.raises(Cancelled, match="every request sharing the work was cancelled"):
+        budget.check()
+
+
+class StreamingLLM:
+    """Stands in for a streaming LLM client: checks the budget until cancelled."""
+    
+    def __init__(self):
+        self.started = threading.Event()
+        self.stopped = threading.Event()
+    
+    def generate(self, prompt, system_prompt=None, temperature=0.7, budget=None):
+        self.started.set()
+        try:
+            while True:
+                budget.check()
+                time.sleep(0.01)
+        finally:
+            self.stopped.set()
+
+
+def test_batched_analysis_stops_once_every_requester_cancels():
+    llm = StreamingLLM()
+    analyzer = ProjectAnalyzer(llm, ["Python"], batch_size=2, batch_window=1.0)
+    budgets = [RequestBudget(30), RequestBudget(30)]
+    errors = []
+    
+    def request(index):
+        try:
+            analyzer.analyze(f"Build scraper number {index} for product prices", f"p{index}", budgets[index])
+        except Cancelled as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=request, args=(index,)) for index in range(2)]
+    for thread in threads:
+        thread.start()
+    assert llm.started.wait(5)
+    
+    budgets[0].cancel()
+    time.sleep(0.1)
+    assert not llm.stopped.is_set()  # The other requester still waits for its analysis
+    budgets[1].cancel()
+    assert llm.stopped.wait(2)
+    for thread in threads:
+        thread.join(2)
+    assert len(errors) == 2
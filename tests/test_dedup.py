@@ -0,0 +1,67 @@
+"""Tests for DuplicateIndex: MinHash near-duplicate detection and its sidecar."""
+import numpy as np
+
+from src.core.dedup import NUM_PERM, REINDEX_EVERY, DuplicateIndex, minhash
+
+DESCRIPTION = ("Need an experienced developer to scrape product names, prices and stock levels "
+               "from three ecommerce websites every day and export them to a Google Sheet")
+
+
+def entry(description: str) -> dict:
+    return {"project_description": description}
+
+
+def test_minhash_ignores_case_and_punctuation():
+    assert np.array_equal(minhash(DESCRIPTION), minhash(DESCRIPTION.upper().replace(",", " ;")))
+    assert minhash("!!! ---") is None
+    assert minhash("word").shape == (NUM_PERM,)
+
+
+def test_finds_reposted_project_but_not_different_one(tmp_path):
+    index = DuplicateIndex(tmp_path / "h.minhash")
+    index.rebuild([entry("Design a logo for a bakery"), entry(DESCRIPTION), entry("")])
+    
+    reposted = DESCRIPTION.replace("every day", "each day") + " Thanks!"
+    row, similarity = index.find(reposted)
+    assert row == 1
+    assert 0.7 <= similarity < 1.0
+    assert index.find(DESCRIPTION) == (1, 1.0)
+    assert index.find("Translate a legal contract from German to English") is None
+    assert index.find("") is None
+
+
+def test_prefers_most_recent_of_equal_matches(tmp_path):
+    index = DuplicateIndex(tmp_path / "h.minhash")
+    index.rebuild([entry(DESCRIPTION)])
+    index.add("Unrelated data entry work")
+    index.add(DESCRIPTION)  # Unsorted tail is searched too
+    assert index.find(DESCRIPTION) == (2, 1.0)
+
+
+def test_many_additions_are_reindexed(tmp_path):
+    index = DuplicateIndex(tmp_path / "h.minhash")
+    index.rebuild([])
+    for number in range(REINDEX_EVERY + 2):
+        index.add(f"Project number {number} with its own words {number * 7}")
+    index.add(DESCRIPTION)
+    assert index.find(DESCRIPTION)[0] == REINDEX_EVERY + 2
+    assert index._sorted_rows > 0
+
+
+def test_signatures_persist_and_reload(tmp_path):
+    path = tmp_path / "h.minhash"
+    history = [entry("Design a logo for a bakery"), entry(DESCRIPTION)]
+    index = DuplicateIndex(path)
+    index.rebuild(history)
+    index.persist()
+    assert path.stat().st_size == 2 * NUM_PERM * 4
+    
+    # Stored signatures win over the history text, which shows they were read from the file
+    reloaded = DuplicateIndex(path)
+    reloaded.rebuild([entry("x"), entry("y")])
+    assert reloaded.find(DESCRIPTION) == (1, 1.0)
+    
+    reloaded.rebuild([entry(DESCRIPTION)])  # Fewer rows than the file: rebuilt from history
+    reloaded.persist()
+    assert path.stat().st_size == NUM_PERM * 4
+    assert reloaded.find(DESCRIPTION) == (0, 1.0)
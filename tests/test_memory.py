@@ -0,0 +1,111 @@
+"""Tests for BidMemory: the JSONL history, its aggregates and concurrent use."""
+import json
+import sys
+import threading
+
+from src.core.memory import BidMemory
+
+
+def add_bid(memory: BidMemory, name: str, project_type: str = "Web Scraping", won=None):
+    memory.add_bid(name, f"Build a scraper for {name} product prices", f"Bid for {name}",
+                   project_type=project_type, won=won)
+
+
+def test_legacy_json_history_is_migrated_once(tmp_path):
+    storage = tmp_path / ".bid_history.json"
+    legacy = [
+        {"timestamp": "2024-01-01T00:00:00", "project_name": "old-1", "project_description": "Scrape prices",
+         "generated_bid": "I will scrape them", "won": True, "project_type": "Web Scraping",
+         "project_analysis": {"required_skills": ["Python"]}},
+        {"timestamp": "2024-01-02T00:00:00", "project_name": "old-2", "project_description": "Enter data",
+         "generated_bid": "Fast and accurate", "won": None, "project_type": "Data Entry"},
+    ]
+    storage.write_text(json.dumps(legacy))
+    
+    memory = BidMemory(str(storage))
+    bids = memory.get_recent_bids(10)
+    assert [bid["project_name"] for bid in bids] == ["old-1", "old-2"]
+    assert bids[0]["generated_bid"] == "I will scrape them"
+    assert bids[0]["skills"] == ["Python"]
+    assert bids[0]["word_count"] == 4
+    assert memory.get_stats()["won"] == 1
+    memory.close()
+    
+    meta = (tmp_path / ".bid_history.jsonl").read_bytes()
+    BidMemory(str(storage)).load()  # The logs exist now; the legacy file is not read again
+    assert (tmp_path / ".bid_history.jsonl").read_bytes() == meta
+
+
+def test_history_reloads_after_restart(tmp_path):
+    storage = str(tmp_path / ".bid_history.json")
+    memory = BidMemory(storage)
+    add_bid(memory, "a")
+    add_bid(memory, "b", project_type="Data Entry")
+    memory.update_bid_result("a", True)
+    memory.close()
+    
+    restarted = BidMemory(storage, hot_window=1)
+    bids = restarted.get_recent_bids(10)
+    assert [(bid["project_name"], bid["won"]) for bid in bids] == [("a", True), ("b", None)]
+    assert bids[0]["generated_bid"] == "Bid for a"  # Read back from the text log
+    assert restarted.get_stats()["by_project_type"] == {"Web Scraping": {"pending": 0, "won": 1}, "Data Entry": {"pending": 1}}
+    duplicate = restarted.find_duplicate("Build a scraper for b product prices")
+    assert duplicate and duplicate["project_name"] == "b"
+    restarted.close()
+
+
+def test_instances_sharing_files_see_each_others_appends(tmp_path):
+    storage = str(tmp_path / ".bid_history.json")
+    first, second = BidMemory(storage), BidMemory(storage)
+    first.load()
+    second.load()
+    
+    add_bid(first, "a")
+    add_bid(second, "b")  # Picks up "a" before appending, so rows stay in file order
+    add_bid(first, "c")
+    second.update_bid_result("a", False)
+    assert [bid["project_name"] for bid in first.get_recent_bids(10)] == ["a", "b", "c"]
+    assert first.get_recent_bids(10) == second.get_recent_bids(10)
+    assert first.get_stats()["lost"] == 1
+    assert second.get_stats()["pending"] == 2
+    
+    lines = (tmp_path / ".bid_history.jsonl").read_text().splitlines()
+    assert len(lines) == 4
+    assert json.loads(lines[-1]) == {"row": 0, "won": False}
+    first.close()
+    second.close()
+
+
+def test_stats_stay_consistent_while_the_writer_adds_bids(tmp_path):
+    memory = BidMemory(str(tmp_path / ".bid_history.json"))
+    memory.start_write_behind(batch_size=4, interval=0.001)
+    errors = []
+    
+    def read():
+        try:
+            for _ in range(300):
+                stats = memory.get_stats()
+                assert stats["won"] + stats["lost"] + stats["pending"] == stats["total_bids"]
+                assert sum(sum(counts.values()) for counts in stats["by_project_type"].values()) == stats["total_bids"]
+                patterns = memory.get_winning_patterns()
+                assert len(patterns["recent_wins"]) <= patterns["won_count"]
+        except Exception as e:
+            errors.append(e)
+    
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often, so a read lands mid-update if it can
+    try:
+        readers = [threading.Thread(target=read) for _ in range(2)]
+        for reader in readers:
+            reader.start()
+        for index in range(400):
+            # A new project type each time, so the writer keeps growing the per-type dict
+            add_bid(memory, f"p{index}", project_type=f"type-{index}", won=True if index % 3 == 0 else None)
+        for reader in readers:
+            reader.join()
+    finally:
+        sys.setswitchinterval(interval)
+    memory.flush()
+    assert errors == []
+    assert memory.get_stats()["total_bids"] == 400
+    memory.close()
@@ -0,0 +1,47 @@
+"""Tests for MemoryShards: per-user histories and eviction of the least recently used."""
+import threading
+import time
+
+from src.core.memory import MemoryShards
+
+
+def add_bid(memory, name: str):
+    memory.add_bid(name, f"Build a scraper for {name} product prices", f"Bid for {name}")
+
+
+def test_eviction_closes_in_background_and_keeps_pending_writes(tmp_path):
+    shards = MemoryShards(str(tmp_path), max_loaded=1)
+    shards.start_write_behind()
+    first = shards.get("alice")
+    add_bid(first, "alice-1")  # Queued for the write-behind thread, not yet written
+    
+    release = threading.Event()
+    close = first.close
+    
+    def slow_close():
+        release.wait(5)
+        close()
+    
+    first.close = slow_close
+    started = time.perf_counter()
+    second = shards.get("bob")  # Evicts alice
+    assert time.perf_counter() - started < 1.0
+    assert shards.stats()["evicted"] == 1
+    add_bid(second, "bob-1")
+    
+    release.set()
+    shards.close()  # Waits for alice's shard to finish closing
+    reopened = MemoryShards(str(tmp_path), max_loaded=1)
+    assert [bid["project_name"] for bid in reopened.get("alice").get_recent_bids()] == ["alice-1"]
+    assert [bid["project_name"] for bid in reopened.get("bob").get_recent_bids()] == ["bob-1"]
+    reopened.close()
+
+
+def test_returning_user_gets_a_fresh_shard_with_their_history(tmp_path):
+    shards = MemoryShards(str(tmp_path), max_loaded=1)
+    add_bid(shards.get("alice"), "alice-1")
+    shards.get("bob")
+    assert shards.stats()["loaded"] == 1
+    assert [bid["project_name"] for bid in shards.get("alice").get_recent_bids()] == ["alice-1"]
+    assert shards.stats()["opened"] == 3
+    shards.close()
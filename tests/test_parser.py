@@ -0,0 +1,108 @@
+"""Tests for ProjectParser: agreement with the regex parser it replaced, and bounded parse time."""
+import time
+
+import pytest
+
+from src.utils.parser import MAX_CONTENT_CHARS, MAX_HTML_CHARS, PARSE_TIME_BUDGET, ProjectParser
+
+from .legacy_parser import LegacyProjectParser
+from .parser_corpus import large_paste, messy_pages, pages
+
+FIELDS = ("project_name", "project_description", "budget_range", "bid_rank", "total_bids", "average_bid",
+          "time_remaining", "client_location", "client_rating", "required_skills")
+
+
+def differences(content: str) -> dict:
+    """Fields where the two parsers disagree, as {field: (regex, single pass)}."""
+    expected = LegacyProjectParser.parse(content)
+    parsed = ProjectParser.parse(content)
+    return {
+        field: (expected[field], getattr(parsed, field))
+        for field in FIELDS if expected[field] != getattr(parsed, field)
+    }
+
+
+def test_matches_regex_parser_on_generated_pages():
+    for index, content in enumerate(pages(2000, seed=33)):
+        assert differences(content) == {}, f"page {index}:\n{content}"
+
+
+def test_matches_regex_parser_on_messy_pages():
+    for index, content in enumerate(messy_pages(2000, seed=34)):
+        assert differences(content) == {}, f"page {index}:\n{content}"
+
+
+def test_matches_regex_parser_on_large_paste():
+    assert differences(large_paste(150_000, seed=35)) == {}
+
+
+def test_short_content_gets_placeholder():
+    parsed = ProjectParser.parse("Build a website")
+    assert parsed.project_description == LegacyProjectParser.parse("Build a website")["project_description"]
+    assert not parsed.truncated
+
+
+# Allowance over the time budget for the work around the scan (splitting, building the
+# result) and for a loaded test machine
+BUDGET_SLACK = 0.15
+
+TEXT_CHARS = MAX_CONTENT_CHARS * 2
+HTML_CHARS = MAX_HTML_CHARS + 100_000
+HTML_HEAD = "<!DOCTYPE html><html><body>"
+
+# Inputs larger than the parser's limits, built to defeat it: long runs of tokens that
+# almost match a field pattern, label lines that each start a window search, deep nesting
+ADVERSARIAL = {
+    "huge page": lambda: large_paste(TEXT_CHARS),
+    "digit run": lambda: "1" * TEXT_CHARS,
+    "rating-like lines": lambda: "1.\n" * (TEXT_CHARS // 3),
+    "budget-like run": lambda: "$1,1 - $" * (TEXT_CHARS // 8),
+    "label lines": lambda: "Bids\n\n" * (TEXT_CHARS // 6),
+    "average bid lines": lambda: "Average bid $\n" * (TEXT_CHARS // 14),
+    "rank lines": lambda: "rank at #\n" * (TEXT_CHARS // 10),
+    "flag lines": lambda: "London Flag of \n" * (TEXT_CHARS // 16),
+    "lowercase flag lines": lambda: "abc def flag of xy\n" * (TEXT_CHARS // 19),
+    "skills sections": lambda: ("Skills Required\n" + "Python\n" * 14) * (TEXT_CHARS // 114),
+    "blank lines": lambda: " \n" * (TEXT_CHARS // 2),
+    "deep html nesting": lambda: HTML_HEAD + "<div>" * (HTML_CHARS // 5) + "I need a scraper",
+    "repeated html attributes": lambda: HTML_HEAD + '<a href="x" class="skill">' * (HTML_CHARS // 26),
+    "unterminated html comment": lambda: HTML_HEAD + "<!--" + "-" * HTML_CHARS,
+    "unterminated script": lambda: HTML_HEAD + "<script>" + "x<" * (HTML_CHARS // 2),
+    "huge html text": lambda: HTML_HEAD + "<p>" + "Need a tool " * (HTML_CHARS // 12),
+}
+
+
+@pytest.mark.parametrize("name", ADVERSARIAL)
+def test_adversarial_input_parses_within_budget(name):
+    content = ADVERSARIAL[name]()
+    started = time.perf_counter()
+    parsed = ProjectParser.parse(content)
+    elapsed = time.perf_counter() - started
+    assert elapsed < PARSE_TIME_BUDGET + BUDGET_SLACK, f"{name}: {elapsed * 1000:.0f} ms"
+    assert parsed.truncated
+
+
+@pytest.mark.parametrize("budget", [0.0, 0.05])
+def test_time_budget_bounds_parse_and_marks_truncated(budget):
+    content = "Bids\n\n" * (MAX_CONTENT_CHARS // 6 - 1)  # Under the size limit: only time can cut it
+    started = time.perf_counter()
+    parsed = ProjectParser.parse(content, time_budget=budget)
+    assert time.perf_counter() - started < budget + BUDGET_SLACK
+    assert parsed.truncated
+
+
+def test_html_time_budget_marks_truncated():
+    content = HTML_HEAD + "<div>" * 100_000  # Under the HTML size limit
+    assert ProjectParser.parse(content, time_budget=0.0).truncated
+
+
+def test_content_past_max_chars_is_cut():
+    content = large_paste(20_000, seed=36)
+    assert not ProjectParser.parse(content, max_chars=len(content)).truncated
+    parsed = ProjectParser.parse(content, max_chars=len(content) - 1)
+    assert parsed.truncated
+
+
+def test_typical_page_is_not_truncated():
+    for content in pages(50, seed=37):
+        assert not ProjectParser.parse(content).truncated
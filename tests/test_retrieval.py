@@ -0,0 +1,88 @@
+"""Tests for BidIndex: ranking of past wins, the vectors sidecar and incremental sync."""
+import numpy as np
+
+from src.core.retrieval import DEFAULT_DIM, BidIndex, vectorize
+
+
+def bid(name: str, description: str, won=None) -> dict:
+    return {"project_name": name, "project_description": description, "won": won}
+
+
+HISTORY = [
+    bid("scraper", "Scrape product prices from an ecommerce site with Python", won=True),
+    bid("logo", "Design a minimalist logo for a coffee brand", won=True),
+    bid("scraper-2", "Python scraper for ecommerce product listings and prices", won=None),
+    bid("wordpress", "Fix a WordPress theme and speed up page load", won=True),
+]
+
+
+def test_vectorize_is_normalized_and_stable():
+    vector = vectorize("Python web scraping")
+    assert vector.shape == (DEFAULT_DIM,)
+    assert abs(float(np.linalg.norm(vector)) - 1.0) < 1e-5
+    assert np.array_equal(vector, vectorize("python  WEB scraping"))
+    assert not vectorize("the and of").any()  # Only stopwords
+
+
+def test_search_ranks_similar_wins_first(tmp_path):
+    index = BidIndex(tmp_path / "h.vectors")
+    index.rebuild(HISTORY)
+    rows = [row for row, _ in index.search("Scrape ecommerce product prices using Python", k=3)]
+    assert rows[0] == 0
+    assert 2 not in rows  # Pending bids are not examples
+    assert [row for row, _ in index.search("ecommerce product prices", k=3, won_only=False)][:2] in ([0, 2], [2, 0])
+    scores = [score for _, score in index.search("WordPress page speed", k=3)]
+    assert scores == sorted(scores, reverse=True)
+    assert index.search("zzz qqq", k=3) == []  # Nothing in common
+
+
+def test_set_won_and_sync_pick_up_results(tmp_path):
+    history = [dict(entry) for entry in HISTORY]
+    index = BidIndex(tmp_path / "h.vectors")
+    index.rebuild(history)
+    index.set_won(2, True)
+    assert 2 in [row for row, _ in index.search("Python scraper ecommerce listings", k=4)]
+    
+    history.append(bid("api", "Build a REST API in Python for product prices", won=True))
+    index.sync(history)
+    assert 4 in [row for row, _ in index.search("REST API Python", k=1)]
+    index.set_won(4, False)
+    index.sync(history)  # Existing rows keep what set_won recorded
+    assert 4 not in [row for row, _ in index.search("REST API Python", k=4)]
+
+
+def test_persisted_rows_are_read_back_instead_of_vectorized(tmp_path):
+    path = tmp_path / "h.vectors"
+    index = BidIndex(path)
+    index.rebuild(HISTORY[:2])
+    index.persist()
+    assert path.stat().st_size == 2 * DEFAULT_DIM * 4
+    index.sync(HISTORY)
+    index.persist()
+    assert path.stat().st_size == 4 * DEFAULT_DIM * 4
+    
+    # Stored rows win over the history text, which shows they were read from the file
+    changed = [bid("x", "Unrelated text", entry["won"]) for entry in HISTORY]
+    reloaded = BidIndex(path)
+    reloaded.rebuild(changed)
+    assert reloaded.search("Scrape ecommerce product prices using Python", k=1)[0][0] == 0
+
+
+def test_sidecar_from_another_history_is_rewritten(tmp_path):
+    path = tmp_path / "h.vectors"
+    index = BidIndex(path)
+    index.rebuild(HISTORY)
+    index.persist()
+    
+    shorter = [bid("logo", "Design a minimalist logo for a coffee brand", won=True)]
+    fresh = BidIndex(path)
+    fresh.rebuild(shorter)  # More rows on disk than in history: not this history's file
+    assert fresh.search("minimalist coffee logo", k=1)[0][0] == 0
+    fresh.persist()
+    assert path.stat().st_size == DEFAULT_DIM * 4
+    
+    path.write_bytes(path.read_bytes() + b"\0\0")  # Torn write
+    torn = BidIndex(path)
+    torn.rebuild(shorter)
+    torn.persist()
+    assert path.stat().st_size == DEFAULT_DIM * 4
@@ -0,0 +1,184 @@
+"""Tests for admission control: the deadline scheduler and the store-backed rate limiter."""
+import asyncio
+import time
+
+import pytest
+
+from src.core.scheduler import (
+    DEFAULT_DEADLINE_SECONDS, DeadlineScheduler, Overloaded, RateLimiter, deadline_for, seconds_remaining
+)
+from src.core.store import MemoryStore, StoreError
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def hold(scheduler: DeadlineScheduler, deadline: float, order: list, release: asyncio.Event):
+    async with scheduler.slot(deadline):
+        order.append(deadline)
+        await release.wait()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_seconds_remaining_and_deadline():
+    assert seconds_remaining("6 days, 23 hours") == 6 * 86400 + 23 * 3600
+    assert seconds_remaining("Bidding ends in 5 min 30 sec") == 330
+    assert seconds_remaining("closed") is None
+    assert deadline_for("1 hour", now=1000.0) == 4600.0
+    assert deadline_for(None, now=1000.0) == 1000.0 + DEFAULT_DEADLINE_SECONDS
+
+
+def test_waiters_are_served_earliest_deadline_first():
+    async def scenario():
+        scheduler = DeadlineScheduler(slots=1)
+        order, release = [], asyncio.Event()
+        first = asyncio.ensure_future(hold(scheduler, 0, order, release))
+        await settle()
+        waiters = [asyncio.ensure_future(hold(scheduler, deadline, order, release)) for deadline in (30, 10, 20)]
+        await settle()
+        assert scheduler.saturated()
+        assert scheduler.stats()["waiting"] == 3
+        release.set()
+        await asyncio.gather(first, *waiters)
+        assert not scheduler.saturated()
+        return order, scheduler.stats()
+    
+    order, stats = run(scenario())
+    assert order == [0, 10, 20, 30]
+    assert stats["admitted"] == 4
+    assert stats["queued"] == 3
+    assert stats["running"] == 0
+
+
+def test_full_queue_rejects_latest_deadline_with_retry_after():
+    async def scenario():
+        scheduler = DeadlineScheduler(slots=1, max_queue=1)
+        order, release = [], asyncio.Event()
+        running = asyncio.ensure_future(hold(scheduler, 0, order, release))
+        await settle()
+        waiting = asyncio.ensure_future(hold(scheduler, 10, order, release))
+        await settle()
+        with pytest.raises(Overloaded) as refused:
+            async with scheduler.slot(20):
+                pass
+        release.set()
+        await asyncio.gather(running, waiting)
+        return refused.value, scheduler.stats()
+    
+    refused, stats = run(scenario())
+    assert refused.retry_after >= 1
+    assert "retry in" in str(refused)
+    assert stats["rejected"] == 1
+
+
+def test_earlier_deadline_displaces_latest_waiter():
+    async def scenario():
+        scheduler = DeadlineScheduler(slots=1, max_queue=1)
+        order, release = [], asyncio.Event()
+        running = asyncio.ensure_future(hold(scheduler, 0, order, release))
+        await settle()
+        displaced = asyncio.ensure_future(hold(scheduler, 20, order, release))
+        await settle()
+        urgent = asyncio.ensure_future(hold(scheduler, 10, order, release))
+        await settle()
+        release.set()
+        await asyncio.gather(running, urgent)
+        with pytest.raises(Overloaded):
+            await displaced
+        return order, scheduler.stats()
+    
+    order, stats = run(scenario())
+    assert order == [0, 10]
+    assert stats["displaced"] == 1
+    assert stats["running"] == 0
+
+
+def test_deep_backlog_downgrades_only_non_urgent_work():
+    async def scenario():
+        scheduler = DeadlineScheduler(slots=1, downgrade_depth=1, urgent_seconds=3600)
+        release = asyncio.Event()
+        running = asyncio.ensure_future(hold(scheduler, 0, [], release))
+        await settle()
+        
+        async def admitted(deadline):
+            async with scheduler.slot(deadline) as admission:
+                return admission.downgrade
+        
+        urgent = asyncio.ensure_future(admitted(time.time() + 60))
+        later = asyncio.ensure_future(admitted(time.time() + 86400))
+        extra = asyncio.ensure_future(admitted(time.time() + 2 * 86400))
+        await settle()
+        release.set()
+        await running
+        return await asyncio.gather(urgent, later, extra)
+    
+    urgent, later, extra = run(scenario())
+    assert urgent is False  # Closes within the hour
+    assert later is True  # One more request was still waiting behind it
+    assert extra is False  # Nothing left waiting when it was admitted
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        scheduler = DeadlineScheduler(slots=1)
+        order, release = [], asyncio.Event()
+        running = asyncio.ensure_future(hold(scheduler, 0, order, release))
+        await settle()
+        gone = asyncio.ensure_future(hold(scheduler, 10, order, release))
+        await settle()
+        gone.cancel()
+        await settle()
+        waiting = scheduler.stats()["waiting"]
+        release.set()
+        await running
+        return order, waiting, scheduler.stats()
+    
+    order, waiting, stats = run(scenario())
+    assert order == [0]
+    assert waiting == 0
+    assert stats["running"] == 0
+
+
+def test_rate_limiter_refuses_once_window_is_full():
+    limiter = RateLimiter(MemoryStore(), "llm", limit=2, window=3600)
+    limiter.acquire()
+    limiter.acquire()
+    with pytest.raises(Overloaded) as refused:
+        limiter.acquire()
+    assert 1 <= refused.value.retry_after <= 3600
+
+
+def test_unlimited_rate_limiter_never_counts():
+    store = MemoryStore()
+    limiter = RateLimiter(store, "llm", limit=0)
+    for _ in range(5):
+        limiter.acquire()
+        assert limiter.try_acquire(10)
+    assert store.get(limiter._key(time.time())) is None
+
+
+def test_try_acquire_keeps_reserve_for_acquire():
+    limiter = RateLimiter(MemoryStore(), "llm", limit=4, window=3600)
+    assert limiter.try_acquire(reserve=2)
+    assert limiter.try_acquire(reserve=2)
+    assert not limiter.try_acquire(reserve=2)  # Refusals are not counted
+    limiter.acquire()
+    limiter.acquire()
+    with pytest.raises(Overloaded):
+        limiter.acquire()
+
+
+def test_rate_limiter_with_unreachable_store():
+    class Down(MemoryStore):
+        def execute(self, ops):
+            raise StoreError("store went away")
+    
+    limiter = RateLimiter(Down(), "llm", limit=1)
+    limiter.acquire()  # Real requests go ahead
+    limiter.acquire()
+    assert not limiter.try_acquire()  # Optional work waits
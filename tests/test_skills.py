@@ -0,0 +1,82 @@
+"""Tests for SkillIndex: exact, alias, sub-phrase and fuzzy matching of project skills."""
+import pytest
+
+from src.core.skills import SkillIndex
+
+MY_SKILLS = ["Python", "React", "C", "Java", "Apache", "Node.js", "PostgreSQL", "JavaScript", "WordPress", "Web Scraping"]
+
+
+@pytest.fixture
+def index():
+    return SkillIndex(MY_SKILLS)
+
+
+def matches(index: SkillIndex, term: str):
+    return index.match([term])[0]
+
+
+@pytest.mark.parametrize("term", [
+    "React Native", "React-Native", "React Native Developer", "Objective C", "Objective-C",
+    "Objective-C programming", "Node-RED", "Apache Spark", "Apache Kafka",
+])
+def test_compound_skill_does_not_match_its_parts(index, term):
+    assert matches(index, term) is None
+
+
+def test_compound_skill_matches_when_you_have_it():
+    index = SkillIndex(["React Native", "Objective-C"])
+    assert matches(index, "React Native developer") == "React Native"
+    assert matches(index, "objective c") == "Objective-C"
+    assert matches(index, "React") is None
+
+
+def test_other_words_beside_a_compound_still_match(index):
+    assert matches(index, "React Native Python") == "Python"
+
+
+@pytest.mark.parametrize("term, skill", [
+    ("Python programming", "Python"),
+    ("Python 3.x", "Python"),
+    ("python3.11", "Python"),
+    ("Python web scraping", "Web Scraping"),  # The longest known run wins
+    ("Advanced React", "React"),
+    ("React 18", "React"),
+    ("C Programming", "C"),
+])
+def test_qualified_and_versioned_names_match(index, term, skill):
+    assert matches(index, term) == skill
+
+
+@pytest.mark.parametrize("term, skill", [
+    ("ReactJS", "React"),
+    ("react.js", "React"),
+    ("py", "Python"),
+    ("Postgres", "PostgreSQL"),
+    ("nodejs", "Node.js"),
+    ("JS", "JavaScript"),
+    ("Data Scraping", "Web Scraping"),
+    ("WP", "WordPress"),
+])
+def test_aliases_match(index, term, skill):
+    assert matches(index, term) == skill
+
+
+@pytest.mark.parametrize("term, skill", [
+    ("Javascrip", "JavaScript"),
+    ("Wordpres", "WordPress"),
+    ("PostgresSQL", "PostgreSQL"),
+    ("Web Scrapping", "Web Scraping"),
+])
+def test_typos_match_fuzzily(index, term, skill):
+    assert matches(index, term) == skill
+
+
+@pytest.mark.parametrize("term", ["Go", "Ruby", "Django", "Graphic Design", "Jav"])
+def test_unrelated_skills_do_not_match(index, term):
+    assert matches(index, term) is None
+
+
+def test_java_and_javascript_stay_apart(index):
+    assert matches(index, "Java") == "Java"
+    assert matches(index, "Java EE") == "Java"
+    assert matches(index, "JavaScript") == "JavaScript"
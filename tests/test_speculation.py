@@ -0,0 +1,113 @@
+"""Tests for the Speculator: claiming, cancelling and limiting background work."""
+import threading
+import time
+
+import pytest
+
+from src.core.budget import Cancelled, RequestBudget
+from src.core.speculation import Speculator, project_key
+
+
+def blocked(release: threading.Event, value="done"):
+    release.wait(5)
+    return value
+
+
+def test_project_key_ignores_case_and_whitespace():
+    assert project_key("analysis", "Build  a Scraper", None) == project_key("analysis", "build a scraper ", "")
+    assert project_key("analysis", "a") != project_key("draft", "a")
+
+
+def test_claimed_result_is_used_once():
+    speculator = Speculator()
+    assert speculator.start("k", lambda: 42)
+    assert not speculator.start("k", lambda: 0)  # Already there
+    assert speculator.result("k") == 42
+    assert speculator.result("k") is None  # Claimed
+    stats = speculator.stats()
+    assert stats["started"] == 1
+    assert stats["used"] == 1
+    assert stats["waste_ratio"] == 0.0
+    speculator.shutdown()
+
+
+def test_failed_speculation_returns_none():
+    def fail():
+        raise RuntimeError("provider down")
+    
+    speculator = Speculator()
+    speculator.start("k", fail)
+    assert speculator.result("k") is None
+    assert speculator.stats()["failed"] == 1
+    speculator.shutdown()
+
+
+def test_cancelled_claimer_stops_waiting_but_work_finishes():
+    speculator = Speculator()
+    release = threading.Event()
+    speculator.start("k", blocked, release)
+    budget = RequestBudget(30)
+    threading.Timer(0.1, budget.cancel).start()
+    
+    started = time.monotonic()
+    with pytest.raises(Cancelled, match="client disconnected"):
+        speculator.result("k", budget)
+    assert time.monotonic() - started < 2
+    assert speculator.stats()["running"] == 1  # The speculation itself isn't interrupted
+    release.set()
+    speculator.shutdown()
+
+
+def test_claimer_out_of_time_stops_waiting():
+    speculator = Speculator()
+    release = threading.Event()
+    speculator.start("k", blocked, release)
+    with pytest.raises(Cancelled, match="time budget exhausted"):
+        speculator.result("k", RequestBudget(0.1))
+    release.set()
+    speculator.shutdown()
+
+
+def test_shutdown_leaves_unclaimed_speculation_to_finish():
+    speculator = Speculator()
+    release = threading.Event()
+    speculator.start("k", blocked, release)
+    started = time.monotonic()
+    speculator.shutdown()
+    assert time.monotonic() - started < 1  # Doesn't wait for running work
+    release.set()
+    assert speculator.result("k") == "done"
+
+
+def test_unclaimed_speculation_expires_as_waste():
+    speculator = Speculator(ttl=0.05)
+    speculator.start("k", lambda: 1)
+    time.sleep(0.1)
+    assert speculator.result("k") is None
+    stats = speculator.stats()
+    assert stats["wasted"] == 1
+    assert stats["waste_ratio"] == 1.0
+    speculator.shutdown()
+
+
+def test_cap_skips_instead_of_queueing():
+    speculator = Speculator(max_concurrent=1)
+    release = threading.Event()
+    assert speculator.start("a", blocked, release)
+    assert not speculator.start("b", blocked, release)
+    release.set()
+    assert speculator.result("a") == "done"
+    assert speculator.stats()["skipped"] == 1
+    speculator.shutdown()
+
+
+def test_refused_admission_is_throttled_and_frees_its_slot():
+    admitted = [False, True]
+    speculator = Speculator(max_concurrent=1, admit=lambda: admitted.pop(0))
+    assert not speculator.start("a", lambda: 1)
+    assert speculator.start("a", lambda: 1)
+    assert speculator.result("a") == 1
+    stats = speculator.stats()
+    assert stats["throttled"] == 1
+    assert stats["started"] == 1
+    speculator.shutdown()
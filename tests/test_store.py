@@ -0,0 +1,254 @@
+"""Tests for the stores: MemoryStore and RedisStore (against a stand-in RESP server) behave alike."""
+import io
+import os
+import time
+
+import pytest
+
+from src.core.memory import BidMemory, SharedBidMemory
+from src.core.store import MemoryStore, RedisStore, StoreError
+
+from .resp_server import RespServer
+
+
+@pytest.fixture
+def server():
+    server = RespServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request, server):
+    if request.param == "memory":
+        return MemoryStore()
+    return RedisStore(server.url(), prefix="test:")
+
+
+def test_encode_is_resp_array_of_bulk_strings():
+    assert RedisStore._encode(["SET", "key", b"v\r\n", 12]) == (
+        b"*4\r\n$3\r\nSET\r\n$3\r\nkey\r\n$3\r\nv\r\n\r\n$2\r\n12\r\n"
+    )
+
+
+def test_read_reply_decodes_resp2():
+    reader = io.BytesIO(b"+OK\r\n-ERR bad\r\n:42\r\n$-1\r\n$5\r\na\r\nbc\r\n*2\r\n$1\r\nx\r\n$-1\r\n*-1\r\n*0\r\n")
+    replies = [RedisStore._read_reply(reader) for _ in range(8)]
+    assert replies == ["OK", "ERR bad", 42, None, b"a\r\nbc", [b"x", None], None, []]
+    assert type(replies[1]).__name__ == "_ReplyError"
+
+
+@pytest.mark.parametrize("data", [b"", b"$5\r\nab", b"+OK"])
+def test_read_reply_raises_on_truncated_reply(data):
+    with pytest.raises(ConnectionError):
+        RedisStore._read_reply(io.BytesIO(data))
+
+
+def test_get_set_delete(store):
+    assert store.get("a") is None
+    assert store.set("a", b"1") is True
+    assert store.get("a") == b"1"
+    assert store.delete("a") == 1
+    assert store.delete("a") == 0
+    assert store.get("a") is None
+
+
+def test_only_new_sets_missing_keys_only(store):
+    assert store.set("a", b"1", only_new=True) is True
+    assert store.set("a", b"2", only_new=True) is False
+    assert store.get("a") == b"1"
+
+
+def test_ttl_expires_keys(store):
+    store.set("a", b"1", ttl=0.05)
+    assert store.incr("n", 5, ttl=0.05) == 5
+    assert store.incr("n") == 6
+    time.sleep(0.1)
+    assert store.get("a") is None
+    assert store.set("a", b"2", only_new=True) is True
+    assert store.incr("n") == 1  # Expired with the ttl its first incr set
+
+
+def test_push_and_range(store):
+    assert store.push("l", [b"x", b"y"]) == 2
+    assert store.push("l", [b"z"]) == 3
+    assert store.push("l", []) == 3
+    assert store.range("l") == [b"x", b"y", b"z"]
+    assert store.range("l", 1) == [b"y", b"z"]
+    assert store.range("l", -2, -1) == [b"y", b"z"]
+    assert store.range("l", 0, 0) == [b"x"]
+    assert store.range("l", 3) == []
+    assert store.range("missing") == []
+
+
+def test_hset_and_hget(store):
+    assert store.hset("h", {"f": b"1", "g": b"2"}) == 2
+    assert store.hset("h", {"f": b"3", "k": b"4"}) == 1
+    assert store.hset("h", {}) == 0
+    assert store.hget("h", ["f", "missing", "g"]) == [b"3", None, b"2"]
+    assert store.hget("h", []) == []
+    assert store.hget("missing", ["f"]) == [None]
+
+
+def test_pipeline_returns_results_in_order(store):
+    pipeline = store.pipeline()
+    pipeline.incr("p").incr("p", 2).get("p").push("l", [b"1"]).hset("h", {"f": b"v"}).hget("h", ["f"])
+    assert pipeline.execute() == [1, 3, b"3", 1, 1, [b"v"]]
+    assert pipeline.execute() == []
+
+
+def test_wrong_type_raises_and_rest_of_pipeline_applies(store):
+    store.push("l", [b"x"])
+    with pytest.raises(StoreError):
+        store.pipeline().incr("l").set("after", b"1").execute()
+    assert store.get("after") == b"1"
+
+
+def test_pipeline_is_one_round_trip(server):
+    store = RedisStore(server.url())
+    store.get("warm")  # Open the pooled connection
+    batches = server.stats["batches"]
+    pipeline = store.pipeline()
+    for index in range(50):
+        pipeline.set(f"k{index}", b"v", ttl=10).get(f"k{index}")
+    pipeline.incr("counter", ttl=10)  # Two commands
+    results = pipeline.execute()
+    assert len(results) == 101
+    assert server.stats["batches"] == batches + 1
+    assert server.stats["connections"] == 1
+
+
+def test_keys_are_prefixed(server):
+    RedisStore(server.url(), prefix="app:").set("a", b"1")
+    assert server.databases[0] == {b"app:a": b"1"}
+    assert RedisStore(server.url(), prefix="other:").get("a") is None
+
+
+def test_select_uses_database_from_url(server):
+    RedisStore(server.url(db=2)).set("a", b"2")
+    RedisStore(server.url(db=3)).set("a", b"3")
+    assert RedisStore(server.url(db=2)).get("a") == b"2"
+    assert server.databases[2] == {b"bidwriter:a": b"2"}
+    assert server.databases[3] == {b"bidwriter:a": b"3"}
+
+
+def test_auth_with_password_and_username():
+    server = RespServer(password="s3cret", username="app").start()
+    try:
+        store = RedisStore(server.url(db=1, password="s3cret", username="app"))
+        store.set("a", b"1")
+        assert store.get("a") == b"1"
+        with pytest.raises(StoreError, match="rejected connection setup"):
+            RedisStore(server.url(password="wrong", username="app")).get("a")
+        with pytest.raises(StoreError, match="NOAUTH"):
+            RedisStore(server.url()).get("a")
+    finally:
+        server.stop()
+
+
+def test_unreachable_store_raises_store_error(server):
+    port = server.port
+    server.stop()
+    with pytest.raises(StoreError, match="unavailable"):
+        RedisStore(f"redis://127.0.0.1:{port}", timeout=0.5).get("a")
+
+
+def test_unsupported_url_scheme():
+    with pytest.raises(ValueError):
+        RedisStore("http://127.0.0.1:6379")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_opens_its_own_connections(server):
+    store = RedisStore(server.url())
+    store.set("parent", b"1")  # The parent's pool now holds a connection
+    assert server.stats["connections"] == 1
+    
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = store.get("parent") == b"1" and store.set("child", b"1")
+        except BaseException:
+            ok = False
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert server.stats["connections"] == 2  # The child did not reuse the parent's socket
+    assert store.get("child") == b"1"
+    assert server.stats["connections"] == 2  # And the parent still uses its own
+
+
+def add_bids(memory: SharedBidMemory, tag: str, count: int):
+    for index in range(count):
+        memory.add_bid(f"{tag}-{index}", f"Build a {tag} scraper number {index} for product prices",
+                       f"Bid {tag} {index}", project_type="Web Scraping")
+
+
+def test_shared_memory_nodes_see_one_history(server, tmp_path):
+    store = RedisStore(server.url(), prefix="mem:")
+    first = SharedBidMemory(store, "t", str(tmp_path / "a" / ".bid_history.json"))
+    second = SharedBidMemory(store, "t", str(tmp_path / "b" / ".bid_history.json"))
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first.load()
+    second.load()
+    
+    add_bids(first, "A", 3)
+    add_bids(second, "B", 3)
+    first.update_bid_result("B-1", True)
+    assert [bid["project_name"] for bid in first.get_recent_bids(10)] == ["A-0", "A-1", "A-2", "B-0", "B-1", "B-2"]
+    assert second.get_recent_bids(10) == first.get_recent_bids(10)
+    assert [bid["won"] for bid in second.get_recent_bids(10)] == [None, None, None, None, True, None]
+    assert second.get_recent_bids(1)[0]["generated_bid"] == "Bid B 2"
+    duplicate = first.find_duplicate("Build a B scraper number 2 for product prices")
+    assert duplicate and duplicate["project_name"] == "B-2"
+    first.close()
+    second.close()
+
+
+def test_shared_memory_imports_local_history_once(server, tmp_path):
+    local = tmp_path / ".bid_history.json"
+    seed = BidMemory(str(local))
+    seed.load()
+    add_bids(seed, "L", 4)
+    seed.close()
+    
+    store = RedisStore(server.url(), prefix="mem:")
+    first = SharedBidMemory(store, "t", str(local))
+    first.load()
+    second = SharedBidMemory(store, "t", str(local))
+    second.load()
+    assert len(store.range("history:t:meta")) == 4
+    assert [bid["project_name"] for bid in second.get_recent_bids(10)] == ["L-0", "L-1", "L-2", "L-3"]
+    assert store.get("history:t:meta:imported") == b"1"
+    assert store.get("history:t:meta:importing") is None
+    first.close()
+    second.close()
+
+
+def test_failed_import_is_retried(tmp_path):
+    class FailingOnce(MemoryStore):
+        failed = False
+        
+        def execute(self, ops):
+            if not self.failed and any(name == "push" for name, _ in ops):
+                self.failed = True
+                raise StoreError("store went away")
+            return super().execute(ops)
+    
+    local = tmp_path / ".bid_history.json"
+    seed = BidMemory(str(local))
+    seed.load()
+    add_bids(seed, "L", 2)
+    seed.close()
+    
+    store = FailingOnce()
+    first = SharedBidMemory(store, "t", str(local))
+    first.load()
+    assert store.range("history:t:meta") == []
+    assert store.get("history:t:meta:imported") is None
+    second = SharedBidMemory(store, "t", str(local))
+    second.load()
+    assert len(store.range("history:t:meta")) == 2
+    first.close()
+    second.close()
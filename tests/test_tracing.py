@@ -0,0 +1,34 @@
+"""Tests for the route sampler's per-route rates."""
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+from opentelemetry.sdk.trace.sampling import Decision
+
+from src.core.tracing import _route_sampler, parse_route_rates
+
+ROUTES = parse_route_rates("/health=0,/refine-sessions/{session_id}=0,/refine-sessions/{session_id}/refine=1")
+
+
+def sampled(attributes: dict) -> bool:
+    """Whether a root span with ``attributes`` is kept when the default rate drops everything else."""
+    result = _route_sampler(0.0, ROUTES).should_sample(None, 1 << 64, "GET", attributes=attributes)
+    return result.decision == Decision.RECORD_AND_SAMPLE
+
+
+def test_route_template_picks_rate():
+    assert sampled({"http.route": "/refine-sessions/{session_id}/refine", "url.path": "/refine-sessions/a/refine"})
+    assert not sampled({"http.route": "/refine-sessions/{session_id}", "url.path": "/refine-sessions/a"})
+
+
+def test_template_matches_path_before_routing():
+    # Spans opened by the framework carry only the raw path when sampled
+    assert sampled({"url.path": "/refine-sessions/a/refine"})
+    assert not sampled({"url.path": "/refine-sessions/a"})
+    assert not sampled({"url.path": "/refine-sessions/a/b/refine"})
+
+
+def test_unconfigured_route_uses_default_rate():
+    assert not sampled({"http.route": "/generate-bid", "url.path": "/generate-bid"})
+    assert _route_sampler(1.0, ROUTES).should_sample(
+        None, 1 << 64, "GET", attributes={"url.path": "/generate-bid"}
+    ).decision == Decision.RECORD_AND_SAMPLE